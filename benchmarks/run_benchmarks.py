@@ -0,0 +1,371 @@
+"""Benchmark suite for the eventit-py logging hot paths and queries.
+
+Run from the base directory of this project, for example::
+
+    poetry run python benchmarks/run_benchmarks.py --output bench.json
+
+MongoDB benchmarks are included when a server is reachable at the URL given by
+``--mongo-url`` (or the ``MONGODB_URI`` environment variable). Results are written
+as JSON, and can be compared against a previous run with ``--compare``.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from importlib import metadata
+from typing import Callable
+
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+BENCHMARK_DATABASE_NAME = "eventit_benchmarks"
+DEFAULT_FILE_SIZES = [100, 1000, 10000]
+
+
+class BenchmarkCounter(BaseCountableEvent):
+    time_window: int = 60
+
+
+def _measure(func: Callable, iterations: int, warmup: int = 10) -> dict:
+    """Call func repeatedly, and summarize the latency of each call
+
+    Args:
+        func (Callable): Zero-argument function to measure.
+        iterations (int): Number of timed calls.
+        warmup (int, optional): Number of untimed calls made first. Defaults to 10.
+
+    Returns:
+        dict: Total time, throughput and latency percentiles (in microseconds).
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    perf_counter = time.perf_counter
+    for _ in range(iterations):
+        start = perf_counter()
+        func()
+        samples.append(perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    return {
+        "iterations": iterations,
+        "total_seconds": total,
+        "ops_per_second": iterations / total if total else None,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+    }
+
+
+def _result(name: str, backend: str, measurement: dict, **params) -> dict:
+    return {"name": name, "backend": backend, "params": params, **measurement}
+
+
+def _make_logger(backend: str, directory: str, mongo_url: str = None) -> EventLogger:
+    if backend == "mongodb":
+        return EventLogger(
+            MONGO_URL=mongo_url,
+            database_name=BENCHMARK_DATABASE_NAME,
+            drop_database=True,
+        )
+    return EventLogger(directory=directory)
+
+
+def bench_decorator_overhead(iterations: int, directory: str) -> list[dict]:
+    """Cost of an ``@event`` decorated call, compared with the undecorated function"""
+    eventit = EventLogger(directory=directory)
+
+    def undecorated():
+        return None
+
+    decorated = eventit.event(undecorated)
+    baseline = _measure(undecorated, iterations)
+    wrapped = _measure(decorated, iterations)
+    overhead = dict(wrapped)
+    overhead["overhead_us"] = wrapped["mean_us"] - baseline["mean_us"]
+    return [
+        _result("undecorated_call", "none", baseline),
+        _result("decorated_call", "filepath", overhead),
+    ]
+
+
+def bench_log_event(
+    iterations: int, directory: str, backends: list[str], mongo_url: str = None
+) -> list[dict]:
+    """Throughput of ``EventLogger.log_event`` for each backend"""
+    results = []
+    for backend in backends:
+        eventit = _make_logger(backend, directory, mongo_url)
+        measurement = _measure(
+            lambda: eventit.log_event(description="benchmark"), iterations
+        )
+        results.append(_result("log_event", backend, measurement))
+    return results
+
+
+def bench_log_events(
+    iterations: int,
+    directory: str,
+    backends: list[str],
+    mongo_url: str = None,
+    batch_size: int = 1000,
+) -> list[dict]:
+    """Throughput of ``EventLogger.log_events``, validating and writing a batch at once"""
+    results = []
+    batch = [{"description": "benchmark"}] * batch_size
+    for backend in backends:
+        eventit = _make_logger(backend, directory, mongo_url)
+        measurement = _measure(
+            lambda: eventit.log_events(batch),
+            max(iterations // batch_size, 5),
+            warmup=1,
+        )
+        measurement["events_per_second"] = (
+            measurement["ops_per_second"] * batch_size
+            if measurement["ops_per_second"]
+            else None
+        )
+        results.append(
+            _result("log_events", backend, measurement, batch_size=batch_size)
+        )
+    return results
+
+
+def bench_countable_event(
+    iterations: int, directory: str, backends: list[str], mongo_url: str = None
+) -> list[dict]:
+    """Throughput of countable events, which update one record per time window"""
+    results = []
+    for backend in backends:
+        eventit = _make_logger(backend, directory, mongo_url)
+        measurement = _measure(
+            lambda: eventit.log_event(
+                description="benchmark", event_type=BenchmarkCounter
+            ),
+            iterations,
+        )
+        results.append(_result("log_countable_event", backend, measurement))
+    return results
+
+
+def bench_file_queries(
+    iterations: int, directory: str, file_sizes: list[int]
+) -> list[dict]:
+    """Search and count latency against file size for FileLoggingClient"""
+    results = []
+    for file_size in file_sizes:
+        group = f"size_{file_size}"
+        client = FileLoggingClient(directory=directory, groups=[group])
+        start_time = datetime.datetime.now(tz=datetime.timezone.utc)
+        for i in range(file_size):
+            client.log_message(BaseEvent(user=f"user{i % 10}"), group)
+        end_time = datetime.datetime.now(tz=datetime.timezone.utc)
+        query_dict = {"user": "user3"}
+        client.register_count_query(f"{group}_user3", group, query_dict)
+        # scans are slow on large files, so keep the total work roughly constant
+        query_iterations = max(3, min(iterations, 100000 // file_size))
+
+        queries = {
+            "search_events_by_query": lambda: client.search_events_by_query(
+                query_dict, group, BaseEvent
+            ),
+            "search_events_by_query_limit_10": lambda: client.search_events_by_query(
+                query_dict, group, BaseEvent, limit=10
+            ),
+            "search_events_by_query_fields": lambda: client.search_events_by_query(
+                query_dict, group, BaseEvent, fields=["timestamp", "user"]
+            ),
+            "search_events_by_timestamp": lambda: client.search_events_by_timestamp(
+                start_time, end_time, group, BaseEvent
+            ),
+            "search_events_by_timestamp_newest_100": lambda: (
+                client.search_events_by_timestamp(
+                    start_time, end_time, group, BaseEvent, limit=100, order="desc"
+                )
+            ),
+            "count_events_by_query": lambda: client.count_events_by_query(
+                query_dict, group, BaseEvent
+            ),
+            "get_materialized_count": lambda: client.get_materialized_count(
+                f"{group}_user3"
+            ),
+        }
+        for name, query in queries.items():
+            measurement = _measure(query, query_iterations, warmup=1)
+            results.append(_result(name, "filepath", measurement, file_size=file_size))
+
+        client.create_index(group, "user")
+        measurement = _measure(queries["search_events_by_query"], query_iterations, 1)
+        results.append(
+            _result(
+                "search_events_by_query_indexed",
+                "filepath",
+                measurement,
+                file_size=file_size,
+            )
+        )
+    return results
+
+
+def bench_mongodb_queries(
+    iterations: int, mongo_url: str, file_sizes: list[int]
+) -> list[dict]:
+    """Search and count latency against collection size for MongoDBLoggingClient"""
+    from eventit_py.logging_backends import MongoDBLoggingClient
+
+    results = []
+    for collection_size in file_sizes:
+        group = f"size_{collection_size}"
+        client = MongoDBLoggingClient(
+            mongo_url=mongo_url,
+            groups=[group],
+            database_name=BENCHMARK_DATABASE_NAME,
+        )
+        start_time = datetime.datetime.now(tz=datetime.timezone.utc)
+        for i in range(collection_size):
+            client.log_message(BaseEvent(user=f"user{i % 10}"), group)
+        end_time = datetime.datetime.now(tz=datetime.timezone.utc)
+        query_dict = {"user": "user3"}
+        query_iterations = max(3, min(iterations, 100000 // collection_size))
+
+        queries = {
+            "search_events_by_query": lambda: client.search_events_by_query(
+                query_dict, group, BaseEvent
+            ),
+            "search_events_by_timestamp": lambda: client.search_events_by_timestamp(
+                start_time, end_time, group, BaseEvent
+            ),
+            "count_events_by_query": lambda: client.count_events_by_query(
+                query_dict, group, BaseEvent
+            ),
+        }
+        for name, query in queries.items():
+            measurement = _measure(query, query_iterations, warmup=1)
+            results.append(
+                _result(name, "mongodb", measurement, file_size=collection_size)
+            )
+    return results
+
+
+def _mongodb_available(mongo_url: str) -> bool:
+    if not mongo_url:
+        return False
+    try:
+        from pymongo import MongoClient
+
+        mongo_client = MongoClient(mongo_url, serverSelectionTimeoutMS=1000)
+        mongo_client.server_info()
+        mongo_client.close()
+    except Exception as exc:
+        print(f"Skipping MongoDB benchmarks: {exc}", file=sys.stderr)
+        return False
+    return True
+
+
+def _result_key(result: dict) -> tuple:
+    return (
+        result["name"],
+        result["backend"],
+        json.dumps(result["params"], sort_keys=True),
+    )
+
+
+def compare_results(current: dict, previous: dict) -> list[str]:
+    """Describe the change in mean latency for each benchmark present in both runs"""
+    previous_results = {_result_key(r): r for r in previous["results"]}
+    lines = []
+    for result in current["results"]:
+        old = previous_results.get(_result_key(result))
+        if old is None or not old["mean_us"]:
+            continue
+        change = (result["mean_us"] - old["mean_us"]) / old["mean_us"] * 100
+        lines.append(
+            f"{result['name']:<36} {result['backend']:<9} "
+            f"{json.dumps(result['params']):<22} "
+            f"{old['mean_us']:>12.1f}us -> {result['mean_us']:>12.1f}us "
+            f"({change:+.1f}%)"
+        )
+    return lines
+
+
+def run_benchmarks(
+    iterations: int, file_sizes: list[int], mongo_url: str = None
+) -> dict:
+    """Run every benchmark, returning the results as a JSON-serializable dict"""
+    backends = ["filepath"]
+    if _mongodb_available(mongo_url):
+        backends.append("mongodb")
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        results += bench_decorator_overhead(iterations, directory)
+    with tempfile.TemporaryDirectory() as directory:
+        results += bench_log_event(iterations, directory, backends, mongo_url)
+    with tempfile.TemporaryDirectory() as directory:
+        results += bench_log_events(iterations, directory, backends, mongo_url)
+    with tempfile.TemporaryDirectory() as directory:
+        results += bench_countable_event(iterations, directory, backends, mongo_url)
+    with tempfile.TemporaryDirectory() as directory:
+        results += bench_file_queries(iterations, directory, file_sizes)
+    if "mongodb" in backends:
+        results += bench_mongodb_queries(iterations, mongo_url, file_sizes)
+
+    try:
+        version = metadata.version("eventit-py")
+    except metadata.PackageNotFoundError:
+        version = None
+    return {
+        "eventit_version": version,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+        "backends": backends,
+        "results": results,
+    }
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--iterations", type=int, default=1000, help="timed calls per benchmark"
+    )
+    parser.add_argument(
+        "--file-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_FILE_SIZES,
+        help="number of events stored before measuring queries",
+    )
+    parser.add_argument(
+        "--mongo-url",
+        default=os.environ.get("MONGODB_URI"),
+        help="MongoDB URL (defaults to the MONGODB_URI environment variable)",
+    )
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="previous JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.iterations, args.file_sizes, args.mongo_url)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output)
+            output_file.write("\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as previous_file:
+            previous = json.load(previous_file)
+        print("\n".join(compare_results(report, previous)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+#!/bin/bash
+set -e
+poetry run python benchmarks/run_benchmarks.py --output benchmark_results.json "$@"
@@ -1,14 +1,65 @@
+import datetime
 import inspect
 import logging
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable, Union
 
+from eventit_py.buffered_logging import (
+    DEFAULT_BLOCK_TIMEOUT,
+    DEFAULT_MAX_QUEUE_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_READ_TIMEOUT,
+    BufferedLoggingClient,
+)
+from eventit_py.instrumentation import NULL_STOPWATCH, Instrumentation
 from eventit_py.logging_backends import FileLoggingClient, MongoDBLoggingClient
+from eventit_py.metrics_exporter import (
+    DEFAULT_EXPORTER_HOST,
+    PrometheusExporter,
+    SelfMetrics,
+)
+from eventit_py.profiling import (
+    DEFAULT_PROFILE_MAX_PATHS,
+    DEFAULT_PROFILE_MAX_WINDOWS,
+    DEFAULT_PROFILE_WINDOW,
+    CallTreeProfiler,
+)
 from eventit_py.pydantic_events import BaseEvent
+from eventit_py.query_cache import DEFAULT_QUERY_CACHE_MAX_RESULTS, CachedLoggingClient
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_LOG_FILEPATH = "eventit.log"
+# group holding rollup tier documents, so that they are not counted along with the events they summarise
+DEFAULT_ROLLUP_GROUP = "rollups"
+
+# logger kwargs that configure the MongoClient, mapped to MongoClient option names
+MONGO_CLIENT_KWARGS = {
+    "max_pool_size": "maxPoolSize",
+    "min_pool_size": "minPoolSize",
+    "max_idle_time_ms": "maxIdleTimeMS",
+    "compressors": "compressors",
+}
+
+
+def _validate_rollup_tiers(
+    rollup_tiers: list[Union[int, datetime.timedelta]],
+) -> list[int]:
+    """Validate rollup tier sizes, given as seconds or timedeltas, and return them in seconds from finest"""
+    tiers = sorted(
+        int(tier.total_seconds()) if isinstance(tier, datetime.timedelta) else int(tier)
+        for tier in rollup_tiers or []
+    )
+    for position, tier in enumerate(tiers):
+        if tier <= 0:
+            raise ValueError("Rollup tiers must be greater than 0")
+        if position and tier % tiers[position - 1] != 0:
+            raise ValueError(
+                f"Rollup tier {tier} is not a multiple of rollup tier {tiers[position - 1]}"
+            )
+    return tiers
 
 
 def _get_external_location(*args, **kwargs) -> str:
@@ -105,6 +156,11 @@ class BaseEventLogger:
         _default_event_group (str): The default event group.
         builtin_metrics (dict[str, Callable]): The dictionary of built-in metrics.
         custom_metrics (dict[str, Callable]): The dictionary of custom metrics.
+        instrumentation (Instrumentation): Per-stage timing collector, or None while instrumentation is disabled.
+        self_metrics (SelfMetrics): Health and throughput counters, or None while self-metrics are disabled.
+        metrics_exporter (PrometheusExporter): HTTP exporter serving self_metrics, if started.
+        rollup_tiers (list[int]): Sizes in seconds of the rollup tiers kept for countable events, finest first.
+        profiler (CallTreeProfiler): Call tree of decorated functions, or None while profiling is disabled.
 
     """
 
@@ -117,7 +173,21 @@ class BaseEventLogger:
         self.groups: list[str] = kwargs.get("groups", ["default"])
         self._default_event_group = kwargs.get("default_event_group", "default")
         self.groups.append(self._default_event_group)
+        self.rollup_tiers = _validate_rollup_tiers(kwargs.get("rollup_tiers"))
+        # rollup documents are stored in their own group, unless rollup_group is None
+        self._rollup_group: str = kwargs.get(
+            "rollup_group", DEFAULT_ROLLUP_GROUP if self.rollup_tiers else None
+        )
+        if self._rollup_group is not None:
+            self.groups.append(self._rollup_group)
         self.groups = list(set(self.groups))
+        # countable event windows not yet added to the rollup tiers (nor written at all, for top events),
+        # by group, event type and fields
+        self._rollup_pending: dict[tuple, tuple] = {}
+        self._rollup_lock = threading.Lock()
+        self._rollup_exit_registered = False
+        # closed windows are rolled up on this thread, so that logging does not wait for the tiers
+        self._rollup_executor: ThreadPoolExecutor = None
         self.required_metrics = set(["timestamp", "uuid"])
         self.builtin_metrics: dict[str, Callable] = {
             "function_name": _return_function_name,
@@ -132,8 +202,27 @@ class BaseEventLogger:
             self.chosen_backend = "mongodb"
             mongo_url = kwargs.get("MONGO_URL")
             database_name = kwargs.get("database_name")
+            client_options = {
+                option: kwargs[kwarg]
+                for kwarg, option in MONGO_CLIENT_KWARGS.items()
+                if kwarg in kwargs
+            }
             self.db_client = MongoDBLoggingClient(
-                mongo_url=mongo_url, database_name=database_name, groups=self.groups
+                mongo_url=mongo_url,
+                database_name=database_name,
+                groups=self.groups,
+                lazy_connect=kwargs.get("lazy_connect", False),
+                drop_database=kwargs.get("drop_database"),
+                client_options=client_options,
+                share_client=kwargs.get("share_mongo_client", True),
+                indexes=kwargs.get("mongo_indexes"),
+                timeseries=kwargs.get("mongo_timeseries", False),
+                timeseries_meta_fields=kwargs.get("mongo_timeseries_meta_fields"),
+                timeseries_granularity=kwargs.get(
+                    "mongo_timeseries_granularity", "seconds"
+                ),
+                retention=kwargs.get("retention"),
+                capped_sizes=kwargs.get("mongo_capped_sizes"),
             )
 
         # at end, default to using filepath if no other log specified
@@ -148,10 +237,179 @@ class BaseEventLogger:
                 groups=self.groups,
                 separate_files=kwargs.get("separate_files", True),
                 filename=kwargs.get("filename"),
+                indexes=kwargs.get("file_indexes"),
+                append_ordered=kwargs.get("file_append_ordered", False),
+                retention=kwargs.get("retention"),
+            )
+
+        if kwargs.get("buffered", False):
+            spill_directory = kwargs.get("spill_directory")
+            if spill_directory is None and self.chosen_backend == "filepath":
+                spill_directory = kwargs.get("directory", "./")
+            self.db_client = BufferedLoggingClient(
+                self.db_client,
+                max_queue_size=kwargs.get("buffer_size", DEFAULT_MAX_QUEUE_SIZE),
+                overflow_policy=kwargs.get("overflow_policy", "block"),
+                block_timeout=kwargs.get("block_timeout", DEFAULT_BLOCK_TIMEOUT),
+                spill_directory=spill_directory,
+                max_retries=kwargs.get("buffer_max_retries", DEFAULT_MAX_RETRIES),
+                read_timeout=kwargs.get("buffer_read_timeout", DEFAULT_READ_TIMEOUT),
+            )
+
+        if kwargs.get("query_cache_size"):
+            self.db_client = CachedLoggingClient(
+                self.db_client,
+                max_entries=kwargs["query_cache_size"],
+                max_results=kwargs.get(
+                    "query_cache_max_results", DEFAULT_QUERY_CACHE_MAX_RESULTS
+                ),
+            )
+
+        self.instrumentation: Instrumentation = None
+        if kwargs.get("instrumentation", False):
+            self.enable_instrumentation()
+
+        self.profiler: CallTreeProfiler = None
+        if kwargs.get("profiling", False):
+            self.enable_profiling(
+                window=kwargs.get("profile_window", DEFAULT_PROFILE_WINDOW),
+                max_windows=kwargs.get(
+                    "profile_max_windows", DEFAULT_PROFILE_MAX_WINDOWS
+                ),
+                max_paths=kwargs.get("profile_max_paths", DEFAULT_PROFILE_MAX_PATHS),
+            )
+
+        self.self_metrics: SelfMetrics = None
+        self.metrics_exporter: PrometheusExporter = None
+        if kwargs.get("metrics_port") is not None:
+            self.start_metrics_exporter(
+                port=kwargs["metrics_port"],
+                host=kwargs.get("metrics_host", DEFAULT_EXPORTER_HOST),
             )
 
         logger.debug("BaseEventLogger configuration complete")
 
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until events buffered by this logger have been written to the backend
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting forever.
+
+        Returns:
+            bool: True if all buffered events were written before the timeout.
+        """
+        flush = getattr(self.db_client, "flush", None)
+        if flush is not None:
+            return flush(timeout=timeout)
+        return True
+
+    def enable_instrumentation(self) -> Instrumentation:
+        """Start recording per-stage latencies for logging and backend operations
+
+        Returns:
+            Instrumentation: The collector timings are recorded into.
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation()
+        self.db_client.set_instrumentation(self.instrumentation)
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> None:
+        """Stop recording per-stage latencies, removing the instrumentation overhead"""
+        self.instrumentation = None
+        self.db_client.set_instrumentation(None)
+
+    def enable_profiling(
+        self,
+        window: int = DEFAULT_PROFILE_WINDOW,
+        max_windows: int = DEFAULT_PROFILE_MAX_WINDOWS,
+        max_paths: int = DEFAULT_PROFILE_MAX_PATHS,
+    ) -> CallTreeProfiler:
+        """Start aggregating nested calls of decorated functions into a call tree per window
+
+        Args:
+            window (int, optional): Window size in seconds. Defaults to 60.
+            max_windows (int, optional): Number of most recent windows kept. Defaults to 60.
+            max_paths (int, optional): Maximum number of call paths per window. Defaults to 10000.
+
+        Returns:
+            CallTreeProfiler: The profiler calls are recorded into, e.g. to export folded stacks.
+        """
+        if self.profiler is None:
+            self.profiler = CallTreeProfiler(
+                window=window, max_windows=max_windows, max_paths=max_paths
+            )
+        return self.profiler
+
+    def disable_profiling(self) -> None:
+        """Stop profiling decorated functions, removing the profiling overhead"""
+        self.profiler = None
+
+    def stats(self) -> dict:
+        """Per-stage latency histograms and counters recorded while instrumentation is enabled
+
+        Returns:
+            dict: ``{"stages": {...}, "counters": {...}}``, empty if instrumentation was never enabled.
+        """
+        if self.instrumentation is None:
+            return {"stages": {}, "counters": {}}
+        return self.instrumentation.stats()
+
+    def reset_stats(self) -> None:
+        """Clear all recorded latencies and counters"""
+        if self.instrumentation is not None:
+            self.instrumentation.reset()
+
+    def enable_self_metrics(self, self_metrics: SelfMetrics = None) -> SelfMetrics:
+        """Start counting events, bytes written, errors and search latency for this logger
+
+        Args:
+            self_metrics (SelfMetrics, optional): Existing metrics to record into, e.g. to share one exporter
+                between several loggers. Defaults to a new SelfMetrics.
+
+        Returns:
+            SelfMetrics: The metrics being recorded into.
+        """
+        if self_metrics is None:
+            self_metrics = self.self_metrics or SelfMetrics()
+        self.self_metrics = self_metrics
+        self.db_client.set_self_metrics(self_metrics)
+        return self_metrics
+
+    def start_metrics_exporter(
+        self, port: int, host: str = DEFAULT_EXPORTER_HOST
+    ) -> PrometheusExporter:
+        """Serve this logger's self-metrics in Prometheus text format over HTTP
+
+        Enables self-metrics if they are not already enabled.
+
+        Args:
+            port (int): Port to listen on. Use 0 to pick a free port.
+            host (str, optional): Address to bind to. Defaults to localhost only.
+
+        Returns:
+            PrometheusExporter: The running exporter.
+        """
+        if self.metrics_exporter is not None:
+            return self.metrics_exporter
+        self.enable_self_metrics()
+        self.metrics_exporter = PrometheusExporter(
+            self.self_metrics, host=host, port=port
+        ).start()
+        return self.metrics_exporter
+
+    def stop_metrics_exporter(self) -> None:
+        """Stop serving self-metrics over HTTP"""
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+            self.metrics_exporter = None
+
+    def _stopwatch(self, prefix: str):
+        """Stopwatch for timing stages of an operation, or a no-op if instrumentation is disabled"""
+        if self.instrumentation is None:
+            return NULL_STOPWATCH
+        return self.instrumentation.stopwatch(prefix)
+
     def register_custom_metric(self, metric: str, func: Callable):
         """Register a user-defined metric on name provided, to be retrieved using provided function
 
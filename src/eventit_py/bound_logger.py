@@ -0,0 +1,179 @@
+import contextlib
+import contextvars
+import logging
+from typing import Any, Callable, Iterator, Optional, Type
+
+from eventit_py.base_logger import BaseEventLogger
+from eventit_py.pydantic_events import BaseEvent
+
+logger = logging.getLogger(__name__)
+
+# fields added to the events of every bound logger, for the current thread or asyncio task
+_context_fields: contextvars.ContextVar[Optional[dict[str, Any]]] = (
+    contextvars.ContextVar("eventit_context_fields", default=None)
+)
+
+
+@contextlib.contextmanager
+def request_context(**fields) -> Iterator[dict[str, Any]]:
+    """
+    Add fields to every event logged by bound loggers until the context exits, e.g. a request id set by middleware.
+
+    Contexts nest, inner fields taking precedence, and are local to the current thread or asyncio task.
+    Unlike bound fields, context fields are only validated with the rest of each event.
+
+    Args:
+        ``**fields``: Event fields and their values.
+
+    Yields:
+        dict[str, Any]: The fields of the context, including those of enclosing contexts.
+    """
+    outer = _context_fields.get()
+    merged = dict(outer, **fields) if outer else fields
+    token = _context_fields.set(merged)
+    try:
+        yield merged
+    finally:
+        _context_fields.reset(token)
+
+
+def _validate_fields(event_type: Type[BaseEvent], fields: dict[str, Any]) -> dict:
+    """Validate field values against an event type without requiring its other fields"""
+    unknown = fields.keys() - event_type.model_fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Fields {sorted(unknown)} are not defined on event type {event_type.__name__}"
+        )
+    # validate assignments onto an unvalidated instance, so required fields need not be bound
+    validated = event_type.model_construct()
+    for field, value in fields.items():
+        event_type.__pydantic_validator__.validate_assignment(validated, field, value)
+    return {field: getattr(validated, field) for field in fields}
+
+
+class BoundLogger:
+    """
+    Child logger with a group, event type and event fields resolved once, created with `EventLogger.bind`.
+
+    Bound fields are validated against the event type when binding, and the metrics to track are looked up
+    once into a tracking plan, so logging an event only retrieves the planned metrics and copies the bound
+    fields. Metrics that are bound as fields are not retrieved at all. Fields of the enclosing
+    `request_context` are added to each event, taking precedence over bound fields.
+
+    Args:
+        parent (BaseEventLogger): Logger whose backend and metrics are used.
+        fields (dict[str, Any]): Event fields and their values.
+        group (str, optional): Group events are logged to. Defaults to the parent's default event group.
+        event_type (Type[BaseEvent], optional): Event type logged. Defaults to the parent's default event type.
+        tracking_details (dict[str, bool], optional): Specific metrics to be tracked. Defaults to tracking all
+            builtin metrics. Custom metrics are resolved when binding, so must be registered beforehand.
+
+    Raises:
+        TypeError: If event_type is not derived from BaseEvent.
+        ValueError: If the group is not one of the parent's groups, a field is not defined on the event type
+            or is set per event (timestamp, uuid), or a tracked metric is not registered.
+        pydantic.ValidationError: If a field value is invalid.
+    """
+
+    __slots__ = (
+        "parent",
+        "fields",
+        "group",
+        "event_type",
+        "_tracking_details",
+        "_plan",
+        "_tracking_context",
+    )
+
+    def __init__(
+        self,
+        parent: BaseEventLogger,
+        fields: dict[str, Any],
+        group: str = None,
+        event_type: Type[BaseEvent] = None,
+        tracking_details: dict[str, bool] = None,
+    ) -> None:
+        if event_type is None:
+            event_type = parent._default_event_type
+        if group is None:
+            group = parent._default_event_group
+        if not issubclass(event_type, BaseEvent):
+            raise TypeError(
+                f"provided event type {event_type} is not derived from {BaseEvent}"
+            )
+        if group not in parent.groups:
+            raise ValueError(f"Invalid group {group} provided")
+        reserved = fields.keys() & parent.required_metrics
+        if reserved:
+            raise ValueError(f"Fields {sorted(reserved)} are set per event")
+        self.parent = parent
+        self.group = group
+        self.event_type = event_type
+        self.fields = _validate_fields(event_type, fields)
+        self._tracking_details = tracking_details
+        if tracking_details is None:
+            tracking_details = {metric: True for metric in parent.builtin_metrics}
+        self._plan: list[tuple[str, Callable]] = []
+        for metric, should_track in tracking_details.items():
+            if not should_track or metric in self.fields:
+                continue
+            retrieve = parent.builtin_metrics.get(
+                metric, parent.custom_metrics.get(metric)
+            )
+            if retrieve is None:
+                raise ValueError(f"Metric '{metric}' is not registered")
+            self._plan.append((metric, retrieve))
+        self._tracking_context = {"group": group}
+
+    def bind(
+        self,
+        group: str = None,
+        event_type: Type[BaseEvent] = None,
+        tracking_details: dict[str, bool] = None,
+        **fields,
+    ) -> "BoundLogger":
+        """Child of this logger, with more fields bound and optionally another group, event type or tracked metrics"""
+        return BoundLogger(
+            self.parent,
+            dict(self.fields, **fields),
+            group=group if group is not None else self.group,
+            event_type=event_type if event_type is not None else self.event_type,
+            tracking_details=(
+                tracking_details
+                if tracking_details is not None
+                else self._tracking_details
+            ),
+        )
+
+    def log_event(
+        self,
+        func: Callable = None,
+        description: str = None,
+        summary_value: Any = None,
+    ) -> None:
+        """Log an event with the bound fields, the current request context and the planned metrics
+
+        Args:
+            func (Callable, optional): Function that produced event we are logging. Defaults to None.
+            description (str, optional): Description to be included with the event, in place of a bound description.
+            summary_value (Any, optional): For countable event types with a summary, the value to add to it.
+        """
+        stopwatch = self.parent._stopwatch("log_event")
+        api_event_details = {"description": None}
+        for metric, retrieve in self._plan:
+            api_event_details[metric] = retrieve(
+                func=func, context=self._tracking_context
+            )
+        api_event_details.update(self.fields)
+        context_fields = _context_fields.get()
+        if context_fields:
+            api_event_details.update(context_fields)
+        if description is not None:
+            api_event_details["description"] = description
+        stopwatch.lap("metrics")
+        self.parent._log_details(
+            api_event_details, self.event_type, self.group, summary_value, stopwatch
+        )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"BoundLogger(group={self.group!r}, event_type={self.event_type.__name__}, fields={self.fields!r})"
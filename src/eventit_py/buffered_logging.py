@@ -0,0 +1,711 @@
+import atexit
+import importlib
+import json
+import logging
+import pathlib
+import threading
+import time
+import weakref
+from collections import deque
+from typing import List, TextIO, Type, Union
+
+from eventit_py.logging_backends import (
+    ALL_GROUPS,
+    BaseEventType,
+    BaseLoggingClient,
+    WrappingLoggingClient,
+    _result_timestamp,
+)
+from eventit_py.metrics_exporter import SelfMetrics
+from eventit_py.pydantic_events import BaseEvent
+from eventit_py.query_cache import _matches
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ["block", "drop_newest", "drop_oldest", "spill"]
+DEFAULT_MAX_QUEUE_SIZE = 10000
+DEFAULT_BLOCK_TIMEOUT = 1.0
+DEFAULT_RETRY_INTERVAL = 1.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_READ_TIMEOUT = 1.0
+# most consecutive queued events of one group written to the wrapped client at once
+WRITE_BATCH_SIZE = 1000
+# seconds the idle writer waits for events before releasing its reference to the client
+WRITER_IDLE_POLL = 1.0
+# seconds to spend writing remaining events when the interpreter exits
+EXIT_FLUSH_TIMEOUT = 5.0
+SPILL_FILENAME = "eventit-spill.jsonl"
+
+# clients still open, closed when the interpreter exits without keeping them alive until then
+_open_clients: "weakref.WeakSet[BufferedLoggingClient]" = weakref.WeakSet()
+
+
+def _close_open_clients() -> None:
+    for client in list(_open_clients):
+        client.close(EXIT_FLUSH_TIMEOUT)
+
+
+atexit.register(_close_open_clients)
+
+
+def _run_writer(client_ref: "weakref.ref[BufferedLoggingClient]") -> None:
+    """Write queued events until the client is closed or garbage collected
+
+    The client is only referenced while waiting for or writing events, so an idle client that is no longer
+    used elsewhere can be collected.
+    """
+    while True:
+        client = client_ref()
+        if client is None or not client._write_next():
+            return
+        del client
+
+
+class BufferedLoggingClient(WrappingLoggingClient):
+    """
+    Queue writes to another logging client, and perform them from a background thread.
+
+    Memory use is capped by `max_queue_size`. When the queue is full, `overflow_policy` decides what happens:
+
+    - ``block``: wait up to `block_timeout` seconds for space, then drop the new event.
+    - ``drop_newest``: drop the new event.
+    - ``drop_oldest``: drop the oldest queued event to make space for the new one.
+    - ``spill``: append the new event to a local disk buffer, replayed once the queue has drained.
+      While spilled events are pending, new events are spilled too, so that events are written in order.
+
+    Consecutive queued events of the same group are written together with the wrapped client's `log_messages`,
+    up to WRITE_BATCH_SIZE at a time. A batch that fails is retried up to `max_retries` times, then spilled
+    under the "spill" policy, or dropped and counted in `dropped` otherwise.
+
+    Searches, counts and updates wait up to `read_timeout` seconds for queued events to be written, so callers
+    read their own writes without stalling on a slow backend. If events are still queued after the timeout,
+    searches and counts by query also include matching queued events, and reads go to the wrapped client.
+    Unordered or descending searches with a limit, like the window lookups of countable events, are answered
+    from queued and in-flight events without waiting when enough of them match.
+    Updates of events that are still queued are applied to the queued event. Updates of events that are being
+    written are applied to the wrapped client once the write finishes.
+
+    Args:
+        client (BaseLoggingClient): The client that events are written to.
+        max_queue_size (int, optional): Maximum number of queued events. Defaults to 10000.
+        overflow_policy (str, optional): One of OVERFLOW_POLICIES. Defaults to "block".
+        block_timeout (float, optional): Seconds to wait for space under the "block" policy. Defaults to 1.
+        spill_directory (str, optional): Directory for the spill file. Required for the "spill" policy.
+        retry_interval (float, optional): Seconds to wait before retrying after the wrapped client fails.
+            Defaults to 1.
+        max_retries (int, optional): Number of times a failed batch is retried. Defaults to 3.
+        read_timeout (float, optional): Seconds reads wait for queued events to be written.
+            None waits until they are. Defaults to 1.
+
+    Attributes:
+        dropped (dict[str, int]): Number of dropped events per group.
+        spilled (dict[str, int]): Number of spilled events per group.
+    """
+
+    def __init__(
+        self,
+        client: BaseLoggingClient,
+        max_queue_size: int = DEFAULT_MAX_QUEUE_SIZE,
+        overflow_policy: str = "block",
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+        spill_directory: str = None,
+        retry_interval: float = DEFAULT_RETRY_INTERVAL,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Invalid overflow policy {overflow_policy}, expected one of {OVERFLOW_POLICIES}"
+            )
+        if max_queue_size <= 0:
+            raise ValueError("max_queue_size must be greater than 0")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        if overflow_policy == "spill" and spill_directory is None:
+            raise ValueError(
+                "spill_directory is required for the spill overflow policy"
+            )
+        super().__init__(client)
+        self._max_queue_size = max_queue_size
+        self._overflow_policy = overflow_policy
+        self._block_timeout = block_timeout
+        self._retry_interval = retry_interval
+        self._max_retries = max_retries
+        self._read_timeout = read_timeout
+
+        # queued [message, group] entries, and the same entries by event uuid, so queued events can be updated
+        self._queue: deque[list] = deque()
+        self._queued: dict[str, list] = {}
+        self._queue_depths: dict[str, int] = {group: 0 for group in self._groups}
+        # batch being written by the writer thread
+        self._in_flight = 0
+        self._writing: List[BaseEvent] = []
+        self._writing_group: str = None
+        # positions of the in-flight events by uuid, and their updates to apply once the batch is written
+        self._writing_index: dict[str, int] = {}
+        self._pending_updates: dict[str, BaseEvent] = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        self.dropped: dict[str, int] = {group: 0 for group in self._groups}
+        self.spilled: dict[str, int] = {group: 0 for group in self._groups}
+
+        # spilled events are appended as json lines, and replayed from _spill_offset.
+        # The spill file is written and read outside the queue lock, under _spill_lock
+        self._spill_path: pathlib.Path = None
+        self._spill_lock = threading.Lock()
+        self._spill_file: TextIO = None
+        self._spill_reader: TextIO = None
+        self._spill_pending = 0
+        self._spill_offset = 0
+        self._spill_types: dict[tuple[str, str], Type[BaseEvent]] = {}
+        if spill_directory is not None:
+            spill_directory = pathlib.Path(spill_directory)
+            spill_directory.mkdir(parents=True, exist_ok=True)
+            self._spill_path = spill_directory.joinpath(SPILL_FILENAME)
+            if self._spill_path.exists():
+                # replay events spilled by a previous process
+                with open(self._spill_path, "rb") as spill_file:
+                    self._spill_pending = sum(1 for _ in spill_file)
+
+        self._writer = threading.Thread(
+            target=_run_writer,
+            args=(weakref.ref(self),),
+            name="eventit-buffered-writer",
+            daemon=True,
+        )
+        self._writer.start()
+        _open_clients.add(self)
+
+    def queue_depth(self, group: str = None) -> int:
+        """Number of queued events, for one group or in total"""
+        if group is None:
+            return len(self._queue)
+        return self._queue_depths.get(group, 0)
+
+    def overflow_counts(self) -> dict[str, dict[str, int]]:
+        """Dropped and spilled event counts per group
+
+        Returns:
+            dict[str, dict[str, int]]: ``{"dropped": {group: count}, "spilled": {group: count}}``
+        """
+        with self._condition:
+            return {"dropped": dict(self.dropped), "spilled": dict(self.spilled)}
+
+    def set_self_metrics(self, self_metrics: SelfMetrics = None) -> None:
+        super().set_self_metrics(self_metrics)
+        if self_metrics is None:
+            return
+        for group in self._groups:
+            self_metrics.set_gauge(
+                "queue_depth",
+                lambda group=group: self._queue_depths[group],
+                group=group,
+                backend=self.backend_name,
+            )
+
+    def log_message(self, message: BaseEvent, group: str) -> None:
+        """
+        Queue a message to be written to the specified group.
+
+        Args:
+            message (BaseEvent): The message to be logged.
+            group (str): The group to log the message to.
+
+        Raises:
+            ValueError: If an invalid group is provided, or the client has been closed.
+        """
+        self.log_messages([message], group)
+
+    def log_messages(self, messages: List[BaseEvent], group: str) -> None:
+        """
+        Queue messages to be written to the specified group, applying the overflow policy to each.
+
+        Args:
+            messages (List[BaseEvent]): The messages to be logged.
+            group (str): The group to log the messages to.
+
+        Raises:
+            ValueError: If an invalid group is provided, or the client has been closed.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        spilled = []
+        with self._condition:
+            if self._closed:
+                raise ValueError("Cannot log to a closed BufferedLoggingClient")
+            for message in messages:
+                # once a message is spilled, the rest of the batch is too, to keep their order
+                if spilled or self._enqueue(message, group):
+                    spilled.append(message)
+            if spilled:
+                self._reserve_spill(len(spilled), group)
+            self._condition.notify_all()
+        if spilled:
+            self._write_spill(spilled, group)
+
+    def _enqueue(self, message: BaseEvent, group: str) -> bool:
+        """Queue a message, or apply the overflow policy. Must be called with the condition held.
+
+        Returns:
+            bool: True if the message must be spilled.
+        """
+        if self._spill_pending:
+            return True
+        if len(self._queue) >= self._max_queue_size:
+            if self._overflow_policy == "block":
+                # let the writer start on what is queued so far
+                self._condition.notify_all()
+                self._condition.wait_for(
+                    lambda: len(self._queue) < self._max_queue_size,
+                    timeout=self._block_timeout,
+                )
+            if self._overflow_policy == "spill":
+                return True
+            if self._overflow_policy == "drop_oldest":
+                self._count_dropped(self._pop_queued()[1])
+            elif len(self._queue) >= self._max_queue_size:
+                # drop_newest, or block timed out
+                self._count_dropped(group)
+                return False
+        entry = [message, group]
+        self._queue.append(entry)
+        self._queued[str(message.uuid)] = entry
+        self._queue_depths[group] += 1
+        return False
+
+    def _pop_queued(self) -> list:
+        """Remove the oldest queued entry. Must be called with the condition held."""
+        entry = self._queue.popleft()
+        key = str(entry[0].uuid)
+        if self._queued.get(key) is entry:
+            del self._queued[key]
+        self._queue_depths[entry[1]] -= 1
+        return entry
+
+    def _count_dropped(self, group: str, count: int = 1) -> None:
+        self.dropped[group] += count
+        if self._self_metrics is not None:
+            self._self_metrics.increment(
+                "dropped_events_total", count, group=group, backend=self.backend_name
+            )
+
+    def _reserve_spill(self, count: int, group: str) -> None:
+        """Count messages as spilled, and take the spill lock for `_write_spill`.
+
+        Must be called with the condition held, so that spilled messages are written in the order they were
+        reserved, and the replay waits until they have been written.
+        """
+        self._spill_pending += count
+        self.spilled[group] += count
+        if self._self_metrics is not None:
+            self._self_metrics.increment(
+                "spilled_events_total", count, group=group, backend=self.backend_name
+            )
+        self._spill_lock.acquire()
+
+    def _write_spill(self, messages: List[BaseEvent], group: str) -> None:
+        """Append reserved messages to the spill file, and release the spill lock"""
+        try:
+            records = []
+            for message in messages:
+                event_type = type(message)
+                type_key = (event_type.__module__, event_type.__qualname__)
+                self._spill_types[type_key] = event_type
+                record = {
+                    "group": group,
+                    "module": type_key[0],
+                    "qualname": type_key[1],
+                    "event": message.model_dump_json(exclude_none=self.exclude_none),
+                }
+                records.append(json.dumps(record))
+            if self._spill_file is None:
+                self._spill_file = open(self._spill_path, "a", encoding="utf-8")
+            self._spill_file.write("\n".join(records) + "\n")
+            self._spill_file.flush()
+        except Exception:
+            # the replay discards lines it cannot read
+            logger.exception(
+                "Failed to spill %d events of group %s", len(messages), group
+            )
+        finally:
+            self._spill_lock.release()
+
+    def _close_spill_files(self) -> None:
+        for spill_file in (self._spill_file, self._spill_reader):
+            if spill_file is not None:
+                spill_file.close()
+        self._spill_file = None
+        self._spill_reader = None
+
+    def _resolve_spilled_type(self, module: str, qualname: str) -> Type[BaseEvent]:
+        event_type = self._spill_types.get((module, qualname))
+        if event_type is None:
+            event_type = importlib.import_module(module)
+            for name in qualname.split("."):
+                event_type = getattr(event_type, name)
+            self._spill_types[(module, qualname)] = event_type
+        return event_type
+
+    def _replay_spilled(self) -> bool:
+        """Write the next spilled event to the wrapped client
+
+        Returns:
+            bool: False if the event could not be written, and should be retried later.
+        """
+        with self._spill_lock:
+            try:
+                if self._spill_reader is None:
+                    self._spill_reader = open(self._spill_path, "r", encoding="utf-8")
+                self._spill_reader.seek(self._spill_offset)
+                line = self._spill_reader.readline()
+                next_offset = self._spill_reader.tell()
+            except FileNotFoundError:
+                line = None
+        if line is None:
+            logger.error("Spill file %s disappeared", self._spill_path)
+            with self._condition:
+                self._spill_pending = 0
+                self._spill_offset = 0
+                self._close_spill_files()
+                self._condition.notify_all()
+            return True
+        try:
+            record = json.loads(line)
+            event_type = self._resolve_spilled_type(
+                record["module"], record["qualname"]
+            )
+            message = event_type.model_validate_json(record["event"])
+        except Exception:
+            logger.exception("Discarding unreadable spilled event: %s", line)
+            record = None
+        if record is not None:
+            try:
+                self._client.log_message(message, record["group"])
+            except Exception:
+                logger.exception("Failed to write spilled event, retrying later")
+                return False
+        with self._condition:
+            self._spill_offset = next_offset
+            self._spill_pending -= 1
+            if self._spill_pending == 0:
+                # everything spilled has been replayed (and no spill is reserved), so start the buffer afresh
+                self._close_spill_files()
+                self._spill_path.unlink(missing_ok=True)
+                self._spill_offset = 0
+            self._condition.notify_all()
+        return True
+
+    def _write_next(self) -> bool:
+        """Write the next batch of queued events, or the next spilled event
+
+        Returns:
+            bool: False once the client is closed and every event has been handled.
+        """
+        with self._condition:
+            has_work = self._condition.wait_for(
+                lambda: self._queue or self._spill_pending or self._closed,
+                timeout=WRITER_IDLE_POLL,
+            )
+            if not has_work:
+                return True
+            if not self._queue and not self._spill_pending:
+                return False
+            batch = []
+            group = None
+            if self._queue:
+                group = self._queue[0][1]
+                while (
+                    self._queue
+                    and self._queue[0][1] == group
+                    and len(batch) < WRITE_BATCH_SIZE
+                ):
+                    batch.append(self._pop_queued()[0])
+                self._in_flight += len(batch)
+                # a copy, so updates of in-flight events do not change the batch while it is written
+                self._writing = list(batch)
+                self._writing_group = group
+                self._writing_index = {
+                    str(message.uuid): position
+                    for position, message in enumerate(batch)
+                }
+                # make space for producers blocked on a full queue
+                self._condition.notify_all()
+        if not batch:
+            if not self._replay_spilled():
+                time.sleep(self._retry_interval)
+            return True
+        self._write_batch(batch, group)
+        return True
+
+    def _write_batch(self, batch: List[BaseEvent], group: str) -> None:
+        """Write a batch to the wrapped client, retrying it, then spilling or dropping it if it keeps failing
+
+        A batch that failed part way through may be written twice by a retry.
+        """
+        failed = True
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                time.sleep(self._retry_interval)
+            try:
+                if len(batch) == 1:
+                    self._client.log_message(batch[0], group)
+                else:
+                    self._client.log_messages(batch, group)
+            except Exception:
+                logger.exception(
+                    "Failed to write %d buffered events to group %s (attempt %d of %d)",
+                    len(batch),
+                    group,
+                    attempt + 1,
+                    self._max_retries + 1,
+                )
+                continue
+            failed = False
+            break
+        while True:
+            with self._condition:
+                updates = self._pending_updates
+                self._pending_updates = {}
+                if failed or not updates:
+                    # spilled events include their updates, and dropped ones lose them
+                    batch = self._writing
+                    break
+            # the events stay in flight, so later updates of them are queued behind these
+            for event in updates.values():
+                self._apply_update(event, group)
+        spill = failed and self._overflow_policy == "spill"
+        with self._condition:
+            self._in_flight -= len(batch)
+            self._writing = []
+            self._writing_group = None
+            self._writing_index = {}
+            if spill:
+                self._reserve_spill(len(batch), group)
+            elif failed:
+                logger.error(
+                    "Dropped %d buffered events of group %s after %d failed attempts",
+                    len(batch),
+                    group,
+                    self._max_retries + 1,
+                )
+                self._count_dropped(group, len(batch))
+            self._condition.notify_all()
+        if spill:
+            self._write_spill(batch, group)
+
+    def _apply_update(self, event: BaseEvent, group: str) -> None:
+        """Apply an update of an event written by the writer thread, retrying it like a batch"""
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                time.sleep(self._retry_interval)
+            try:
+                response = self._client.update_event_by_uuid(
+                    group=group, event=event, event_type=type(event)
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to update buffered event %s in group %s (attempt %d of %d)",
+                    event.uuid,
+                    group,
+                    attempt + 1,
+                    self._max_retries + 1,
+                )
+                continue
+            if response["modified_count"] != 1:
+                logger.error(
+                    "Buffered event %s was not found in group %s to update",
+                    event.uuid,
+                    group,
+                )
+            return
+        logger.error(
+            "Dropped update of buffered event %s in group %s after %d failed attempts",
+            event.uuid,
+            group,
+            self._max_retries + 1,
+        )
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until every queued and spilled event has been written
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting forever.
+
+        Returns:
+            bool: True if all events were written before the timeout.
+        """
+        if threading.current_thread() is self._writer:
+            return False
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: (
+                    not self._queue and not self._in_flight and not self._spill_pending
+                ),
+                timeout=timeout,
+            )
+
+    def close(self, timeout: float = None) -> bool:
+        """Write remaining events, stop the background writer, and close the wrapped client
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait for remaining events.
+
+        Returns:
+            bool: True if all events were written before the timeout.
+        """
+        flushed = self.flush(timeout=timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if flushed:
+            self._writer.join(timeout)
+        _open_clients.discard(self)
+        super().close()
+        return flushed
+
+    def _wait_for_writes(self) -> bool:
+        """Wait up to read_timeout for queued events to be written, so reads see them
+
+        Returns:
+            bool: False if events are still queued or being written.
+        """
+        if self.flush(timeout=self._read_timeout):
+            return True
+        logger.debug(
+            "Reading while %d events are still queued for writing", len(self._queue)
+        )
+        return False
+
+    def _pending_events(
+        self,
+        query_dict: dict,
+        group: str,
+        event_type: BaseEventType,
+        include_in_flight: bool = True,
+    ) -> List[BaseEvent]:
+        """Copies of the queued (and optionally in-flight) events of a group matching a query, oldest first"""
+        with self._condition:
+            candidates = [
+                message for message, entry_group in self._queue if entry_group == group
+            ]
+            if include_in_flight and self._writing_group == group:
+                candidates = self._writing + candidates
+        return [
+            message.model_copy()
+            for message in candidates
+            if isinstance(message, event_type) and _matches(message, query_dict)
+        ]
+
+    def search_events_by_timestamp(self, *args, **kwargs):
+        self._wait_for_writes()
+        return self._client.search_events_by_timestamp(*args, **kwargs)
+
+    def search_events_by_query(
+        self,
+        query_dict: dict,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
+    ) -> List[BaseEventType]:
+        buffered = (
+            fields is None
+            and not raw
+            and isinstance(group, str)
+            and group != ALL_GROUPS
+        )
+        if buffered and limit and order != "asc":
+            # written events may match too, but any matches answer an unordered search, and buffered events
+            # are newer than written ones. Countable events look up their window this way on every call.
+            pending = self._pending_events(query_dict, group, event_type)
+            if len(pending) >= limit:
+                pending.sort(key=_result_timestamp, reverse=order == "desc")
+                return pending[:limit]
+        written = self._wait_for_writes()
+        results = self._client.search_events_by_query(
+            query_dict,
+            group,
+            event_type,
+            limit=limit,
+            fields=fields,
+            raw=raw,
+            order=order,
+        )
+        if written or not buffered:
+            return results
+        # events still queued are matched in memory, and in-flight ones replace their written version,
+        # which may predate an update
+        pending = self._pending_events(query_dict, group, event_type)
+        if not pending:
+            return results
+        buffered_uuids = {str(message.uuid) for message in pending}
+        results = [
+            result for result in results if str(result.uuid) not in buffered_uuids
+        ]
+        merged = sorted(
+            results + pending, key=_result_timestamp, reverse=order == "desc"
+        )
+        return merged[:limit] if limit else merged
+
+    def search_events_page(self, *args, **kwargs):
+        self._wait_for_writes()
+        return self._client.search_events_page(*args, **kwargs)
+
+    def count_events_by_query(
+        self, query_dict: dict, group: Union[str, List[str]], event_type: BaseEventType
+    ) -> int:
+        written = self._wait_for_writes()
+        count = self._client.count_events_by_query(query_dict, group, event_type)
+        if written or not isinstance(group, str) or group == ALL_GROUPS:
+            return count
+        # in-flight events may or may not have been written yet, so only queued events are added
+        return count + len(
+            self._pending_events(query_dict, group, event_type, include_in_flight=False)
+        )
+
+    def get_event_by_uuid(
+        self, uuid_obj: str, group: str, event_type: BaseEventType
+    ) -> BaseEventType:
+        with self._condition:
+            entry = self._queued.get(str(uuid_obj))
+            if entry is not None and entry[1] == group:
+                return entry[0].model_copy()
+            position = self._writing_index.get(str(uuid_obj))
+            if position is not None and self._writing_group == group:
+                return self._writing[position].model_copy()
+        self._wait_for_writes()
+        return self._client.get_event_by_uuid(uuid_obj, group, event_type)
+
+    def update_event_by_uuid(
+        self, group: str, event: BaseEvent, event_type: BaseEventType = None
+    ) -> dict[str, int]:
+        with self._condition:
+            entry = self._queued.get(str(event.uuid))
+            if entry is not None and entry[1] == group:
+                # the event has not been written yet, so the update is written in its place
+                entry[0] = event
+                return {"matched_count": 1, "modified_count": 1}
+            position = self._writing_index.get(str(event.uuid))
+            if position is not None and self._writing_group == group:
+                # the event is being written, so the update is applied after it
+                self._writing[position] = event
+                self._pending_updates[str(event.uuid)] = event
+                return {"matched_count": 1, "modified_count": 1}
+        self._wait_for_writes()
+        return self._client.update_event_by_uuid(
+            group=group, event=event, event_type=event_type
+        )
+
+    def subscribe(self, *args, **kwargs):
+        self._wait_for_writes()
+        return self._client.subscribe(*args, **kwargs)
+
+    def register_count_query(self, *args, **kwargs):
+        self._wait_for_writes()
+        return self._client.register_count_query(*args, **kwargs)
+
+    def get_materialized_count(self, *args, **kwargs):
+        self._wait_for_writes()
+        return self._client.get_materialized_count(*args, **kwargs)
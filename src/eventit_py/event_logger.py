@@ -1,18 +1,100 @@
+import atexit
 import datetime
 import functools
+import inspect
+import json
 import logging
-from typing import Any, Callable, Type
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine, Iterator, Type, Union
+
+from pydantic import TypeAdapter
 
 from eventit_py.base_logger import BaseEventLogger
+from eventit_py.bound_logger import BoundLogger
+from eventit_py.profiling import CallTreeProfiler, frame_name
 from eventit_py.pydantic_events import (
     BaseCountableEvent,
+    BaseDistinctCountEvent,
     BaseEvent,
+    BaseGaugeEvent,
+    BaseTimedEvent,
+    BaseTopEvent,
     _handle_timestamp,
     _subtract_time_delta,
 )
+from eventit_py.sketches import HyperLogLog, LogLinearHistogram
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+@functools.lru_cache(maxsize=None)
+def _batch_adapter(event_type: Type[BaseEvent]) -> TypeAdapter:
+    """Validator for a list of events of one type, built once per event type"""
+    return TypeAdapter(list[event_type])
+
+
+def _rollup_ranges(
+    sizes: list[int], start_time: datetime.datetime, end_time: datetime.datetime
+) -> list[tuple[int, datetime.datetime, datetime.datetime]]:
+    """
+    Split a time range into ranges aligned to window sizes, using the coarsest size wherever it fits.
+
+    Args:
+        sizes (list[int]): Window sizes in seconds, finest first, each a multiple of the previous.
+        start_time (datetime.datetime): Start of the range.
+        end_time (datetime.datetime): End of the range, excluded.
+
+    Returns:
+        list[tuple[int, datetime.datetime, datetime.datetime]]: Window size, start and (excluded) end of each range.
+    """
+    if start_time >= end_time:
+        return []
+    size = sizes[-1]
+    if len(sizes) == 1:
+        return [(size, start_time, end_time)]
+    delta = datetime.timedelta(seconds=size)
+    inner_start, remainder = _subtract_time_delta(start_time, delta)
+    if remainder:
+        inner_start += delta
+    inner_end = _subtract_time_delta(end_time, delta)[0]
+    if inner_start >= inner_end:
+        return _rollup_ranges(sizes[:-1], start_time, end_time)
+    return (
+        _rollup_ranges(sizes[:-1], start_time, inner_start)
+        + [(size, inner_start, inner_end)]
+        + _rollup_ranges(sizes[:-1], inner_end, end_time)
+    )
+
+
+@types.coroutine
+def _await_with_cpu_time(coroutine: Coroutine, cpu_time: list[float]) -> Any:
+    """Await a coroutine, adding the CPU time its steps take to cpu_time[0]
+
+    Other tasks run on the thread while the coroutine waits, so only the steps of the coroutine itself are timed.
+    """
+    send, value = coroutine.send, None
+    while True:
+        start = time.thread_time()
+        try:
+            yielded = send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            cpu_time[0] += time.thread_time() - start
+        try:
+            value = yield yielded
+            send = coroutine.send
+        except GeneratorExit:
+            coroutine.close()
+            raise
+        except BaseException as exc:
+            # e.g. the task was cancelled while waiting
+            send, value = coroutine.throw, exc
+
 
 class EventLogger(BaseEventLogger):
     def retrieve_metric(
@@ -45,6 +127,7 @@ class EventLogger(BaseEventLogger):
         tracking_details: dict[str, bool] = None,
         event_type: Type[BaseEvent] = None,
         group: str = None,
+        summary_value: Any = None,
     ) -> None:
         """Main function used to log information. Inherits builtin metrics from BaseEventLogger.
 
@@ -53,6 +136,8 @@ class EventLogger(BaseEventLogger):
             description (str, optional): Description to be included with the event being logged.
             tracking_details (dict[str, bool], optional): Specific metrics to be tracked. Defaults to tracking all builtin metrics.
             event_type (Callable): Event type (as pydantic model) used for pydantic type validation.
+            summary_value (Any, optional): For countable event types with a summary, the value to add to it in place
+                of the summarised field's metric, e.g. call durations for BaseTimedEvent.
 
         Raises:
             NotImplementedError: If logging backend specified in class constructor is not yet implemented.
@@ -75,6 +160,7 @@ class EventLogger(BaseEventLogger):
 
         Note: This method assumes the existence of a `db_client` attribute in the class, which is responsible for logging the event.
         """
+        stopwatch = self._stopwatch("log_event")
         if event_type is None:
             event_type = self._default_event_type
         if group is None:
@@ -99,10 +185,111 @@ class EventLogger(BaseEventLogger):
             api_event_details[metric] = self.retrieve_metric(
                 metric=metric, func=func, context=tracking_context
             )
+        stopwatch.lap("metrics")
+        self._log_details(
+            api_event_details, event_type, group, summary_value, stopwatch
+        )
+
+    def log_events(
+        self,
+        events: list[Union[dict[str, Any], BaseEvent]],
+        func: Callable = None,
+        description: str = None,
+        tracking_details: dict[str, bool] = None,
+        event_type: Type[BaseEvent] = None,
+        group: str = None,
+    ) -> None:
+        """Log a batch of events, validating the whole batch at once and writing it in a single backend operation.
+
+        Metrics are retrieved once for the batch and added to every event given as a dict of fields.
+
+        Args:
+            events (list[dict[str, Any] | BaseEvent]): Fields of each event, or events already created.
+            func (Callable, optional): Function that produced the events. Defaults to None.
+            description (str, optional): Description to be included with events that do not set their own.
+            tracking_details (dict[str, bool], optional): Specific metrics to be tracked. Defaults to tracking all builtin metrics.
+            event_type (Type[BaseEvent], optional): Event type (as pydantic model) used for pydantic type validation.
+            group (str, optional): Group identifier for the events.
+
+        Raises:
+            TypeError: If event_type is not derived from BaseEvent, or is a countable event,
+                which is aggregated per window with log_event instead.
+            pydantic.ValidationError: If any event is invalid, in which case none are logged.
+        """
+        stopwatch = self._stopwatch("log_events")
+        if event_type is None:
+            event_type = self._default_event_type
+        if group is None:
+            group = self._default_event_group
+        if not issubclass(event_type, BaseEvent):
+            raise TypeError(
+                f"provided event type {event_type} is not derived from {self._default_event_type}"
+            )
+        if issubclass(event_type, BaseCountableEvent):
+            raise TypeError(
+                f"countable event type {event_type} cannot be logged in bulk, use log_event"
+            )
+        if tracking_details is None:
+            tracking_details = {metric: True for metric in self.builtin_metrics}
+        shared_details = {"description": description}
+        tracking_context = {"group": group}
+        for metric, should_track in tracking_details.items():
+            if should_track:
+                shared_details[metric] = self.retrieve_metric(
+                    metric=metric, func=func, context=tracking_context
+                )
+        records = [
+            event if isinstance(event, BaseEvent) else {**shared_details, **event}
+            for event in events
+        ]
+        stopwatch.lap("metrics")
+
+        messages = _batch_adapter(event_type).validate_python(records)
+        stopwatch.lap("validation")
+        self.db_client.log_messages(messages=messages, group=group)
+        stopwatch.lap("backend")
+        stopwatch.stop()
+
+    def bind(
+        self,
+        group: str = None,
+        event_type: Type[BaseEvent] = None,
+        tracking_details: dict[str, bool] = None,
+        **fields,
+    ) -> BoundLogger:
+        """Child logger logging events with the given fields, validated and resolved once rather than per event
+
+        Args:
+            group (str, optional): Group events are logged to. Defaults to the default event group.
+            event_type (Type[BaseEvent], optional): Event type logged. Defaults to the default event type.
+            tracking_details (dict[str, bool], optional): Specific metrics to be tracked. Defaults to tracking all builtin metrics.
+            ``**fields``: Event fields and their values, e.g. ``user="alice"``.
 
+        Returns:
+            BoundLogger: The child logger. Fields of the enclosing `request_context` are added to its events.
+        """
+        return BoundLogger(
+            self,
+            fields,
+            group=group,
+            event_type=event_type,
+            tracking_details=tracking_details,
+        )
+
+    def _log_details(
+        self,
+        api_event_details: dict,
+        event_type: Type[BaseEvent],
+        group: str,
+        summary_value: Any,
+        stopwatch,
+    ) -> None:
+        """Validate and write an event from its resolved details, shared by log_event and bound loggers"""
         # check if event_type is a countable event, and
         # attempt to retrieve event from within time range, if possible
         if issubclass(event_type, BaseCountableEvent):
+            if summary_value is not None:
+                api_event_details[event_type.summary_field()] = summary_value
             self.log_countable_event(
                 api_event_details=api_event_details,
                 event_type=event_type,
@@ -111,9 +298,12 @@ class EventLogger(BaseEventLogger):
         else:
             # make event from details
             event = event_type(**api_event_details)
+            stopwatch.lap("validation")
 
             # log to chosen db client
             self.db_client.log_message(message=event, group=group)
+            stopwatch.lap("backend")
+        stopwatch.stop()
 
     def log_countable_event(
         self,
@@ -121,6 +311,7 @@ class EventLogger(BaseEventLogger):
         event_type: Type[BaseCountableEvent],
         group: str,
     ):
+        stopwatch = self._stopwatch("log_countable_event")
         # get time window from tracking details, default to using event_type time window
         time_window = datetime.timedelta(
             seconds=(
@@ -134,6 +325,18 @@ class EventLogger(BaseEventLogger):
         # compute even division of time for timestamp based on current timestamp and time_window
         timestamp = _subtract_time_delta(current_timestamp, time_window)[0]
         api_event_details["timestamp"] = timestamp
+        # rollup documents share the fields of their events, and are told apart by their time window
+        api_event_details["time_window"] = int(time_window.total_seconds())
+        summary_value = None
+        if event_type.summary_field() is not None:
+            # the summarised field is only kept in the window's summary, so it does not key the window
+            summary_value = api_event_details.pop(event_type.summary_field(), None)
+        if event_type.write_on_close:
+            # summaries such as top tables are kept in memory, and written once their window closes
+            self._track_rollup(api_event_details, event_type, group, summary_value)
+            stopwatch.lap("rollup")
+            stopwatch.stop()
+            return
         # try to find event with matching timestamp
         assert timestamp.timestamp() % int(time_window.total_seconds()) == 0
 
@@ -143,19 +346,31 @@ class EventLogger(BaseEventLogger):
             event_type=event_type,
             limit=1,
         )
+        stopwatch.lap("lookup")
 
         # no event for the current time window exists, so we make it
         if len(event) == 0:
             # make event from details
             event = event_type(**api_event_details)
+            if summary_value is not None:
+                summary = event_type.new_summary()
+                summary.add(summary_value)
+                event.merge_summary(summary)
+            stopwatch.lap("validation")
 
             # log message here
             self.db_client.log_message(message=event, group=group)
+            stopwatch.lap("backend")
 
         else:
             event = event_type.model_validate(event[0])
             # increment event count
             event.count += 1
+            if summary_value is not None:
+                summary = event_type.new_summary()
+                summary.add(summary_value)
+                event.merge_summary(summary)
+            stopwatch.lap("validation")
 
             # update in db based on uuid
             response = self.db_client.update_event_by_uuid(
@@ -165,6 +380,571 @@ class EventLogger(BaseEventLogger):
                 raise ValueError(
                     f"failed to update event with uuid {event.uuid} in group {group}"
                 )
+            stopwatch.lap("backend")
+
+        if self.rollup_tiers:
+            self._track_rollup(api_event_details, event_type, group, summary_value)
+            stopwatch.lap("rollup")
+        stopwatch.stop()
+
+    def _rollup_tiers_for(self, time_window: int) -> list[int]:
+        """Rollup tiers that are whole multiples of a countable event's time window"""
+        return [
+            tier
+            for tier in self.rollup_tiers
+            if tier > time_window and tier % time_window == 0
+        ]
+
+    def _track_rollup(
+        self,
+        api_event_details: dict,
+        event_type: Type[BaseCountableEvent],
+        group: str,
+        summary_value: Any = None,
+    ) -> None:
+        """Count an event towards its window's rollup, and roll up windows that have closed"""
+        window_start = api_event_details["timestamp"]
+        fields = {
+            field: value
+            for field, value in api_event_details.items()
+            if field != "timestamp"
+        }
+        key = (group, event_type, json.dumps(fields, sort_keys=True, default=str))
+        with self._rollup_lock:
+            if not self._rollup_pending and not self._rollup_exit_registered:
+                # write out open windows if the process exits without flushing
+                atexit.register(self.flush_rollups)
+                self._rollup_exit_registered = True
+            pending = self._rollup_pending.get(key)
+            if pending is not None and pending[3] == window_start:
+                if summary_value is not None:
+                    pending[5].add(summary_value)
+                self._rollup_pending[key] = pending[:4] + (pending[4] + 1, pending[5])
+                return
+            # summarised values of the window are kept in a summary, to be merged into the tiers
+            summary = event_type.new_summary()
+            if summary is not None and summary_value is not None:
+                summary.add(summary_value)
+            # a window has started, so every pending window that ended before it has closed
+            closed = [
+                pending_key
+                for pending_key, (_, _, pending_fields, start, _, _) in (
+                    self._rollup_pending.items()
+                )
+                if pending_key == key
+                or start + datetime.timedelta(seconds=pending_fields["time_window"])
+                <= window_start
+            ]
+            closed_windows = [
+                self._rollup_pending.pop(pending_key) for pending_key in closed
+            ]
+            self._rollup_pending[key] = (
+                group,
+                event_type,
+                fields,
+                window_start,
+                1,
+                summary,
+            )
+        if closed_windows:
+            self._roll_up_in_background(closed_windows)
+
+    def _rollup_thread(self) -> ThreadPoolExecutor:
+        """Single thread rolling up windows in the order they closed, so each tier document has one writer"""
+        with self._rollup_lock:
+            if self._rollup_executor is None:
+                self._rollup_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="eventit-rollups"
+                )
+            return self._rollup_executor
+
+    def _roll_up_in_background(self, windows: list[tuple]) -> None:
+        try:
+            self._rollup_thread().submit(self._roll_up_closed, windows)
+        except RuntimeError:
+            # the interpreter is exiting, and no longer runs new work on other threads
+            self._roll_up(windows)
+
+    def _roll_up_closed(self, windows: list[tuple]) -> None:
+        try:
+            self._roll_up(windows)
+        except Exception:
+            logger.exception(
+                "Failed to roll up %d countable event windows", len(windows)
+            )
+
+    def _wait_for_rollups(self) -> None:
+        """Wait until the windows handed to the rollup thread have been rolled up"""
+        executor = self._rollup_executor
+        if executor is None:
+            return
+        try:
+            done = executor.submit(lambda: None)
+        except RuntimeError:
+            # the interpreter is exiting, and the rollup thread finishes its work before it stops
+            return
+        done.result()
+
+    def _roll_up(self, windows: list[tuple]) -> None:
+        """Add the counts (and summaries) of countable event windows to the windows of each rollup tier containing them
+
+        Windows of write_on_close events are only held in memory, so they are written to their own window first.
+        """
+        for group, event_type, fields, window_start, count, summary in windows:
+            time_window = fields["time_window"]
+            sizes = self._rollup_tiers_for(time_window)
+            if event_type.write_on_close:
+                sizes = [time_window] + sizes
+            for size in sizes:
+                target_group = group
+                tier_details = dict(fields, time_window=size)
+                tier_details["timestamp"] = _subtract_time_delta(
+                    window_start, datetime.timedelta(seconds=size)
+                )[0]
+                if size != time_window and self._rollup_group not in (None, group):
+                    target_group = self._rollup_group
+                    tier_details["group"] = group
+                rollup = self.db_client.search_events_by_query(
+                    query_dict=tier_details,
+                    group=target_group,
+                    event_type=event_type,
+                    limit=1,
+                )
+                if len(rollup) == 0:
+                    rollup = event_type(**tier_details, count=count)
+                    if summary is not None:
+                        rollup.merge_summary(summary)
+                    self.db_client.log_message(message=rollup, group=target_group)
+                    continue
+                rollup = event_type.model_validate(rollup[0])
+                rollup.count += count
+                if summary is not None:
+                    rollup.merge_summary(summary)
+                self.db_client.update_event_by_uuid(
+                    group=target_group, event=rollup, event_type=event_type
+                )
+
+    def flush_rollups(self) -> None:
+        """Add the counts of windows that are still open to the rollup tiers, and write open top event tables
+
+        Windows are otherwise rolled up on a background thread once they have closed, when the next window is logged,
+        or when the process exits.
+        """
+        with self._rollup_lock:
+            windows = list(self._rollup_pending.values())
+            self._rollup_pending.clear()
+        if not windows:
+            self._wait_for_rollups()
+            return
+        try:
+            # after the windows that closed earlier
+            rolled_up = self._rollup_thread().submit(self._roll_up, windows)
+        except RuntimeError:
+            # the interpreter is exiting, and the rollup thread finished its work before it stopped
+            self._roll_up(windows)
+            return
+        rolled_up.result()
+
+    def flush(self, timeout: float = None) -> bool:
+        self.flush_rollups()
+        return super().flush(timeout=timeout)
+
+    def _read_rollups(
+        self,
+        event_type: Type[BaseCountableEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        resolution: Union[int, datetime.timedelta],
+        query_dict: dict,
+        group: str,
+    ) -> Iterator[tuple[datetime.datetime, BaseCountableEvent]]:
+        """Read the windows and rollups covering a time range, with the start of the bucket each falls in"""
+        if not issubclass(event_type, BaseCountableEvent):
+            raise TypeError(f"provided event type {event_type} is not countable")
+        if group is None:
+            group = self._default_event_group
+        query_dict = dict(query_dict or {})
+        time_window = int(
+            query_dict.pop(
+                "time_window", event_type.model_fields["time_window"].default
+            )
+        )
+        whole_range = resolution is None
+        if whole_range:
+            resolution = end_time - start_time
+        if isinstance(resolution, datetime.timedelta):
+            resolution = resolution.total_seconds()
+        if resolution < time_window:
+            raise ValueError(
+                f"Resolution {resolution} is finer than the time window {time_window}"
+            )
+        sizes = [time_window] + [
+            tier for tier in self._rollup_tiers_for(time_window) if tier <= resolution
+        ]
+        bucket_size = datetime.timedelta(seconds=sizes[-1])
+        self.flush_rollups()
+
+        for size, range_start, range_end in _rollup_ranges(sizes, start_time, end_time):
+            range_query = dict(query_dict, time_window=size)
+            range_group = group
+            if size != time_window and self._rollup_group not in (None, group):
+                range_group = self._rollup_group
+                range_query["group"] = group
+            cursor = None
+            while True:
+                page = self.db_client.search_events_page(
+                    range_group,
+                    event_type=event_type,
+                    query_dict=range_query,
+                    start_time=range_start,
+                    # end_time is included by searches, and timestamps have millisecond accuracy
+                    end_time=range_end - datetime.timedelta(milliseconds=1),
+                    cursor=cursor,
+                )
+                for event in page.events:
+                    if whole_range:
+                        yield start_time, event
+                    else:
+                        yield (
+                            _subtract_time_delta(event.timestamp, bucket_size)[0],
+                            event,
+                        )
+                cursor = page.next_cursor
+                if cursor is None:
+                    break
+
+    def query_counts(
+        self,
+        event_type: Type[BaseCountableEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        resolution: Union[int, datetime.timedelta] = None,
+        query_dict: dict = None,
+        group: str = None,
+    ) -> list[tuple[datetime.datetime, int]]:
+        """Count countable events over a time range, reading the coarsest rollup tiers that fit it
+
+        The range is covered by the coarsest tier no larger than `resolution`, with the uneven ends of the range
+        read from finer tiers (and finally the event's own windows), so a 30 day range at daily resolution reads
+        about 30 documents per key, rather than one per time window.
+
+        Args:
+            event_type (Type[BaseCountableEvent]): The countable event type to count.
+            start_time (datetime.datetime): Start of the range.
+            end_time (datetime.datetime): End of the range, excluded.
+            resolution (int | datetime.timedelta, optional): Requested bucket size, in seconds.
+                Defaults to a single bucket for the whole range.
+            query_dict (dict, optional): Only count events with these field values, e.g. {"function_name": "login"}.
+            group (str, optional): The group events were logged to. Defaults to the default event group.
+
+        Raises:
+            TypeError: If event_type is not a countable event.
+            ValueError: If the resolution is finer than the event's time window.
+
+        Returns:
+            list[tuple[datetime.datetime, int]]: Start of each non-empty bucket and its count, oldest first.
+                Buckets are the size of the tier used, the largest one no larger than `resolution`.
+        """
+        counts: dict[datetime.datetime, int] = {}
+        for bucket, event in self._read_rollups(
+            event_type, start_time, end_time, resolution, query_dict, group
+        ):
+            counts[bucket] = counts.get(bucket, 0) + event.count
+        return sorted(counts.items())
+
+    def query_distinct_counts(
+        self,
+        event_type: Type[BaseDistinctCountEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        resolution: Union[int, datetime.timedelta] = None,
+        query_dict: dict = None,
+        group: str = None,
+    ) -> list[tuple[datetime.datetime, int]]:
+        """Estimate the number of distinct values of a distinct count event's field over a time range
+
+        Reads the same windows and rollups as `query_counts`, merging their sketches per bucket, so memory use is
+        one sketch per bucket however many events were logged.
+
+        Args:
+            event_type (Type[BaseDistinctCountEvent]): The distinct count event type to read.
+            start_time (datetime.datetime): Start of the range.
+            end_time (datetime.datetime): End of the range, excluded.
+            resolution (int | datetime.timedelta, optional): Requested bucket size, in seconds.
+                Defaults to a single bucket for the whole range.
+            query_dict (dict, optional): Only read events with these field values, e.g. {"function_name": "login"}.
+            group (str, optional): The group events were logged to. Defaults to the default event group.
+
+        Raises:
+            TypeError: If event_type is not a distinct count event.
+            ValueError: If the resolution is finer than the event's time window.
+
+        Returns:
+            list[tuple[datetime.datetime, int]]: Start of each non-empty bucket and its estimated distinct count,
+                oldest first.
+        """
+        if not issubclass(event_type, BaseDistinctCountEvent):
+            raise TypeError(
+                f"provided event type {event_type} is not a distinct count event"
+            )
+        sketches: dict[datetime.datetime, HyperLogLog] = {}
+        for bucket, event in self._read_rollups(
+            event_type, start_time, end_time, resolution, query_dict, group
+        ):
+            if event.sketch is None:
+                continue
+            if bucket in sketches:
+                sketches[bucket].merge(event.get_sketch())
+            else:
+                sketches[bucket] = event.get_sketch()
+        return [(bucket, sketches[bucket].count()) for bucket in sorted(sketches)]
+
+    def query_top(
+        self,
+        event_type: Type[BaseTopEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        n: int = 10,
+        query_dict: dict = None,
+        group: str = None,
+    ) -> list[tuple[str, int]]:
+        """Most frequent values of a top event's field over a time range, e.g. the 20 busiest users in the last hour
+
+        Merges the tables of the coarsest rollup tiers covering the range, without reading individual events.
+        Counts are upper bounds, exact unless a value was missing from a table that was full.
+
+        Args:
+            event_type (Type[BaseTopEvent]): The top event type to read.
+            start_time (datetime.datetime): Start of the range.
+            end_time (datetime.datetime): End of the range, excluded.
+            n (int, optional): Number of values to return, at most the event's `top_capacity`. Defaults to 10.
+            query_dict (dict, optional): Only read events with these field values, e.g. {"function_name": "login"}.
+            group (str, optional): The group events were logged to. Defaults to the default event group.
+
+        Raises:
+            TypeError: If event_type is not a top event.
+
+        Returns:
+            list[tuple[str, int]]: Values and their counts, most frequent first.
+        """
+        if not issubclass(event_type, BaseTopEvent):
+            raise TypeError(f"provided event type {event_type} is not a top event")
+        table = event_type.new_summary()
+        for _, event in self._read_rollups(
+            event_type, start_time, end_time, None, query_dict, group
+        ):
+            table.merge(event.get_top())
+        return [(value, count) for value, count, _ in table.top(n)]
+
+    def query_gauges(
+        self,
+        event_type: Type[BaseGaugeEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        resolution: Union[int, datetime.timedelta] = None,
+        query_dict: dict = None,
+        group: str = None,
+    ) -> list[tuple[datetime.datetime, dict[str, Any]]]:
+        """Aggregate gauge values over a time range, merging the summaries of the coarsest rollup tiers
+
+        Args:
+            event_type (Type[BaseGaugeEvent]): The gauge event type to read.
+            start_time (datetime.datetime): Start of the range.
+            end_time (datetime.datetime): End of the range, excluded.
+            resolution (int | datetime.timedelta, optional): Requested bucket size, in seconds.
+                Defaults to a single bucket for the whole range.
+            query_dict (dict, optional): Only read summaries with these field values, e.g. {"function_name": "enqueue"}.
+            group (str, optional): The group values were logged to. Defaults to the default event group.
+
+        Raises:
+            TypeError: If event_type is not a gauge event.
+            ValueError: If the resolution is finer than the event's time window.
+
+        Returns:
+            list[tuple[datetime.datetime, dict[str, Any]]]: Start of each non-empty bucket, with its
+                ``{"min", "max", "sum", "samples", "mean", "last"}``, oldest first.
+        """
+        if not issubclass(event_type, BaseGaugeEvent):
+            raise TypeError(f"provided event type {event_type} is not a gauge event")
+        summaries: dict[datetime.datetime, Any] = {}
+        for bucket, event in self._read_rollups(
+            event_type, start_time, end_time, resolution, query_dict, group
+        ):
+            if bucket in summaries:
+                summaries[bucket].merge(event.get_summary())
+            else:
+                summaries[bucket] = event.get_summary()
+        return [
+            (bucket, summaries[bucket].as_dict())
+            for bucket in sorted(summaries)
+            if summaries[bucket].samples
+        ]
+
+    def timed(
+        self,
+        func: Callable = None,
+        description: str = None,
+        tracking_details: dict[str, bool] = None,
+        event_type: Type[BaseTimedEvent] = None,
+        group: str = None,
+    ) -> Callable:
+        """Wrapper measuring the wall and CPU time of each call, including calls that raise.
+
+        Durations are aggregated per function and time window into histograms, kept in memory
+        and written as one record per window once it closes (see BaseTimedEvent).
+        Coroutine functions are timed until the coroutine finishes, and their CPU time only counts
+        the coroutine's own steps, not other tasks running while it waits.
+
+        Args:
+            func (Callable, optional): Function to be wrapped.
+            description (str, optional): Description to be included with the summaries.
+            tracking_details (dict[str, bool], optional): Specific metrics to be tracked. Defaults to tracking all builtin metrics.
+            event_type (Type[BaseTimedEvent], optional): Timed event type, e.g. to change the time window.
+                Defaults to BaseTimedEvent.
+            group: Group identifier for the summaries
+
+        Returns:
+            Callable: wrapped function
+        """
+        if func is None:
+            return functools.partial(
+                self.timed,
+                description=description,
+                tracking_details=tracking_details,
+                event_type=event_type,
+                group=group,
+            )
+        if event_type is None:
+            event_type = BaseTimedEvent
+        if not issubclass(event_type, BaseTimedEvent):
+            raise TypeError(
+                f"provided event type {event_type} is not derived from {BaseTimedEvent}"
+            )
+
+        name = frame_name(func)
+
+        def log_durations(durations: tuple[float, float, bool]) -> None:
+            try:
+                self.log_event(
+                    func=func,
+                    description=description,
+                    tracking_details=tracking_details,
+                    event_type=event_type,
+                    group=group,
+                    summary_value=durations,
+                )
+            except Exception:
+                # never replace the call's result or exception with a logging failure
+                logger.exception("Failed to log durations of %s", func.__name__)
+
+        if inspect.iscoroutinefunction(func):
+            # time the coroutine until it finishes, not until it is created
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                raised = False
+                cpu_time = [0.0]
+                profiler = self.profiler
+                call = profiler.enter(name) if profiler is not None else None
+                wall_start = time.perf_counter()
+                try:
+                    return await _await_with_cpu_time(func(*args, **kwargs), cpu_time)
+                except BaseException:
+                    raised = True
+                    raise
+                finally:
+                    wall_time = time.perf_counter() - wall_start
+                    if call is not None:
+                        profiler.exit(call)
+                    log_durations((wall_time, cpu_time[0], raised))
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            raised = False
+            profiler = self.profiler
+            call = profiler.enter(name) if profiler is not None else None
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                raised = True
+                raise
+            finally:
+                durations = (
+                    time.perf_counter() - wall_start,
+                    time.thread_time() - cpu_start,
+                    raised,
+                )
+                if call is not None:
+                    profiler.exit(call)
+                log_durations(durations)
+
+        return wrapper
+
+    def query_percentiles(
+        self,
+        event_type: Type[BaseTimedEvent],
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        quantiles: list[float] = DEFAULT_QUANTILES,
+        resolution: Union[int, datetime.timedelta] = None,
+        query_dict: dict = None,
+        group: str = None,
+        clock: str = "wall",
+    ) -> list[tuple[datetime.datetime, dict[str, Any]]]:
+        """Duration percentiles of timed calls over a time range, merging the histograms of the coarsest rollup tiers
+
+        Args:
+            event_type (Type[BaseTimedEvent]): The timed event type to read.
+            start_time (datetime.datetime): Start of the range.
+            end_time (datetime.datetime): End of the range, excluded.
+            quantiles (list[float], optional): Quantiles between 0 and 1. Defaults to 0.5, 0.9 and 0.99.
+            resolution (int | datetime.timedelta, optional): Requested bucket size, in seconds.
+                Defaults to a single bucket for the whole range.
+            query_dict (dict, optional): Only read summaries with these field values, e.g. {"function_name": "login"}.
+            group (str, optional): The group summaries were logged to. Defaults to the default event group.
+            clock (str, optional): "wall" or "cpu". Defaults to "wall".
+
+        Raises:
+            TypeError: If event_type is not a timed event.
+            ValueError: If the resolution is finer than the event's time window, or the clock is invalid.
+
+        Returns:
+            list[tuple[datetime.datetime, dict[str, Any]]]: Start of each non-empty bucket, with its
+                ``{"count", "errors", "max", "percentiles": {quantile: seconds}}``, oldest first.
+        """
+        if not issubclass(event_type, BaseTimedEvent):
+            raise TypeError(f"provided event type {event_type} is not a timed event")
+        if clock not in ("wall", "cpu"):
+            raise ValueError(f"Invalid clock {clock}, expected 'wall' or 'cpu'")
+        histograms: dict[datetime.datetime, LogLinearHistogram] = {}
+        errors: dict[datetime.datetime, int] = {}
+        for bucket, event in self._read_rollups(
+            event_type, start_time, end_time, resolution, query_dict, group
+        ):
+            histogram = event.get_histogram(clock)
+            if bucket in histograms:
+                histograms[bucket].merge(histogram)
+            else:
+                histograms[bucket] = histogram
+            errors[bucket] = errors.get(bucket, 0) + event.errors
+        return [
+            (
+                bucket,
+                {
+                    "count": histograms[bucket].count,
+                    "errors": errors[bucket],
+                    "max": histograms[bucket].max,
+                    "percentiles": {
+                        quantile: histograms[bucket].percentile(quantile)
+                        for quantile in quantiles
+                    },
+                },
+            )
+            for bucket in sorted(histograms)
+        ]
 
     def event(
         self,
@@ -183,6 +963,10 @@ class EventLogger(BaseEventLogger):
             event_type (Callable): Event type (as pydantic model) used for pydantic type validation
             group: Group identifier for the event
 
+        While profiling is enabled (see `enable_profiling`), the time of each call is also recorded
+        in the call tree of nested decorated calls. For coroutine functions, the event is logged when
+        the function is called, and the recorded time lasts until the coroutine finishes.
+
         Raises:
             NotImplementedError: If logging backend specified in class constructor is not yet implemented
 
@@ -197,6 +981,38 @@ class EventLogger(BaseEventLogger):
                 event_type=event_type,
                 group=group,
             )
+        name = frame_name(func)
+
+        if inspect.iscoroutinefunction(func):
+
+            async def profiled(coroutine: Coroutine, profiler: CallTreeProfiler):
+                # the call tree needs the time until the coroutine finishes, not until it is created
+                call = profiler.enter(name)
+                try:
+                    return await coroutine
+                finally:
+                    profiler.exit(call)
+
+            @functools.wraps(func)
+            def coroutine_wrapper(*args, **kwargs):
+                # the event is logged when the function is called, as for other functions,
+                # even if the coroutine is awaited later or never
+                self.log_event(
+                    func=func,
+                    description=description,
+                    tracking_details=tracking_details,
+                    event_type=event_type,
+                    group=group,
+                )
+                profiler = self.profiler
+                if profiler is None:
+                    return func(*args, **kwargs)
+                return profiled(func(*args, **kwargs), profiler)
+
+            # inspect.markcoroutinefunction (Python 3.12+) lets callers checking for coroutine functions
+            # recognise the wrapper as one
+            mark = getattr(inspect, "markcoroutinefunction", None)
+            return coroutine_wrapper if mark is None else mark(coroutine_wrapper)
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -209,6 +1025,13 @@ class EventLogger(BaseEventLogger):
                 group=group,
             )
 
-            return func(*args, **kwargs)
+            profiler = self.profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            call = profiler.enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.exit(call)
 
         return wrapper
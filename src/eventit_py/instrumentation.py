@@ -0,0 +1,176 @@
+import logging
+import threading
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# latency histogram buckets are powers of two in microseconds, from 1us to ~134s
+HISTOGRAM_BUCKET_COUNT = 28
+
+
+class LatencyHistogram:
+    """
+    Fixed-size histogram of latencies, with power-of-two microsecond buckets.
+
+    Attributes:
+        count (int): Number of recorded latencies.
+        total (float): Sum of recorded latencies in seconds.
+        min (float): Smallest recorded latency in seconds.
+        max (float): Largest recorded latency in seconds.
+        buckets (list[int]): Number of latencies recorded in each bucket.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * HISTOGRAM_BUCKET_COUNT
+
+    def record(self, seconds: float) -> None:
+        """Add a latency (in seconds) to the histogram"""
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[min(bucket, HISTOGRAM_BUCKET_COUNT - 1)] += 1
+
+    def percentile(self, quantile: float) -> float:
+        """Estimate a latency percentile from the histogram
+
+        Args:
+            quantile (float): Quantile between 0 and 1 (e.g. 0.99).
+
+        Returns:
+            float: Upper bound (in seconds) of the bucket containing the quantile, capped at the maximum.
+        """
+        if self.count == 0:
+            return None
+        threshold = quantile * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if bucket_count and seen >= threshold:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else None,
+            "min_seconds": self.min,
+            "max_seconds": self.max,
+            "p50_seconds": self.percentile(0.5),
+            "p90_seconds": self.percentile(0.9),
+            "p99_seconds": self.percentile(0.99),
+            "buckets": list(self.buckets),
+        }
+
+
+class Stopwatch:
+    """Record the time between successive laps as stages of a single operation"""
+
+    __slots__ = ("_instrumentation", "_prefix", "_start", "_last")
+
+    def __init__(self, instrumentation: "Instrumentation", prefix: str) -> None:
+        self._instrumentation = instrumentation
+        self._prefix = prefix
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """Record the time since the previous lap under the given stage name"""
+        now = time.perf_counter()
+        self._instrumentation.record(f"{self._prefix}.{stage}", now - self._last)
+        self._last = now
+
+    def stop(self) -> None:
+        """Record the time since the stopwatch was started as the total for the operation"""
+        now = time.perf_counter()
+        self._instrumentation.record(f"{self._prefix}.total", now - self._start)
+        self._last = now
+
+
+class _NullStopwatch:
+    """Stand-in for Stopwatch when instrumentation is disabled"""
+
+    __slots__ = ()
+
+    def lap(self, stage: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+NULL_STOPWATCH = _NullStopwatch()
+
+
+class Instrumentation:
+    """
+    Collects per-stage latency histograms and counters for eventit operations.
+
+    Stage names are dotted strings, such as ``log_event.metrics`` or ``backend.log_message``.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._counters: dict[str, int] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record the latency of a stage, in seconds"""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        """Increase a named counter"""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def stopwatch(self, prefix: str) -> Stopwatch:
+        """Start a stopwatch recording stages under the given prefix"""
+        return Stopwatch(self, prefix)
+
+    def timed(self, stage: str, func):
+        """Wrap func so that every call is recorded under the given stage name"""
+
+        def timed_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        timed_wrapper.__wrapped__ = func
+        return timed_wrapper
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of all histograms and counters
+
+        Returns:
+            dict[str, Any]: ``{"stages": {stage: histogram summary}, "counters": {counter: value}}``
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: histogram.as_dict()
+                    for stage, histogram in sorted(self._histograms.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def reset(self) -> None:
+        """Clear all recorded histograms and counters"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
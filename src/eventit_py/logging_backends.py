@@ -1,25 +1,161 @@
 # This file will contain several different backends that can be used to interface with storage providers (e.g. MongoDB, filepath, etc.)
 
+import base64
+import bisect
+import heapq
 import io
+import json
 import logging
+import os
 import pathlib
+import re
+import threading
+import time
 import uuid
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from shutil import copyfile
 from tempfile import NamedTemporaryFile
-from typing import List, TextIO, TypeVar
-
-from pydantic import ValidationError
-
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from pydantic_core import to_jsonable_python
+
+from eventit_py.instrumentation import NULL_STOPWATCH, Instrumentation
+from eventit_py.metrics_exporter import SelfMetrics
 from eventit_py.pydantic_events import BaseEvent
 
 logger = logging.getLogger(__name__)
 
 BACKEND_TYPES = ["mongodb", "filepath"]
 DEFAULT_DATABASE_NAME = "eventit"
+OFFSETS_DIRECTORY_NAME = ".eventit_offsets"
+COUNTS_DIRECTORY_NAME = ".eventit_counts"
+INDEXES_DIRECTORY_NAME = ".eventit_indexes"
+SEGMENTS_DIRECTORY_NAME = ".eventit_segments"
+CONSUMER_NAME_PATTERN = re.compile(r"[A-Za-z0-9_.\-]+")
+# materialized counts are saved after this many writes, and caught up from the saved offset on load
+COUNT_SAVE_INTERVAL = 1000
+# indexes grow with the file, so they are saved less often
+INDEX_SAVE_INTERVAL = 10000
+DEFAULT_PAGE_SIZE = 100
+# lines read at a time while scanning a file for a page of results
+PAGE_READ_CHUNK = 1000
+# a group under retention is split into this many segments per retention window
+SEGMENTS_PER_RETENTION = 4
+# offsets into segment n start at n << SEGMENT_OFFSET_BITS, so segments can grow without overlapping
+SEGMENT_OFFSET_BITS = 40
+# bytes read at a time while scanning a file backwards for newest-first searches
+REVERSE_READ_BLOCK_SIZE = 65536
+SEARCH_ORDERS = ["asc", "desc"]
+# pass as the group of a search or count to query every group of the client
+ALL_GROUPS = "*"
+# most groups queried at once by a multi-group search or count
+MAX_GROUP_WORKERS = 8
+
+# subdocument holding the metadata fields of events in time-series collections
+TIMESERIES_META_FIELD = "meta"
+TIMESERIES_GRANULARITIES = ["seconds", "minutes", "hours"]
+
+DEFAULT_MONGO_CLIENT_OPTIONS = {
+    "serverSelectionTimeoutMS": 5000,
+    "uuidRepresentation": "standard",
+}
 
 BaseEventType = TypeVar("BaseEventType", bound=BaseEvent)
 
+# BaseLoggingClient methods timed when instrumentation is enabled
+INSTRUMENTED_METHODS = [
+    "log_message",
+    "log_messages",
+    "search_events_by_timestamp",
+    "search_events_by_query",
+    "search_events_page",
+    "count_events_by_query",
+    "get_event_by_uuid",
+    "update_event_by_uuid",
+]
+
+# process-wide registry of MongoClient instances, shared between logging clients
+_shared_mongo_clients: dict[tuple, Any] = {}
+_shared_mongo_clients_lock = threading.Lock()
+_shared_mongo_clients_pid = os.getpid()
+
+
+def _freeze_option(value: Any) -> Any:
+    """Convert an option value into a hashable form, for use in a registry key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze_option(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze_option(v) for v in value)
+    return value
+
+
+def _reset_shared_mongo_clients() -> None:
+    """Forget all shared MongoClient instances inherited from a parent process.
+
+    MongoClient is not fork-safe, so a child process must build its own connection pools.
+    The inherited clients are dropped without being closed, as closing them would also affect the parent.
+    """
+    global _shared_mongo_clients_lock, _shared_mongo_clients_pid
+    _shared_mongo_clients.clear()
+    _shared_mongo_clients_lock = threading.Lock()
+    _shared_mongo_clients_pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_mongo_clients)
+
+
+def get_shared_mongo_client(mongo_url: str, **client_options):
+    """
+    Retrieve a MongoClient for the given URL and options, shared across the current process.
+
+    Loggers configured with the same URL and options reuse one MongoClient (and so one connection pool).
+    Each forked process gets its own instances.
+
+    Args:
+        mongo_url (str): The URL of the MongoDB server.
+        ``**client_options``: Keyword arguments passed to MongoClient (e.g. maxPoolSize, maxIdleTimeMS, compressors).
+
+    Returns:
+        MongoClient: The shared client instance.
+    """
+    from pymongo import MongoClient
+
+    if _shared_mongo_clients_pid != os.getpid():
+        # fallback for forks that bypassed the at-fork hook
+        _reset_shared_mongo_clients()
+    options = {**DEFAULT_MONGO_CLIENT_OPTIONS, **client_options}
+    key = (mongo_url, _freeze_option(options))
+    with _shared_mongo_clients_lock:
+        mongo_client = _shared_mongo_clients.get(key)
+        if mongo_client is None:
+            logger.debug("Creating shared MongoClient for %s", mongo_url)
+            mongo_client = MongoClient(mongo_url, **options)
+            _shared_mongo_clients[key] = mongo_client
+    return mongo_client
+
+
+def close_shared_mongo_clients() -> None:
+    """Close and forget every shared MongoClient held by the current process"""
+    with _shared_mongo_clients_lock:
+        for mongo_client in _shared_mongo_clients.values():
+            mongo_client.close()
+        _shared_mongo_clients.clear()
+
 
 class BaseLoggingClient:
     """
@@ -30,9 +166,130 @@ class BaseLoggingClient:
         exclude_none (bool, optional): Whether to exclude None values when logging. Defaults to True.
     """
 
+    backend_name: str = None
+
     def __init__(self, groups: list[str], exclude_none: bool = True) -> None:
         self._groups = groups
         self.exclude_none = exclude_none
+        self._instrumentation: Instrumentation = None
+        self._self_metrics: SelfMetrics = None
+        # threads for querying several groups at once, started by the first such query
+        self._group_executor: ThreadPoolExecutor = None
+        self._group_executor_lock = threading.Lock()
+
+    def set_instrumentation(self, instrumentation: Instrumentation = None) -> None:
+        """
+        Enable or disable per-method timing for this client.
+
+        When enabled, each method in INSTRUMENTED_METHODS is recorded under the stage ``backend.<method>``.
+        When disabled, the original methods are restored, so no overhead remains.
+
+        Args:
+            instrumentation (Instrumentation, optional): Where to record timings. None disables instrumentation.
+        """
+        self._instrumentation = instrumentation
+        self._wrap_methods()
+
+    def set_self_metrics(self, self_metrics: SelfMetrics = None) -> None:
+        """
+        Enable or disable self-metrics (events, bytes written, errors and search latency) for this client.
+
+        Args:
+            self_metrics (SelfMetrics, optional): Where to record metrics. None disables self-metrics.
+        """
+        self._self_metrics = self_metrics
+        self._wrap_methods()
+
+    def _wrap_methods(self) -> None:
+        """Wrap the methods in INSTRUMENTED_METHODS with the enabled timing and metrics collectors"""
+        for method in INSTRUMENTED_METHODS:
+            # drop any previous wrapper, exposing the class method again
+            self.__dict__.pop(method, None)
+            if self._self_metrics is None and self._instrumentation is None:
+                continue
+            func = getattr(self, method)
+            if self._self_metrics is not None:
+                func = self._self_metrics.wrap(method, func, self.backend_name)
+            if self._instrumentation is not None:
+                func = self._instrumentation.timed(f"backend.{method}", func)
+            setattr(self, method, func)
+
+    def _groups_sharing_storage(self, group: str) -> List[str]:
+        """Groups whose stored events are affected by a write to the given group"""
+        return [group]
+
+    def _fan_out_groups(self, group: Union[str, List[str]]) -> Optional[List[str]]:
+        """Groups to query separately for a list of groups or ALL_GROUPS, or None for a single group
+
+        Groups sharing storage hold the same events, so only the first of them is queried.
+        """
+        if isinstance(group, str) and group != ALL_GROUPS:
+            return None
+        selected = []
+        covered = set()
+        for name in self._groups if group == ALL_GROUPS else group:
+            if name not in self._groups:
+                raise ValueError(f"Invalid group {name} provided")
+            if name in covered:
+                continue
+            covered.update(self._groups_sharing_storage(name))
+            selected.append(name)
+        return selected
+
+    def _map_groups(self, func: Callable, groups: List[str]) -> list:
+        """Call func for each group concurrently, returning the results in the order of groups"""
+        if len(groups) == 1:
+            return [func(groups[0])]
+        with self._group_executor_lock:
+            if self._group_executor is None:
+                self._group_executor = ThreadPoolExecutor(
+                    max_workers=MAX_GROUP_WORKERS, thread_name_prefix="eventit-groups"
+                )
+            executor = self._group_executor
+        return list(executor.map(func, groups))
+
+    def close(self) -> None:
+        """Stop the threads used to query several groups at once. They are started again if needed."""
+        with self._group_executor_lock:
+            executor, self._group_executor = self._group_executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def _search_groups(
+        self,
+        search: Callable,
+        groups: List[str],
+        limit: int = None,
+        fields: List[str] = None,
+        order: str = None,
+        **kwargs,
+    ) -> list:
+        """Run a search on each group concurrently, and merge the sorted results by timestamp
+
+        Each group returns at most `limit` events, and the merge stops once `limit` events are taken.
+        """
+        # results are merged by timestamp, so it is fetched even if not requested
+        fetch_fields = fields
+        if fields is not None and "timestamp" not in fields:
+            fetch_fields = [*fields, "timestamp"]
+        results = self._map_groups(
+            lambda group: search(
+                group=group, limit=limit, fields=fetch_fields, order=order, **kwargs
+            ),
+            groups,
+        )
+        merged = heapq.merge(*results, key=_result_timestamp, reverse=order == "desc")
+        merged = list(islice(merged, limit or None))
+        if fetch_fields is not fields:
+            for result in merged:
+                del result["timestamp"]
+        return merged
+
+    def _stopwatch(self, prefix: str):
+        """Stopwatch for timing stages within a method, or a no-op if instrumentation is disabled"""
+        if self._instrumentation is None:
+            return NULL_STOPWATCH
+        return self._instrumentation.stopwatch(prefix)
 
     def log_message(self, message: BaseEvent, group: str) -> None:
         """
@@ -49,13 +306,32 @@ class BaseLoggingClient:
             "log_message method must be implemented in derived classes"
         )
 
+    def log_messages(self, messages: List[BaseEvent], group: str) -> None:
+        """
+        Logs several messages to the specified group, in order.
+
+        Backends override this to write the whole batch in one operation.
+        By default, each message is logged in turn with `log_message`.
+
+        Args:
+            messages (List[BaseEvent]): The messages to be logged.
+            group (str): The group to log the messages to.
+        """
+        # the class method, so self-metrics and instrumentation count the batch once rather than per message
+        log_message = type(self).log_message
+        for message in messages:
+            log_message(self, message, group)
+
     def search_events_by_timestamp(
         self,
         start_time: datetime,
         end_time: datetime,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
         limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events within a specified time range for a specific group and event type.
@@ -63,12 +339,17 @@ class BaseLoggingClient:
         Args:
             start_time (datetime): The start time of the search range.
             end_time (datetime): The end time of the search range.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (BaseEventType): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): One of SEARCH_ORDERS. "asc" returns the oldest `limit` events first,
+                and "desc" the newest first. Defaults to the first `limit` events found, sorted by timestamp.
 
         Returns:
             List[BaseModel]: A list of events that fall within the specified time range for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
         raise NotImplementedError(
             "search_events_by_timestamp method must be implemented in derived classes"
@@ -77,30 +358,73 @@ class BaseLoggingClient:
     def search_events_by_query(
         self,
         query_dict: dict,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
         limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events based on a query dictionary for a specific group and event type.
 
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (BaseEventType): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): One of SEARCH_ORDERS. "asc" returns the oldest `limit` events first,
+                and "desc" the newest first. Defaults to the first `limit` events found, sorted by timestamp.
 
         Returns:
             List[BaseModel]: A list of events that match the query for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
         raise NotImplementedError(
             "search_events_by_query method must be implemented in derived classes"
         )
 
+    def search_events_page(
+        self,
+        group: str,
+        event_type: BaseEventType = BaseEvent,
+        query_dict: dict = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: List[str] = None,
+        raw: bool = False,
+    ) -> "EventPage":
+        """
+        Retrieve one page of matching events, resuming after the page that returned `cursor`.
+
+        Each page costs about the same, however deep into the results it is.
+
+        Args:
+            group (str): The group to search events in.
+            event_type (BaseEventType, optional): The type of event to retrieve. Defaults to BaseEvent.
+            query_dict (dict, optional): A dictionary where the key is the field to match and the value is the value to match.
+            start_time (datetime, optional): Only return events at or after this time.
+            end_time (datetime, optional): Only return events at or before this time.
+            page_size (int, optional): Maximum number of events in the page. Defaults to 100.
+            cursor (str, optional): `next_cursor` of the previous page. Defaults to the first page.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+
+        Returns:
+            EventPage: The events in the page, and the cursor for the next page.
+        """
+        raise NotImplementedError(
+            "search_events_page method must be implemented in derived classes"
+        )
+
     def count_events_by_query(
         self,
         query_dict: dict,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEvent,
     ) -> int:
         """
@@ -108,7 +432,7 @@ class BaseLoggingClient:
 
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
 
         Returns:
@@ -153,9 +477,547 @@ class BaseLoggingClient:
             "update_event_by_uuid method must be implemented in derived classes"
         )
 
+    def subscribe(
+        self, group: str, consumer: str, event_type: BaseEventType = BaseEvent
+    ) -> "Subscription":
+        """
+        Follow new events in a group, from the position last committed by the named consumer.
+
+        Args:
+            group (str): The group to follow.
+            consumer (str): Name of the consumer, used to store its committed position.
+            event_type (BaseEventType, optional): The type of event to retrieve. Defaults to BaseEvent.
+
+        Returns:
+            Subscription: Subscription yielding events appended to the group.
+        """
+        raise NotImplementedError(
+            "subscribe method must be implemented in derived classes"
+        )
+
+    def register_count_query(
+        self,
+        name: str,
+        group: str,
+        query_dict: dict,
+        event_type: BaseEventType = BaseEvent,
+        time_bucket: int = None,
+    ) -> "MaterializedCount":
+        """
+        Register a named count query, whose result is kept up to date as events are written.
+
+        Args:
+            name (str): Name of the count, used to read it back.
+            group (str): The group to count events in.
+            query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
+            event_type (BaseEventType, optional): The type of event to count. Defaults to BaseEvent.
+            time_bucket (int, optional): Also count events per time bucket of this many seconds.
+
+        Returns:
+            MaterializedCount: The registered count.
+        """
+        raise NotImplementedError(
+            "register_count_query method must be implemented in derived classes"
+        )
+
+    def get_materialized_count(self, name: str, bucket_time: datetime = None) -> int:
+        """
+        Read a registered count query.
+
+        Args:
+            name (str): Name the count was registered with.
+            bucket_time (datetime, optional): Return the count for the time bucket containing this time,
+                instead of the total.
+
+        Returns:
+            int: The number of matching events.
+        """
+        raise NotImplementedError(
+            "get_materialized_count method must be implemented in derived classes"
+        )
+
+
+class WrappingLoggingClient(BaseLoggingClient):
+    """
+    Base class for logging clients that add behaviour in front of another client.
+
+    Every method is passed through to the wrapped client unless overridden,
+    as are attributes specific to the wrapped backend.
+
+    Args:
+        client (BaseLoggingClient): The wrapped client.
+    """
+
+    def __init__(self, client: BaseLoggingClient) -> None:
+        super().__init__(client._groups, client.exclude_none)
+        self._client = client
+
+    @property
+    def backend_name(self) -> str:
+        return self._client.backend_name
+
+    def __getattr__(self, name: str):
+        # expose backend specific attributes and methods of the wrapped client
+        if name == "_client":
+            raise AttributeError(name)
+        return getattr(self._client, name)
+
+    def set_instrumentation(self, instrumentation: Instrumentation = None) -> None:
+        self._instrumentation = instrumentation
+        self._client.set_instrumentation(instrumentation)
+
+    def set_self_metrics(self, self_metrics: SelfMetrics = None) -> None:
+        self._self_metrics = self_metrics
+        self._client.set_self_metrics(self_metrics)
+
+    def _groups_sharing_storage(self, group: str) -> List[str]:
+        return self._client._groups_sharing_storage(group)
+
+    def close(self) -> None:
+        """Stop this client's threads, and close the wrapped client"""
+        super().close()
+        self._client.close()
+
+    def log_message(self, message: BaseEvent, group: str) -> None:
+        return self._client.log_message(message, group)
+
+    def log_messages(self, messages: List[BaseEvent], group: str) -> None:
+        return self._client.log_messages(messages, group)
+
+    def search_events_by_timestamp(self, *args, **kwargs):
+        return self._client.search_events_by_timestamp(*args, **kwargs)
+
+    def search_events_by_query(self, *args, **kwargs):
+        return self._client.search_events_by_query(*args, **kwargs)
+
+    def search_events_page(self, *args, **kwargs):
+        return self._client.search_events_page(*args, **kwargs)
+
+    def count_events_by_query(self, *args, **kwargs):
+        return self._client.count_events_by_query(*args, **kwargs)
+
+    def get_event_by_uuid(self, *args, **kwargs):
+        return self._client.get_event_by_uuid(*args, **kwargs)
+
+    def update_event_by_uuid(self, *args, **kwargs):
+        return self._client.update_event_by_uuid(*args, **kwargs)
+
+    def subscribe(self, *args, **kwargs):
+        return self._client.subscribe(*args, **kwargs)
+
+    def register_count_query(self, *args, **kwargs):
+        return self._client.register_count_query(*args, **kwargs)
+
+    def get_materialized_count(self, *args, **kwargs):
+        return self._client.get_materialized_count(*args, **kwargs)
+
+
+class Subscription:
+    """
+    Incremental consumer of the events appended to a group.
+
+    A subscription keeps its current position in memory. Call `commit` to persist it,
+    so that a new subscription with the same consumer name resumes from there after a restart.
+    """
+
+    def poll(self, max_events: int = None) -> List[BaseEvent]:
+        """Return events appended since the current position, and advance past them"""
+        raise NotImplementedError("poll method must be implemented in derived classes")
+
+    def commit(self) -> None:
+        """Persist the current position for this consumer"""
+        raise NotImplementedError(
+            "commit method must be implemented in derived classes"
+        )
+
+    def follow(
+        self, poll_interval: float = 0.5, timeout: float = None
+    ) -> Iterator[BaseEvent]:
+        """
+        Yield events as they are appended, polling for new events.
+
+        Args:
+            poll_interval (float, optional): Seconds to wait between polls when no new events are found.
+            timeout (float, optional): Stop after this many seconds without new events. Defaults to following forever.
+
+        Yields:
+            BaseEvent: Each new event, in the order it was appended.
+        """
+        idle_since = time.monotonic()
+        while True:
+            events = self.poll()
+            if events:
+                yield from events
+                idle_since = time.monotonic()
+                continue
+            if timeout is not None and time.monotonic() - idle_since >= timeout:
+                return
+            time.sleep(poll_interval)
+
+
+class FileSubscription(Subscription):
+    """
+    Subscription to a group of a FileLoggingClient, tracking a byte offset into the group's file.
+
+    Committed offsets are stored in the ``.eventit_offsets`` folder of the logging directory.
+
+    Args:
+        client (FileLoggingClient): The client whose group is followed.
+        group (str): The group to follow.
+        consumer (str): Name of the consumer.
+        event_type (BaseEventType): The type of event to retrieve.
+    """
+
+    def __init__(
+        self,
+        client: "FileLoggingClient",
+        group: str,
+        consumer: str,
+        event_type: BaseEventType,
+    ) -> None:
+        if not CONSUMER_NAME_PATTERN.fullmatch(consumer):
+            raise ValueError(
+                f"Invalid consumer name {consumer}, use letters, digits, '.', '_' and '-'"
+            )
+        self._client = client
+        self._group = group
+        self._consumer = consumer
+        self._event_type = event_type
+        self._offset_path = client._offsets_directory().joinpath(
+            f"{group}.{consumer}.offset"
+        )
+        self.committed_position = 0
+        if self._offset_path.exists():
+            with open(self._offset_path, "r", encoding="utf-8") as offset_file:
+                self.committed_position = json.load(offset_file)["offset"]
+        self.position = self.committed_position
+
+    def seek(self, position: int) -> None:
+        """Move the current position to a byte offset (e.g. 0 to replay the whole group)"""
+        self.position = position
+
+    def poll(self, max_events: int = None) -> List[BaseEventType]:
+        lines, self.position = self._client._read_lines_from(
+            self._group, self.position, max_lines=max_events
+        )
+        return [self._event_type.model_validate_json(line) for line in lines]
+
+    def commit(self) -> None:
+        self._offset_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self._offset_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as offset_file:
+            json.dump({"offset": self.position}, offset_file)
+        os.replace(temp_path, self._offset_path)
+        self.committed_position = self.position
+
+
+class MaterializedCount:
+    """
+    Named count query over a group, updated as events are written instead of by scanning the group.
+
+    Args:
+        name (str): Name of the count.
+        group (str): The group events are counted in.
+        query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
+        event_type (BaseEventType): The type of event to count.
+        time_bucket (int, optional): Size of the time buckets events are also counted in, in seconds.
+
+    Attributes:
+        total (int): Number of matching events.
+        buckets (dict[int, int]): Number of matching events per time bucket, keyed by the bucket start
+            in seconds since the epoch. Empty unless `time_bucket` is set.
+        offset (int): Byte offset in the group's file up to which events have been counted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        query_dict: dict,
+        event_type: BaseEventType,
+        time_bucket: int = None,
+    ) -> None:
+        self.name = name
+        self.group = group
+        self.query_dict = dict(query_dict)
+        self.event_type = event_type
+        self.time_bucket = time_bucket
+        self.total = 0
+        self.buckets: dict[int, int] = {}
+        self.offset = 0
+        self.unsaved_writes = 0
+
+    def definition(self) -> dict[str, Any]:
+        """JSON-serializable description of the query, used to check a saved count still applies"""
+        return {
+            "group": self.group,
+            "query": to_jsonable_python(self.query_dict),
+            "event_type": f"{self.event_type.__module__}.{self.event_type.__qualname__}",
+            "time_bucket": self.time_bucket,
+        }
+
+    def bucket_key(self, timestamp: datetime) -> int:
+        seconds = int(timestamp.timestamp())
+        return seconds - seconds % self.time_bucket
+
+    def matches(self, event: BaseEvent) -> bool:
+        try:
+            return all(
+                getattr(event, key) == value for key, value in self.query_dict.items()
+            )
+        except AttributeError:
+            return False
+
+    def add(self, event: BaseEvent, amount: int = 1) -> None:
+        """Count an event (or uncount it, with a negative amount) if it matches the query"""
+        if event is None or not self.matches(event):
+            return
+        self.total += amount
+        if self.time_bucket:
+            key = self.bucket_key(event.timestamp)
+            self.buckets[key] = self.buckets.get(key, 0) + amount
+            if not self.buckets[key]:
+                del self.buckets[key]
+
+    def reset(self) -> None:
+        self.total = 0
+        self.buckets.clear()
+        self.offset = 0
+
+    def get(self, bucket_time: datetime = None) -> int:
+        if bucket_time is None:
+            return self.total
+        if not self.time_bucket:
+            raise ValueError(f"Count {self.name} was registered without a time_bucket")
+        return self.buckets.get(self.bucket_key(bucket_time), 0)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse a timestamp serialized by pydantic, e.g. ``2024-01-01T00:00:00.123000Z``"""
+    # datetime.fromisoformat only accepts the "Z" suffix from Python 3.11
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def _raw_query_value(value: Any) -> Any:
+    """Convert a query value into the form it takes in a JSON-decoded event"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        # events are stored in UTC
+        value = value.astimezone(timezone.utc)
+    return to_jsonable_python(value)
+
+
+def _raw_result(record: dict, fields: List[str] = None) -> dict:
+    """Keep only the requested fields of a JSON-decoded event
+
+    `timestamp` and `uuid` are converted to datetime and UUID objects, as returned by MongoDB.
+    """
+    if fields is not None:
+        record = {field: record[field] for field in fields if field in record}
+    if "timestamp" in record:
+        record["timestamp"] = _parse_timestamp(record["timestamp"])
+    if "uuid" in record:
+        record["uuid"] = uuid.UUID(record["uuid"])
+    return record
+
+
+def _check_fields(fields: List[str], event_type: BaseEventType) -> None:
+    for field in fields or []:
+        if field not in event_type.model_fields:
+            raise ValueError(f"Invalid field {field} in fields")
+
+
+def _result_timestamp(result: Any) -> datetime:
+    """Timestamp of a search result, which is an event or (with `fields` or `raw`) a dict"""
+    if isinstance(result, dict):
+        return result["timestamp"]
+    return result.timestamp
+
+
+def _retention_seconds(
+    retention: dict[str, Union[float, timedelta]], groups: List[str]
+) -> dict[str, float]:
+    """Validate per-group retention periods, given as seconds or timedeltas"""
+    seconds = {}
+    for group, period in (retention or {}).items():
+        if group not in groups:
+            raise ValueError(f"Invalid group {group} provided for retention")
+        if isinstance(period, timedelta):
+            period = period.total_seconds()
+        if period <= 0:
+            raise ValueError(f"Retention for group {group} must be greater than 0")
+        seconds[group] = float(period)
+    return seconds
+
+
+def _check_order(order: str) -> None:
+    if order is not None and order not in SEARCH_ORDERS:
+        raise ValueError(f"Invalid order {order}, expected one of {SEARCH_ORDERS}")
+
+
+def _event_timestamp(event: BaseEvent) -> datetime:
+    return event.timestamp
+
+
+def _record_timestamp(record: dict) -> datetime:
+    return _parse_timestamp(record["timestamp"])
+
+
+class EventPage(NamedTuple):
+    """
+    One page of search results.
+
+    Attributes:
+        events (list): Events (or dicts, with `fields` or `raw`) in the page.
+        next_cursor (str): Opaque token to pass as `cursor` for the next page, or None if this is the last page.
+    """
+
+    events: list
+    next_cursor: Optional[str]
+
+
+def _encode_cursor(timestamp: Any, event_uuid: Any, offset: int = None) -> str:
+    """Encode the position after an event as an opaque resume token"""
+    position = {"t": to_jsonable_python(timestamp), "u": str(event_uuid)}
+    if offset is not None:
+        position["o"] = offset
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode()
+
+
+def _decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("utf-8")))
+        return {
+            "timestamp": _parse_timestamp(position["t"]),
+            "uuid": uuid.UUID(position["u"]),
+            "offset": position.get("o"),
+        }
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"Invalid cursor {cursor}") from exc
+
+
+def _index_key(value: Any) -> str:
+    """Key for a field value in a FileIndex, matching how the value is serialized in the file"""
+    value = _raw_query_value(value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return json.dumps(value, sort_keys=True)
+
+
+class FileIndex:
+    """
+    Secondary index over one field of a FileLoggingClient group, mapping each value to the byte offsets
+    of the lines holding it.
+
+    Args:
+        group (str): The indexed group.
+        field (str): The indexed field. Events without the field are indexed under None.
+
+    Attributes:
+        entries (dict[str, list[int]]): Line offsets in file order, keyed by the JSON-serialized field value.
+        offset (int): Byte offset in the group's file up to which lines have been indexed.
+    """
+
+    def __init__(self, group: str, field: str) -> None:
+        self.group = group
+        self.field = field
+        self.entries: dict[str, list[int]] = {}
+        self.offset = 0
+        self.unsaved_writes = 0
+
+    def add(self, line_offset: int, value: Any) -> None:
+        self.entries.setdefault(_index_key(value), []).append(line_offset)
+
+    def lookup(self, value: Any) -> list[int]:
+        return self.entries.get(_index_key(value), [])
+
+    def replace(
+        self,
+        line_offset: int,
+        old_value: Any,
+        new_value: Any,
+        size_change: int,
+        segment_end: int = None,
+    ) -> None:
+        """Update the index for a line rewritten in place, shifting the offsets of the lines after it
+
+        Offsets from `segment_end` on belong to later segments, and are not shifted.
+        """
+        old_offsets = self.entries.get(_index_key(old_value), [])
+        if line_offset in old_offsets:
+            old_offsets.remove(line_offset)
+            if not old_offsets:
+                del self.entries[_index_key(old_value)]
+        if size_change:
+            for offsets in self.entries.values():
+                end = len(offsets)
+                if segment_end is not None:
+                    end = bisect.bisect_left(offsets, segment_end)
+                for position in range(bisect.bisect_right(offsets, line_offset), end):
+                    offsets[position] += size_change
+        bisect.insort(self.entries.setdefault(_index_key(new_value), []), line_offset)
+        if segment_end is None or self.offset < segment_end:
+            self.offset += size_change
+
+    def discard_before(self, offset: int) -> None:
+        """Drop the offsets of lines before an offset, e.g. in expired segments"""
+        for key in list(self.entries):
+            offsets = self.entries[key]
+            del offsets[: bisect.bisect_left(offsets, offset)]
+            if not offsets:
+                del self.entries[key]
+
+    def reset(self) -> None:
+        self.entries.clear()
+        self.offset = 0
+
+
+class AppendOrder:
+    """
+    Whether the lines of a FileLoggingClient group were appended in timestamp order.
+
+    Attributes:
+        offset (int): Byte offset in the group's file up to which lines have been checked.
+        newest (datetime): Newest timestamp of the checked lines.
+        ordered (bool): False once a line older than a line before it was found.
+    """
+
+    __slots__ = ("offset", "newest", "ordered")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def add(self, timestamp: datetime) -> None:
+        if not self.ordered:
+            return
+        try:
+            if self.newest is not None and timestamp < self.newest:
+                self.ordered = False
+                return
+        except TypeError:
+            # naive and aware timestamps cannot be compared
+            self.ordered = False
+            return
+        self.newest = timestamp
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.newest = None
+        self.ordered = True
+
 
 class FileLoggingClient(BaseLoggingClient):
-    """Append to files from provided filepath for logging"""
+    """Append to files from provided filepath for logging
+
+    Groups with a `retention` period (in seconds, or as a timedelta) are split into segments. Every quarter
+    of the retention period, the group's file is moved to a sealed segment in the ``.eventit_segments`` folder,
+    and sealed segments whose newest event is older than the retention period are deleted whole.
+    Offsets into segment n start at ``n << SEGMENT_OFFSET_BITS``, so indexes, materialized counts,
+    subscriptions and page cursors keep working across segments.
+    """
+
+    backend_name = "filepath"
 
     def __init__(
         self,
@@ -164,6 +1026,9 @@ class FileLoggingClient(BaseLoggingClient):
         filename: str = None,
         exclude_none: bool = True,
         separate_files: bool = True,
+        indexes: dict[str, list[str]] = None,
+        append_ordered: bool = False,
+        retention: dict[str, Union[float, timedelta]] = None,
     ) -> None:
         super().__init__(groups, exclude_none)
         logger.debug("Initializing FilepathDBClient")
@@ -178,141 +1043,1248 @@ class FileLoggingClient(BaseLoggingClient):
         self._filepaths: dict[str, pathlib.Path] = {}
         self._separate_files = separate_files
         self._filename = filename
+        # events are known to be appended in timestamp order, so ordered searches can stop at the limit
+        self._append_ordered = append_ordered
+        # otherwise the order is checked by the first ordered search, and kept up to date by appends
+        self._append_orders: dict[str, AppendOrder] = {}
+        self._materialized_counts: dict[str, MaterializedCount] = {}
+        self._indexes: dict[tuple[str, str], FileIndex] = {}
+        # guards materialized counts, indexes and segments, which are updated from the writing thread
+        self._sidecar_lock = threading.RLock()
+        # serializes appends and in-place rewrites of the group files
+        self._write_lock = threading.Lock()
+        # numbers of the sealed segments of each group, oldest first
+        self._sealed_segments: dict[str, List[int]] = {}
+        self._active_segments: dict[str, int] = {}
+        self._segment_started: dict[str, float] = {}
+        self._retention = _retention_seconds(retention, groups)
+        if self._retention and not separate_files:
+            raise ValueError("retention requires separate_files")
+
+        # setup logger for single or separate files
+        if self._separate_files:
+            self._setup_separate_files()
+            for group in self._groups:
+                self._load_segments(group)
+        else:
+            self._setup_single_file()
+
+        for group, fields in (indexes or {}).items():
+            for field in fields:
+                self.create_index(group, field)
+
+    def _setup_separate_files(self):
+        for group in self._groups:
+            self._filepaths[group] = self._directory.joinpath(f"{group}.log")
+            self.file_handles[group] = open(
+                self._filepaths[group], "a", encoding="utf-8"
+            )
+            logger.debug(
+                "Opened %s file as backend for group %s", self._filepaths[group], group
+            )
+
+    def _setup_single_file(self):
+        single_filepath = self._directory.joinpath(self._filename)
+        single_file_handle = open(single_filepath, "a", encoding="utf-8")
+        for group in self._groups:
+            self._filepaths[group] = single_filepath
+            self.file_handles[group] = single_file_handle
+
+    def __del__(self):
+        """Cleanup resources on destruction of object"""
+        try:
+            self.save_materialized_counts()
+            self.save_indexes()
+        except Exception:
+            logger.exception("Failed to save materialized counts and indexes")
+        for group, file_handle in self.file_handles.items():
+            if not file_handle.closed:
+                logger.debug("Closing handle to file %s", self._filepaths[group])
+                file_handle.close()
+
+    def log_message(self, message: BaseEventType, group: str) -> None:
+        """Record the message provided into a single line, on the file opened
+        Write newline to put next message on separate line (jsonlines format)
+        Force file to be flushed to keep consistency for now
+
+        Args:
+            message (str): message to be logged
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        stopwatch = self._stopwatch("backend.log_message")
+        data = message.model_dump_json(exclude_none=self.exclude_none)
+        stopwatch.lap("serialize")
+        with self._write_lock:
+            if group in self._retention:
+                self._enforce_retention(group)
+            start_offset = self._segment_base(group) + self.file_handles[group].seek(
+                0, io.SEEK_END
+            )
+            self.file_handles[group].write(data)
+            self.file_handles[group].write("\n")
+            self.file_handles[group].flush()
+        stopwatch.lap("write")
+        if self._materialized_counts or self._indexes or self._append_orders:
+            end_offset = start_offset + len(data.encode("utf-8")) + 1
+            self._update_counts(group, message, data, start_offset, end_offset)
+            self._update_indexes(group, data, start_offset, end_offset)
+            self._update_append_order(group, [message], start_offset, end_offset)
+            stopwatch.lap("counts")
+        if self._self_metrics is not None:
+            self._self_metrics.increment(
+                "bytes_written_total",
+                len(data.encode("utf-8")) + 1,
+                group=group,
+                backend=self.backend_name,
+            )
+
+    def log_messages(self, messages: List[BaseEventType], group: str) -> None:
+        """Record the messages provided as consecutive lines, with a single write and flush
+
+        Args:
+            messages (List[BaseEvent]): messages to be logged
+            group (str): group to log the messages to
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        if not messages:
+            return
+        stopwatch = self._stopwatch("backend.log_messages")
+        lines = [
+            message.model_dump_json(exclude_none=self.exclude_none)
+            for message in messages
+        ]
+        data = "\n".join(lines) + "\n"
+        stopwatch.lap("serialize")
+        with self._write_lock:
+            if group in self._retention:
+                self._enforce_retention(group)
+            start_offset = self._segment_base(group) + self.file_handles[group].seek(
+                0, io.SEEK_END
+            )
+            self.file_handles[group].write(data)
+            self.file_handles[group].flush()
+        stopwatch.lap("write")
+        if self._materialized_counts or self._indexes or self._append_orders:
+            end_offset = start_offset + len(data.encode("utf-8"))
+            self._update_append_order(group, messages, start_offset, end_offset)
+            for message, line in zip(messages, lines):
+                end_offset = start_offset + len(line.encode("utf-8")) + 1
+                self._update_counts(group, message, line, start_offset, end_offset)
+                self._update_indexes(group, line, start_offset, end_offset)
+                start_offset = end_offset
+            stopwatch.lap("counts")
+        if self._self_metrics is not None:
+            self._self_metrics.increment(
+                "bytes_written_total",
+                len(data.encode("utf-8")),
+                group=group,
+                backend=self.backend_name,
+            )
+
+    def _groups_sharing_storage(self, group: str) -> List[str]:
+        # in single file mode, every group is stored in the same file
+        return [
+            other_group
+            for other_group, filepath in self._filepaths.items()
+            if filepath == self._filepaths.get(group)
+        ] or [group]
+
+    def _offsets_directory(self) -> pathlib.Path:
+        return self._directory.joinpath(OFFSETS_DIRECTORY_NAME)
+
+    def _segment_directory(self, group: str) -> pathlib.Path:
+        return self._directory.joinpath(SEGMENTS_DIRECTORY_NAME, group)
+
+    def _segment_path(self, group: str, number: int) -> pathlib.Path:
+        return self._segment_directory(group).joinpath(f"{number}.log")
+
+    def _segment_manifest_path(self, group: str) -> pathlib.Path:
+        return self._directory.joinpath(SEGMENTS_DIRECTORY_NAME, f"{group}.json")
+
+    def _segment_base(self, group: str) -> int:
+        """Offset of the first byte of a group's file"""
+        return self._active_segments.get(group, 0) << SEGMENT_OFFSET_BITS
+
+    def _segments(self, group: str) -> List[tuple[int, pathlib.Path]]:
+        """Base offset and path of each segment of a group, oldest first, ending with the group's file"""
+        with self._sidecar_lock:
+            segments = [
+                (number << SEGMENT_OFFSET_BITS, self._segment_path(group, number))
+                for number in self._sealed_segments.get(group, [])
+            ]
+            segments.append((self._segment_base(group), self._filepaths[group]))
+        return segments
+
+    def _end_offset(self, group: str) -> int:
+        """Offset following the last byte written to a group"""
+        return self._segment_base(group) + self._filepaths[group].stat().st_size
+
+    def _load_segments(self, group: str) -> None:
+        """Find the sealed segments of a group, and the number of its current file"""
+        segment_directory = self._segment_directory(group)
+        if segment_directory.is_dir():
+            self._sealed_segments[group] = sorted(
+                int(path.stem)
+                for path in segment_directory.glob("*.log")
+                if path.stem.isdigit()
+            )
+        manifest_path = self._segment_manifest_path(group)
+        if manifest_path.exists():
+            with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+            self._active_segments[group] = manifest["active"]
+            self._segment_started[group] = manifest["started"]
+        elif group in self._retention:
+            self._segment_started[group] = time.time()
+            self._save_segment_manifest(group)
+        if group in self._retention:
+            self.expire_segments(group)
+
+    def _save_segment_manifest(self, group: str) -> None:
+        manifest_path = self._segment_manifest_path(group)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = manifest_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(
+                {
+                    "active": self._active_segments.get(group, 0),
+                    "started": self._segment_started[group],
+                },
+                manifest_file,
+            )
+        os.replace(temp_path, manifest_path)
+
+    def _enforce_retention(self, group: str) -> None:
+        """Seal the group's file once it covers its share of the retention window, and drop expired segments"""
+        segment_duration = self._retention[group] / SEGMENTS_PER_RETENTION
+        if time.time() - self._segment_started[group] < segment_duration:
+            return
+        with self._sidecar_lock:
+            self._rotate_segment(group)
+            self.expire_segments(group)
+
+    def _rotate_segment(self, group: str) -> None:
+        """Move the group's file to a sealed segment, and start a new file"""
+        self._segment_started[group] = time.time()
+        if self._filepaths[group].stat().st_size == 0:
+            self._save_segment_manifest(group)
+            return
+        number = self._active_segments.get(group, 0)
+        self.file_handles[group].close()
+        self._segment_directory(group).mkdir(parents=True, exist_ok=True)
+        os.replace(self._filepaths[group], self._segment_path(group, number))
+        self._sealed_segments.setdefault(group, []).append(number)
+        self._active_segments[group] = number + 1
+        self._save_segment_manifest(group)
+        self.file_handles[group] = open(self._filepaths[group], "a", encoding="utf-8")
+        logger.debug("Sealed segment %s of group %s", number, group)
+
+    def expire_segments(self, group: str = None) -> int:
+        """
+        Delete sealed segments whose newest event is older than the retention period of their group.
+
+        Segments are also expired as events are written. Materialized counts are reduced by the
+        expired events, and indexes forget them.
+
+        Args:
+            group (str, optional): The group to expire segments of. Defaults to every group with retention.
+
+        Returns:
+            int: The number of deleted segments.
+        """
+        groups = [group] if group is not None else list(self._retention)
+        expired = 0
+        with self._sidecar_lock:
+            for group in groups:
+                if group not in self._retention:
+                    continue
+                cutoff = time.time() - self._retention[group]
+                sealed = self._sealed_segments.get(group, [])
+                while sealed:
+                    path = self._segment_path(group, sealed[0])
+                    if path.exists() and path.stat().st_mtime >= cutoff:
+                        break
+                    self._drop_segment(group, sealed.pop(0))
+                    expired += 1
+        return expired
+
+    def _drop_segment(self, group: str, number: int) -> None:
+        """Delete a sealed segment, removing its events from materialized counts and indexes"""
+        path = self._segment_path(group, number)
+        base = number << SEGMENT_OFFSET_BITS
+        next_base = (number + 1) << SEGMENT_OFFSET_BITS
+        counts = [
+            count for count in self._counts_for_storage(group) if base < count.offset
+        ]
+        if counts and path.exists():
+            with open(path, "rb") as segment_file:
+                line_offset = base
+                for line in segment_file:
+                    for count in counts:
+                        if line_offset < count.offset:
+                            count.add(
+                                self._as_event_type(count.event_type, data=line), -1
+                            )
+                    line_offset += len(line)
+        for count in counts:
+            count.offset = max(count.offset, next_base)
+            self._save_count(count)
+        for index in self._indexes_for_storage(group):
+            index.discard_before(next_base)
+            index.offset = max(index.offset, next_base)
+            self._save_index(index)
+        path.unlink(missing_ok=True)
+        logger.debug("Expired segment %s of group %s", number, group)
+
+    def _read_lines_from(
+        self, group: str, offset: int, max_lines: int = None
+    ) -> tuple[List[bytes], int]:
+        """
+        Read complete lines appended to a group's file, starting at a byte offset.
+
+        A trailing line that is still being written is left for the next read.
+
+        Args:
+            group (str): The group to read.
+            offset (int): Byte offset to start from.
+            max_lines (int, optional): Maximum number of lines to read. Defaults to reading all lines.
+
+        Returns:
+            tuple[List[bytes], int]: The lines read, and the offset following the last of them.
+        """
+        lines, offset = self._read_lines_with_offsets(group, offset, max_lines)
+        return [line for _, line in lines], offset
+
+    def _read_lines_with_offsets(
+        self, group: str, offset: int, max_lines: int = None
+    ) -> tuple[List[tuple[int, bytes]], int]:
+        """Same as `_read_lines_from`, but returns the byte offset of each line along with it"""
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        lines = []
+        segments = self._segments(group)
+        if offset > self._end_offset(group):
+            # file was rewritten shorter than before, so start again
+            offset = 0
+        for position, (base, path) in enumerate(segments):
+            if position + 1 < len(segments) and offset >= segments[position + 1][0]:
+                continue
+            # offsets before the segment were in expired segments
+            offset = max(offset, base)
+            try:
+                file_handle = open(path, "rb")
+            except FileNotFoundError:
+                # expired while reading
+                continue
+            with file_handle:
+                if offset > base:
+                    file_handle.seek(offset - base - 1)
+                    if file_handle.read(1) != b"\n":
+                        # offset no longer falls on a line boundary (event updated in place),
+                        # so skip ahead to the start of the next line
+                        file_handle.readline()
+                        offset = base + file_handle.tell()
+                file_handle.seek(offset - base)
+                while max_lines is None or len(lines) < max_lines:
+                    line = file_handle.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    if line.strip():
+                        lines.append((offset, line))
+                    offset += len(line)
+            if max_lines is not None and len(lines) >= max_lines:
+                break
+        return lines, offset
+
+    def _counts_directory(self) -> pathlib.Path:
+        return self._directory.joinpath(COUNTS_DIRECTORY_NAME)
+
+    def _count_path(self, count: MaterializedCount) -> pathlib.Path:
+        return self._counts_directory().joinpath(f"{count.group}.{count.name}.json")
+
+    @staticmethod
+    def _as_event_type(
+        event_type: BaseEventType, event: BaseEvent = None, data: Any = None
+    ) -> BaseEventType:
+        """Return the event as event_type, parsing its serialized form if needed, or None if it does not fit"""
+        if isinstance(event, event_type):
+            return event
+        try:
+            return event_type.model_validate_json(data)
+        except ValidationError:
+            return None
+
+    def _counts_for_storage(self, group: str) -> List[MaterializedCount]:
+        groups = self._groups_sharing_storage(group)
+        return [
+            count
+            for count in self._materialized_counts.values()
+            if count.group in groups
+        ]
+
+    def _catch_up_count(self, count: MaterializedCount) -> None:
+        """Count events appended to the group's file after the count's offset"""
+        if count.offset > self._end_offset(count.group):
+            # file was rewritten shorter than before, so count it again
+            count.reset()
+        while True:
+            lines, count.offset = self._read_lines_from(
+                count.group, count.offset, max_lines=COUNT_SAVE_INTERVAL
+            )
+            if not lines:
+                return
+            for line in lines:
+                count.add(self._as_event_type(count.event_type, data=line))
+            count.unsaved_writes += len(lines)
+
+    def _save_count(self, count: MaterializedCount) -> None:
+        count_path = self._count_path(count)
+        count_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = count_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as count_file:
+            json.dump(
+                {
+                    "definition": count.definition(),
+                    "offset": count.offset,
+                    "total": count.total,
+                    "buckets": count.buckets,
+                },
+                count_file,
+            )
+        os.replace(temp_path, count_path)
+        count.unsaved_writes = 0
+
+    def _load_count(self, count: MaterializedCount) -> None:
+        count_path = self._count_path(count)
+        if not count_path.exists():
+            return
+        try:
+            with open(count_path, "r", encoding="utf-8") as count_file:
+                saved = json.load(count_file)
+        except (OSError, ValueError):
+            logger.exception("Discarding unreadable saved count %s", count_path)
+            return
+        if saved.get("definition") != count.definition():
+            logger.debug("Saved count %s has a different query, recounting", count.name)
+            return
+        count.offset = saved["offset"]
+        count.total = saved["total"]
+        count.buckets = {int(key): value for key, value in saved["buckets"].items()}
+
+    def _update_counts(
+        self,
+        group: str,
+        message: BaseEvent,
+        data: str,
+        start_offset: int,
+        end_offset: int,
+    ) -> None:
+        with self._sidecar_lock:
+            for count in self._counts_for_storage(group):
+                if count.offset != start_offset:
+                    # the file grew without this client (e.g. another process), so read what was missed,
+                    # which includes the message just written
+                    self._catch_up_count(count)
+                else:
+                    count.add(self._as_event_type(count.event_type, message, data))
+                    count.offset = end_offset
+                    count.unsaved_writes += 1
+                if count.unsaved_writes >= COUNT_SAVE_INTERVAL:
+                    self._save_count(count)
+
+    def register_count_query(
+        self,
+        name: str,
+        group: str,
+        query_dict: dict,
+        event_type: BaseEventType = BaseEvent,
+        time_bucket: int = None,
+    ) -> MaterializedCount:
+        """
+        Register a named count query, whose result is kept up to date as events are written.
+
+        The count is saved in the ``.eventit_counts`` folder of the logging directory, along with the
+        offset in the group's file it covers. Registering the same query again (e.g. after a restart)
+        only reads events appended since that offset. A new query is backfilled from the whole file once.
+
+        Args:
+            name (str): Name of the count, used to read it back.
+            group (str): The group to count events in.
+            query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
+            event_type (BaseEventType, optional): The type of event to count. Lines that are not valid
+                for this type are not counted. Defaults to BaseEvent.
+            time_bucket (int, optional): Also count events per time bucket of this many seconds.
+
+        Raises:
+            ValueError: If an invalid group, name, query key or time bucket is provided,
+                or the name is already registered with a different query.
+
+        Returns:
+            MaterializedCount: The registered count.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        if not CONSUMER_NAME_PATTERN.fullmatch(name):
+            raise ValueError(
+                f"Invalid count name {name}, use letters, digits, '.', '_' and '-'"
+            )
+        for key in query_dict.keys():
+            if key not in event_type.model_fields:
+                raise ValueError(f"Invalid key {key} in query_dict")
+        if time_bucket is not None and time_bucket <= 0:
+            raise ValueError("time_bucket must be greater than 0")
+
+        count = MaterializedCount(name, group, query_dict, event_type, time_bucket)
+        with self._sidecar_lock:
+            existing = self._materialized_counts.get(name)
+            if existing is not None:
+                if existing.definition() != count.definition():
+                    raise ValueError(
+                        f"Count {name} is already registered with a different query"
+                    )
+                return existing
+            self._load_count(count)
+            self._catch_up_count(count)
+            self._save_count(count)
+            self._materialized_counts[name] = count
+        return count
+
+    def get_materialized_count(self, name: str, bucket_time: datetime = None) -> int:
+        """
+        Read a registered count query, without scanning the group.
+
+        Args:
+            name (str): Name the count was registered with.
+            bucket_time (datetime, optional): Return the count for the time bucket containing this time,
+                instead of the total.
+
+        Raises:
+            ValueError: If no count is registered with the name.
+
+        Returns:
+            int: The number of matching events.
+        """
+        count = self._materialized_counts.get(name)
+        if count is None:
+            raise ValueError(f"No count registered with name {name}")
+        return count.get(bucket_time)
+
+    def save_materialized_counts(self) -> None:
+        """Save every registered count, so that reloading them reads as little of the file as possible"""
+        with self._sidecar_lock:
+            for count in self._materialized_counts.values():
+                if count.unsaved_writes:
+                    self._save_count(count)
+
+    def _indexes_directory(self) -> pathlib.Path:
+        return self._directory.joinpath(INDEXES_DIRECTORY_NAME)
+
+    def _index_path(self, index: FileIndex) -> pathlib.Path:
+        return self._indexes_directory().joinpath(f"{index.group}.{index.field}.json")
+
+    def _indexes_for_storage(self, group: str) -> List[FileIndex]:
+        groups = self._groups_sharing_storage(group)
+        return [index for index in self._indexes.values() if index.group in groups]
+
+    def _catch_up_index(self, index: FileIndex) -> None:
+        """Index lines appended to the group's file after the index's offset"""
+        if index.offset > self._end_offset(index.group):
+            # file was rewritten shorter than before, so index it again
+            index.reset()
+        while True:
+            lines, index.offset = self._read_lines_with_offsets(
+                index.group, index.offset, max_lines=INDEX_SAVE_INTERVAL
+            )
+            if not lines:
+                return
+            for line_offset, line in lines:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                index.add(line_offset, record.get(index.field))
+            index.unsaved_writes += len(lines)
+
+    def _save_index(self, index: FileIndex) -> None:
+        index_path = self._index_path(index)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = index_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(
+                {
+                    "field": index.field,
+                    "offset": index.offset,
+                    "entries": index.entries,
+                },
+                index_file,
+            )
+        os.replace(temp_path, index_path)
+        index.unsaved_writes = 0
+
+    def _load_index(self, index: FileIndex) -> None:
+        index_path = self._index_path(index)
+        if not index_path.exists():
+            return
+        try:
+            with open(index_path, "r", encoding="utf-8") as index_file:
+                saved = json.load(index_file)
+            index.offset = saved["offset"]
+            index.entries = saved["entries"]
+        except (OSError, ValueError, KeyError):
+            logger.exception("Discarding unreadable saved index %s", index_path)
+            index.reset()
+
+    def _update_indexes(
+        self, group: str, data: str, start_offset: int, end_offset: int
+    ) -> None:
+        with self._sidecar_lock:
+            indexes = self._indexes_for_storage(group)
+            if not indexes:
+                return
+            record = json.loads(data)
+            for index in indexes:
+                if index.offset != start_offset:
+                    # the file grew without this client, so index what was missed
+                    self._catch_up_index(index)
+                else:
+                    index.add(start_offset, record.get(index.field))
+                    index.offset = end_offset
+                    index.unsaved_writes += 1
+                if index.unsaved_writes >= INDEX_SAVE_INTERVAL:
+                    self._save_index(index)
+
+    def create_index(self, group: str, field: str) -> FileIndex:
+        """
+        Declare a secondary index on a field of a group's events.
+
+        `search_events_by_query` and `count_events_by_query` use the index whenever the query includes the field,
+        reading only the lines holding the queried value instead of the whole file.
+        The index is updated as events are written, and saved in the ``.eventit_indexes`` folder of the
+        logging directory with the offset it covers, so after a restart only newer lines are indexed.
+
+        Args:
+            group (str): The group to index.
+            field (str): The field to index.
+
+        Raises:
+            ValueError: If an invalid group or field name is provided.
+
+        Returns:
+            FileIndex: The index.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        if not CONSUMER_NAME_PATTERN.fullmatch(field):
+            raise ValueError(f"Invalid field name {field}")
+        with self._sidecar_lock:
+            index = self._indexes.get((group, field))
+            if index is not None:
+                return index
+            index = FileIndex(group, field)
+            self._load_index(index)
+            self._catch_up_index(index)
+            self._save_index(index)
+            self._indexes[(group, field)] = index
+        return index
+
+    def rebuild_index(self, group: str, field: str = None) -> None:
+        """
+        Rebuild the indexes of a group from its file, e.g. after the file was edited by hand.
+
+        Args:
+            group (str): The indexed group.
+            field (str, optional): The indexed field. Defaults to rebuilding every index of the group.
+        """
+        with self._sidecar_lock:
+            for index in self._indexes.values():
+                if index.group == group and field in (None, index.field):
+                    index.reset()
+                    self._catch_up_index(index)
+                    self._save_index(index)
+
+    def save_indexes(self) -> None:
+        """Save every index, so that reloading them reads as little of the file as possible"""
+        with self._sidecar_lock:
+            for index in self._indexes.values():
+                if index.unsaved_writes:
+                    self._save_index(index)
+
+    def _candidate_offsets(self, group: str, query_dict: dict) -> List[int]:
+        """
+        Offsets of the lines that may match a query, using the most selective index on its fields.
+
+        Returns:
+            List[int]: Sorted line offsets, or None if no queried field is indexed.
+        """
+        indexes = {
+            index.field: index
+            for index in self._indexes_for_storage(group)
+            if index.field in query_dict
+        }
+        if not indexes:
+            return None
+        end_offset = self._end_offset(group)
+        candidates = None
+        with self._sidecar_lock:
+            for field, index in indexes.items():
+                if index.offset != end_offset:
+                    self._catch_up_index(index)
+                offsets = index.lookup(query_dict[field])
+                if candidates is None or len(offsets) < len(candidates):
+                    candidates = offsets
+            return sorted(candidates)
+
+    def _read_lines_at(self, group: str, offsets: List[int]) -> Iterator[bytes]:
+        segments = self._segments(group)
+        bases = [base for base, _ in segments]
+        file_handles: dict[int, io.BufferedReader] = {}
+        try:
+            for line_offset in offsets:
+                position = bisect.bisect_right(bases, line_offset) - 1
+                if position < 0:
+                    # in an expired segment
+                    continue
+                base, path = segments[position]
+                file_handle = file_handles.get(position)
+                if file_handle is None:
+                    try:
+                        file_handle = file_handles[position] = open(path, "rb")
+                    except FileNotFoundError:
+                        continue
+                file_handle.seek(line_offset - base)
+                yield file_handle.readline()
+        finally:
+            for file_handle in file_handles.values():
+                file_handle.close()
 
-        # setup logger for single or separate files
-        if self._separate_files:
-            self._setup_separate_files()
-        else:
-            self._setup_single_file()
+    def _search_indexed(
+        self,
+        query_dict: dict,
+        group: str,
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
+    ) -> List[BaseEventType]:
+        """Search using an index, or return None if no queried field is indexed"""
+        offsets = self._candidate_offsets(group, query_dict)
+        if offsets is None:
+            return None
+        in_order = self._stops_at_limit(group, limit, order)
+        if order == "desc":
+            offsets = reversed(offsets)
+        try:
+            return self._select_query_matches(
+                self._read_lines_at(group, offsets),
+                query_dict,
+                event_type,
+                limit,
+                fields,
+                raw,
+                order,
+                in_order,
+            )
+        except ValueError:
+            # offsets no longer point at lines, so the file was rewritten without this client
+            logger.warning("Index for group %s is out of date, rebuilding it", group)
+            self.rebuild_index(group)
+            return None
 
-    def _setup_separate_files(self):
-        for group in self._groups:
-            self._filepaths[group] = self._directory.joinpath(f"{group}.log")
-            self.file_handles[group] = open(
-                self._filepaths[group], "a", encoding="utf-8"
+    def _count_indexed(self, query_dict: dict, group: str) -> int:
+        """Count using an index, or return None if no queried field is indexed
+
+        Lines are matched as decoded JSON, without validating them as events.
+        """
+        offsets = self._candidate_offsets(group, query_dict)
+        if offsets is None:
+            return None
+        if len(query_dict) == 1:
+            # the index holds exactly the lines matching the one queried field
+            return len(offsets)
+        expected = [(key, _raw_query_value(value)) for key, value in query_dict.items()]
+        matched = 0
+        try:
+            for line in self._read_lines_at(group, offsets):
+                record = json.loads(line)
+                if all(record.get(key) == value for key, value in expected):
+                    matched += 1
+        except ValueError:
+            # offsets no longer point at lines, so the file was rewritten without this client
+            logger.warning("Index for group %s is out of date, rebuilding it", group)
+            self.rebuild_index(group)
+            return None
+        return matched
+
+    def _append_order_for_storage(self, group: str) -> AppendOrder:
+        return self._append_orders.get(self._groups_sharing_storage(group)[0])
+
+    def _appended_in_order(self, group: str) -> bool:
+        """Whether a group's lines are in timestamp order, checking the lines appended since the last check"""
+        if self._append_ordered:
+            return True
+        with self._sidecar_lock:
+            order = self._append_orders.setdefault(
+                self._groups_sharing_storage(group)[0], AppendOrder()
             )
-            logger.debug(
-                "Opened %s file as backend for group %s", self._filepaths[group], group
+            if order.offset > self._end_offset(group):
+                # file was rewritten shorter than before, so check it again
+                order.reset()
+            while order.ordered:
+                lines, order.offset = self._read_lines_with_offsets(
+                    group, order.offset, max_lines=PAGE_READ_CHUNK
+                )
+                if not lines:
+                    break
+                for _, line in lines:
+                    try:
+                        order.add(_record_timestamp(json.loads(line)))
+                    except (ValueError, KeyError):
+                        continue
+            return order.ordered
+
+    def _update_append_order(
+        self,
+        group: str,
+        messages: List[BaseEventType],
+        start_offset: int,
+        end_offset: int,
+    ) -> None:
+        if not self._append_orders:
+            return
+        with self._sidecar_lock:
+            order = self._append_order_for_storage(group)
+            if order is None or not order.ordered or order.offset != start_offset:
+                # lines appended without this client are checked by the next ordered search
+                return
+            for message in messages:
+                order.add(message.timestamp)
+            order.offset = end_offset
+
+    def _stops_at_limit(self, group: str, limit: int, order: str) -> bool:
+        """Whether an ordered search can stop at its first `limit` matches in file order"""
+        return (
+            order is not None and limit is not None and self._appended_in_order(group)
+        )
+
+    def _iter_lines(self, group: str, order: str = None) -> Iterator[bytes]:
+        """Yield the lines of a group's segments, from the last line first for descending order"""
+        if order == "desc":
+            yield from self._iter_lines_reversed(group)
+            return
+        for _, path in self._segments(group):
+            try:
+                file_handle = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with file_handle:
+                yield from file_handle
+
+    def _iter_lines_reversed(self, group: str) -> Iterator[bytes]:
+        """Yield the complete lines of a group's segments from last to first"""
+        for _, path in reversed(self._segments(group)):
+            try:
+                yield from self._iter_file_reversed(path)
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def _iter_file_reversed(path: pathlib.Path) -> Iterator[bytes]:
+        """Yield the complete lines of a file from last to first, reading blocks from the end"""
+        with open(path, "rb") as file_handle:
+            position = file_handle.seek(0, io.SEEK_END)
+            # start of a line whose beginning is in an earlier block
+            pending = b""
+            # text after the last newline is a line still being written
+            skip_partial = True
+            while position > 0:
+                size = min(REVERSE_READ_BLOCK_SIZE, position)
+                position -= size
+                file_handle.seek(position)
+                lines = (file_handle.read(size) + pending).split(b"\n")
+                pending = lines.pop(0)
+                if skip_partial and lines:
+                    lines.pop()
+                    skip_partial = False
+                for line in reversed(lines):
+                    if line:
+                        yield line
+            if pending and not skip_partial:
+                yield pending
+
+    def _select(
+        self,
+        matches: Iterator,
+        key: Any,
+        limit: int,
+        order: str,
+        in_order: bool = False,
+    ) -> list:
+        """Pick the results of a search from its matches
+
+        Matches arrive in file order, or reversed for descending order. An ordered search with a limit
+        keeps the best `limit` matches in a bounded heap, or stops at the first `limit` matches if the
+        matches are `in_order`, i.e. the file was appended in timestamp order.
+        """
+        if order is None:
+            # the first matches in the file, as returned before ordered searches existed
+            return sorted(islice(matches, limit), key=key)
+        reverse = order == "desc"
+        if limit is None:
+            return sorted(matches, key=key, reverse=reverse)
+        if in_order:
+            return list(islice(matches, limit))
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(limit, matches, key=key)
+
+    def _select_query_matches(
+        self,
+        lines: Iterator[bytes],
+        query_dict: dict,
+        event_type: BaseEventType,
+        limit: int,
+        fields: List[str],
+        raw: bool,
+        order: str,
+        in_order: bool = False,
+    ) -> list:
+        if fields is not None or raw:
+            expected = [
+                (key, _raw_query_value(value)) for key, value in query_dict.items()
+            ]
+            records = (json.loads(line) for line in lines)
+            matches = (
+                record
+                for record in records
+                if all(record.get(key) == value for key, value in expected)
             )
+            selected = self._select(matches, _record_timestamp, limit, order, in_order)
+            return [_raw_result(record, fields) for record in selected]
 
-    def _setup_single_file(self):
-        single_filepath = self._directory.joinpath(self._filename)
-        single_file_handle = open(single_filepath, "a", encoding="utf-8")
-        for group in self._groups:
-            self._filepaths[group] = single_filepath
-            self.file_handles[group] = single_file_handle
+        def match_events():
+            for line in lines:
+                try:
+                    event = event_type.model_validate_json(line)
+                except ValidationError:
+                    logger.error("Failed to validate line: %s", line)
+                    raise
+                try:
+                    if all(
+                        getattr(event, key) == value
+                        for key, value in query_dict.items()
+                    ):
+                        yield event
+                except AttributeError:
+                    logger.exception("Failed to match query_dict to event")
 
-    def __del__(self):
-        """Cleanup resources on destruction of object"""
-        for group, file_handle in self.file_handles.items():
-            if not file_handle.closed:
-                logger.debug("Closing handle to file %s", self._filepaths[group])
-                file_handle.close()
+        return self._select(match_events(), _event_timestamp, limit, order, in_order)
 
-    def log_message(self, message: BaseEventType, group: str) -> None:
-        """Record the message provided into a single line, on the file opened
-        Write newline to put next message on separate line (jsonlines format)
-        Force file to be flushed to keep consistency for now
+    def subscribe(
+        self, group: str, consumer: str, event_type: BaseEventType = BaseEvent
+    ) -> FileSubscription:
+        """
+        Follow new events in a group, from the offset last committed by the named consumer.
+
+        Each poll only reads the bytes appended since the previous one. Positions are byte offsets,
+        so they stay valid as the file grows, and are realigned to the next line if an event is updated in place.
 
         Args:
-            message (str): message to be logged
+            group (str): The group to follow.
+            consumer (str): Name of the consumer, used to store its committed offset.
+            event_type (BaseEventType, optional): The type of event to retrieve. Defaults to BaseEvent.
+
+        Returns:
+            FileSubscription: Subscription yielding events appended to the group.
         """
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
-        self.file_handles[group].seek(0, io.SEEK_END)
-        self.file_handles[group].write(
-            message.model_dump_json(exclude_none=self.exclude_none)
-        )
-        self.file_handles[group].write("\n")
-        self.file_handles[group].flush()
+        return FileSubscription(self, group, consumer, event_type)
 
     def search_events_by_timestamp(
         self,
         start_time: datetime,
         end_time: datetime,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
         limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events within a specified time range for a specific group and event type.
 
+        With `fields` or `raw`, lines are only JSON-decoded, and no event_type instance is built.
+        Descending searches read the file backwards from its end.
+
         Args:
             start_time (datetime): The start time of the search range.
             end_time (datetime): The end time of the search range.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): "asc" for the oldest `limit` events first, or "desc" for the newest first.
+                Defaults to the first `limit` events in the file, sorted by timestamp.
 
         Returns:
             List[BaseEvent]: A sorted list of events that fall within the specified time range for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
 
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return self._search_groups(
+                self.search_events_by_timestamp,
+                groups,
+                limit,
+                fields,
+                order,
+                start_time=start_time,
+                end_time=end_time,
+                event_type=event_type,
+                raw=raw,
+            )
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
-        events = []
-        # use new file handle to search whole file
-        with open(self._filepaths[group], "r", encoding="utf-8") as file_handle:
-            for line in file_handle:
-                event = event_type.model_validate_json(line)
-                if start_time <= event.timestamp <= end_time:
-                    events.append(event)
-                    if (limit is not None) and (len(events) >= limit):
-                        break
-        return sorted(events, key=lambda x: x.timestamp)
+        _check_fields(fields, event_type)
+        _check_order(order)
+        in_order = self._stops_at_limit(group, limit, order)
+        lines = self._iter_lines(group, order)
+        if fields is not None or raw:
+            records = (json.loads(line) for line in lines)
+            matches = (
+                record
+                for record in records
+                if start_time <= _record_timestamp(record) <= end_time
+            )
+            selected = self._select(matches, _record_timestamp, limit, order, in_order)
+            return [_raw_result(record, fields) for record in selected]
+
+        events = (event_type.model_validate_json(line) for line in lines)
+        matches = (
+            event for event in events if start_time <= event.timestamp <= end_time
+        )
+        return self._select(matches, _event_timestamp, limit, order, in_order)
 
     def search_events_by_query(
-        self, query_dict: dict, group: str, event_type: BaseEventType, limit: int = None
+        self,
+        query_dict: dict,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events based on a query dictionary for a specific group and event type.
 
+        With `fields` or `raw`, lines are only JSON-decoded, and query values are compared with their JSON form.
+        Descending searches read the file (or the offsets of an index) backwards from its end.
+
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): "asc" for the oldest `limit` events first, or "desc" for the newest first.
+                Defaults to the first `limit` events in the file, sorted by timestamp.
 
         Returns:
             List[BaseEventType]: A list of events that match the query for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
         # if no limit, then we should set it to none for FileLoggingClient only
         if limit == 0:
             limit = None
 
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return self._search_groups(
+                self.search_events_by_query,
+                groups,
+                limit,
+                fields,
+                order,
+                query_dict=query_dict,
+                event_type=event_type,
+                raw=raw,
+            )
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
         # ensure all fields in query dict are in event_type class
         for key in query_dict.keys():
             if key not in event_type.model_fields:
                 raise ValueError(f"Invalid key {key} in query_dict")
+        _check_fields(fields, event_type)
+        _check_order(order)
 
-        events: List[BaseEventType] = []
-        with open(self._filepaths[group], "r", encoding="utf-8") as file_handle:
-            for line in file_handle:
-                try:
-                    event = event_type.model_validate_json(line)
-                except ValidationError as ve:
-                    print(f"bad line: {line}")
-                    print(ve.json())
-                    raise
+        if self._indexes:
+            events = self._search_indexed(
+                query_dict, group, event_type, limit, fields, raw, order
+            )
+            if events is not None:
+                return events
+
+        return self._select_query_matches(
+            self._iter_lines(group, order),
+            query_dict,
+            event_type,
+            limit,
+            fields,
+            raw,
+            order,
+            self._stops_at_limit(group, limit, order),
+        )
+
+    def _iter_lines_from(self, group: str, offset: int) -> Iterator[tuple[int, bytes]]:
+        """Yield complete lines of a group's file with their offsets, starting at a byte offset"""
+        while True:
+            lines, offset = self._read_lines_with_offsets(
+                group, offset, max_lines=PAGE_READ_CHUNK
+            )
+            if not lines:
+                return
+            yield from lines
+
+    def _offset_after_event(self, group: str, event_uuid: uuid.UUID) -> int:
+        """Offset of the line following the event with the given uuid, or None if it is not found"""
+        offsets = self._candidate_offsets(group, {"uuid": event_uuid})
+        if offsets is not None:
+            lines = zip(offsets, self._read_lines_at(group, offsets))
+        else:
+            lines = self._iter_lines_from(group, 0)
+        target = str(event_uuid)
+        for line_offset, line in lines:
+            if json.loads(line).get("uuid") == target:
+                return line_offset + len(line)
+        return None
+
+    def _resume_position(self, group: str, position: dict) -> tuple[int, datetime]:
+        """
+        Offset to resume reading from after a cursor's event.
+
+        The cursor holds the offset of its event's line, which is checked against the event's uuid
+        in case the file was rewritten since. A moved event is looked up by uuid. If the event is
+        gone, reading restarts from the beginning, skipping events up to the cursor's timestamp.
+
+        Returns:
+            tuple[int, datetime]: The offset, and the timestamp events must follow (or None).
+        """
+        offset = position["offset"]
+        if offset is not None:
+            lines, _ = self._read_lines_with_offsets(group, offset, max_lines=1)
+            if lines and lines[0][0] == offset:
                 try:
-                    if all(
-                        getattr(event, key) == value
-                        for key, value in query_dict.items()
-                    ):
-                        events.append(event)
-                        if limit is not None and len(events) >= limit:
-                            return events
-                except AttributeError:
-                    logger.exception("Failed to match query_dict to event")
+                    if json.loads(lines[0][1]).get("uuid") == str(position["uuid"]):
+                        return offset + len(lines[0][1]), None
+                except ValueError:
+                    pass
+        offset = self._offset_after_event(group, position["uuid"])
+        if offset is not None:
+            return offset, None
+        return 0, position["timestamp"]
+
+    def search_events_page(
+        self,
+        group: str,
+        event_type: BaseEventType = BaseEvent,
+        query_dict: dict = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: List[str] = None,
+        raw: bool = False,
+    ) -> EventPage:
+        """
+        Retrieve one page of matching events, resuming after the page that returned `cursor`.
+
+        Events are returned in the order they were written. The cursor holds the byte offset of the last
+        event in the page, so the next page is read from there rather than from the start of the file.
+        When the query includes an indexed field, only the indexed lines after the offset are read.
+
+        Args:
+            group (str): The group to search events in.
+            event_type (BaseEventType, optional): The type of event to retrieve. Defaults to BaseEvent.
+            query_dict (dict, optional): A dictionary where the key is the field to match and the value is the value to match.
+            start_time (datetime, optional): Only return events at or after this time.
+            end_time (datetime, optional): Only return events at or before this time.
+            page_size (int, optional): Maximum number of events in the page. Defaults to 100.
+            cursor (str, optional): `next_cursor` of the previous page. Defaults to the first page.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return events as dicts, without validating them as event_type. Defaults to False.
+
+        Raises:
+            ValueError: If an invalid group, query key, field, page size or cursor is provided.
+
+        Returns:
+            EventPage: The events in the page, and the cursor for the next page.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        query_dict = query_dict or {}
+        for key in query_dict.keys():
+            if key not in event_type.model_fields:
+                raise ValueError(f"Invalid key {key} in query_dict")
+        _check_fields(fields, event_type)
+        if page_size <= 0:
+            raise ValueError("page_size must be greater than 0")
+
+        offset, after_time = 0, None
+        if cursor is not None:
+            offset, after_time = self._resume_position(group, _decode_cursor(cursor))
+        offsets = self._candidate_offsets(group, query_dict) if self._indexes else None
+        if offsets is not None:
+            offsets = offsets[bisect.bisect_left(offsets, offset) :]
+            lines = zip(offsets, self._read_lines_at(group, offsets))
+        else:
+            lines = self._iter_lines_from(group, offset)
+
+        expected = [(key, _raw_query_value(value)) for key, value in query_dict.items()]
+        check_time = start_time is not None or end_time is not None or after_time
+        matched: List[tuple[int, bytes, dict]] = []
+        # read one event past the page, to know whether there is a next page
+        for line_offset, line in lines:
+            record = json.loads(line)
+            if not all(record.get(key) == value for key, value in expected):
+                continue
+            if check_time:
+                timestamp = _parse_timestamp(record["timestamp"])
+                if (
+                    (start_time is not None and timestamp < start_time)
+                    or (end_time is not None and timestamp > end_time)
+                    or (after_time is not None and timestamp <= after_time)
+                ):
                     continue
-        return sorted(events, key=lambda x: x.timestamp)
+            matched.append((line_offset, line, record))
+            if len(matched) > page_size:
+                break
+
+        next_cursor = None
+        if len(matched) > page_size:
+            matched = matched[:page_size]
+            last_offset, _, last_record = matched[-1]
+            next_cursor = _encode_cursor(
+                last_record["timestamp"], last_record["uuid"], last_offset
+            )
+        if fields is not None or raw:
+            # keep the order events were written in
+            events = [_raw_result(record, fields) for _, _, record in matched]
+        else:
+            events = [event_type.model_validate_json(line) for _, line, _ in matched]
+        return EventPage(events, next_cursor)
 
     def count_events_by_query(
         self,
         query_dict: dict,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
     ) -> int:
         """
@@ -320,17 +2292,45 @@ class FileLoggingClient(BaseLoggingClient):
 
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
 
         Returns:
             int: The number of events that match the query for the specified group and event type.
         """
-        return len(
-            self.search_events_by_query(
-                query_dict=query_dict, group=group, event_type=event_type, limit=None
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return sum(
+                self._map_groups(
+                    lambda group: self.count_events_by_query(
+                        query_dict, group, event_type
+                    ),
+                    groups,
+                )
             )
-        )
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        for key in query_dict.keys():
+            if key not in event_type.model_fields:
+                raise ValueError(f"Invalid key {key} in query_dict")
+
+        if self._indexes:
+            matched = self._count_indexed(query_dict, group)
+            if matched is not None:
+                return matched
+
+        # count matches as the file is read, rather than collecting the events
+        matched = 0
+        for line in self._iter_lines(group):
+            event = event_type.model_validate_json(line)
+            try:
+                if all(
+                    getattr(event, key) == value for key, value in query_dict.items()
+                ):
+                    matched += 1
+            except AttributeError:
+                logger.exception("Failed to match query_dict to event")
+        return matched
 
     def get_event_by_uuid(
         self, uuid_obj: uuid.UUID, group: str, event_type: BaseEventType
@@ -367,46 +2367,207 @@ class FileLoggingClient(BaseLoggingClient):
         Returns:
             None
         """
+        counts = self._counts_for_storage(group)
+        indexes = self._indexes_for_storage(group)
+        append_order = self._append_order_for_storage(group)
+        if counts or indexes:
+            # the file is rewritten below, so catch up with events appended before this update first
+            with self._sidecar_lock:
+                for count in counts:
+                    self._catch_up_count(count)
+                for index in indexes:
+                    self._catch_up_index(index)
+
+        # appends made while the file is rewritten would be lost
+        with self._write_lock:
+            # recently written events are the ones usually updated, so look in the newest segment first
+            for base, path in reversed(self._segments(group)):
+                in_file = path == self._filepaths[group]
+                rewritten = self._rewrite_event(
+                    path,
+                    event,
+                    event_type,
+                    bool(indexes) or append_order is not None,
+                    sealed=not in_file,
+                )
+                if rewritten is not None:
+                    break
+            else:
+                return {"matched_count": 0, "modified_count": 0}
+            if in_file:
+                # make new file handle to get to end of file
+                self.file_handles[group].close()
+                self.file_handles[group] = open(
+                    self._filepaths[group], "a", encoding="utf-8"
+                )
+        old_line, new_line, line_offset = rewritten
+        line_offset += base
+
+        if counts:
+            # replace the old event with the updated one in materialized counts
+            with self._sidecar_lock:
+                for count in counts:
+                    old_event = self._as_event_type(count.event_type, data=old_line)
+                    count.add(old_event, -1)
+                    count.add(self._as_event_type(count.event_type, event, new_line))
+                    if in_file:
+                        count.offset = self._end_offset(group)
+                    self._save_count(count)
+
+        # the updated line moved every line after it in its segment by the change in its size
+        size_change = len(new_line.encode("utf-8")) + 1
+        size_change -= len(old_line.encode("utf-8"))
+        segment_end = None if in_file else base + (1 << SEGMENT_OFFSET_BITS)
+        old_record = json.loads(old_line)
+        new_record = json.loads(new_line)
+        if append_order is not None:
+            with self._sidecar_lock:
+                if old_record.get("timestamp") != new_record.get("timestamp"):
+                    # the line may now be out of order, so stop relying on it
+                    append_order.ordered = False
+                elif line_offset < append_order.offset and (
+                    segment_end is None or append_order.offset < segment_end
+                ):
+                    append_order.offset += size_change
+
+        if indexes:
+            with self._sidecar_lock:
+                for index in indexes:
+                    index.replace(
+                        line_offset,
+                        old_record.get(index.field),
+                        new_record.get(index.field),
+                        size_change,
+                        segment_end,
+                    )
+                    self._save_index(index)
+
+        return {"matched_count": 1, "modified_count": 1}
+
+    def _rewrite_event(
+        self,
+        path: pathlib.Path,
+        event: BaseEvent,
+        event_type: BaseEventType,
+        track_offset: bool = False,
+        sealed: bool = False,
+    ) -> Optional[tuple[str, str, int]]:
+        """
+        Rewrite a file with the line of the event with the same uuid replaced by the event.
+
+        Sealed segments keep their modification time, which decides when they expire.
+
+        Returns:
+            tuple[str, str, int]: The old line, the new line (without newline) and the offset of the line
+                in the file (if `track_offset` is set), or None if the event is not in the file.
+        """
         # open a named temporary file in same directory as original file
         temp_file_handle = NamedTemporaryFile(mode="w", dir=self._directory)
         found: bool = False
-        with open(self._filepaths[group], "r", encoding="utf-8") as current_file_handle:
+        old_line: str = None
+        new_line: str = None
+        line_offset = 0
+        try:
+            current_file_handle = open(path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            temp_file_handle.close()
+            return None
+        with current_file_handle:
             for line in current_file_handle:
                 # use pydantic to validate line
                 if found:
                     temp_file_handle.write(line)
                     continue
                 line_event = event_type.model_validate_json(line)
+                if track_offset and line_event.uuid != event.uuid:
+                    line_offset += len(line.encode("utf-8"))
 
                 # check if line contains event with UUID to update
                 if line_event.uuid == event.uuid:
                     # if it does, write updated event to temp file
                     # and set flag for event found
-                    temp_file_handle.write(
-                        event.model_dump_json(exclude_none=self.exclude_none)
-                    )
+                    old_line = line
+                    new_line = event.model_dump_json(exclude_none=self.exclude_none)
+                    temp_file_handle.write(new_line)
                     temp_file_handle.write("\n")  # newline after updated event
                     found = True
+                    continue
 
                 # otherwise write line to temp file
                 temp_file_handle.write(line)
 
-        response_obj = {"matched_count": 0, "modified_count": 0}
         if found:
             temp_file_handle.flush()
-            copyfile(temp_file_handle.name, self._filepaths[group])
-            response_obj = {"matched_count": 1, "modified_count": 1}
-
-            # make new file handle to get to end of file
-            self.file_handles[group].close()
-            self.file_handles[group] = open(
-                self._filepaths[group], "a", encoding="utf-8"
-            )
+            modified_time = path.stat().st_mtime
+            copyfile(temp_file_handle.name, path)
+            if sealed:
+                os.utime(path, (time.time(), modified_time))
 
         # ensure temp file gets closed and deleted
         temp_file_handle.close()
+        if not found:
+            return None
+        return old_line, new_line, line_offset
 
-        return response_obj
+
+class MongoIndexSpec(BaseModel):
+    """
+    Declaration of a MongoDB index, created on the collection of each group it applies to.
+
+    Attributes:
+        keys (list[tuple[str, int]]): Indexed fields and directions. Plain field names are indexed ascending.
+        groups (list[str], optional): Groups to create the index for. Defaults to every group.
+        event_type (Type[BaseEvent], optional): Event type whose fields the keys must belong to.
+        partial_filter (dict, optional): Only index documents matching this filter (``partialFilterExpression``).
+        unique (bool): Whether indexed values must be unique. Defaults to False.
+        name (str, optional): Name of the index. Defaults to one derived from the keys.
+    """
+
+    keys: List[tuple[str, int]]
+    groups: Optional[List[str]] = None
+    event_type: Optional[Type[BaseEvent]] = None
+    partial_filter: Optional[dict] = None
+    unique: bool = False
+    name: Optional[str] = None
+
+    @field_validator("keys", mode="before")
+    @classmethod
+    def normalize_keys(cls, value: Any) -> Any:
+        if isinstance(value, str):
+            value = [value]
+        keys = [(key, 1) if isinstance(key, str) else key for key in value]
+        if not keys:
+            raise ValueError("an index needs at least one key")
+        return keys
+
+    @model_validator(mode="after")
+    def check_fields(self) -> "MongoIndexSpec":
+        if self.event_type is not None:
+            for field, _ in self.keys:
+                if field.split(".")[0] not in self.event_type.model_fields:
+                    raise ValueError(
+                        f"Invalid index key {field} for {self.event_type.__name__}"
+                    )
+        if self.name is None:
+            self.name = (
+                "_".join(f"{field}_{direction}" for field, direction in self.keys)
+                + "_index"
+            )
+        return self
+
+    def applies_to(self, group: str) -> bool:
+        return self.groups is None or group in self.groups
+
+    def covers(self, query_dict: dict) -> bool:
+        """Whether an equality query on these fields can be answered from this index alone
+
+        The queried fields must be a prefix of the index keys. Partial indexes are never used,
+        since they may not hold every matching document.
+        """
+        if self.partial_filter is not None or not query_dict:
+            return False
+        prefix = {field for field, _ in self.keys[: len(query_dict)]}
+        return prefix == set(query_dict)
 
 
 class MongoDBLoggingClient(BaseLoggingClient):
@@ -421,18 +2582,92 @@ class MongoDBLoggingClient(BaseLoggingClient):
         groups (list[str]): A list of log groups to be used.
         exclude_none (bool, optional): Whether to exclude None values when logging. Defaults to True.
         database_name (str, optional): The name of the MongoDB database to use. If not provided, a default name will be used.
+        lazy_connect (bool, optional): Skip the blocking connection check on startup, and create missing indices
+            in a background thread. Defaults to False.
+        drop_database (bool, optional): Drop the existing database on startup. Defaults to True for eager
+            startup, and False when `lazy_connect` is set.
+        client_options (dict[str, Any], optional): Extra keyword arguments for MongoClient, such as pool size,
+            idle timeout and compression.
+        share_client (bool, optional): Reuse a process-wide MongoClient for the same URL and options,
+            instead of opening a new connection pool. Defaults to True.
+        indexes (list[MongoIndexSpec | dict], optional): Extra compound or partial indexes to create,
+            in addition to the `uuid` and `timestamp` indices.
+        timeseries (bool, optional): Create each group as a time-series collection, with `timestamp` as its
+            time field. Requires MongoDB 5.0, and updating events (as countable events do) requires MongoDB 7.0.
+            Defaults to False.
+        timeseries_meta_fields (list[str], optional): Event fields stored in the metadata of time-series
+            collections, such as `user` or `function_name`. They are moved to a `meta` subdocument on write,
+            and moved back on read. Defaults to none.
+        timeseries_granularity (str, optional): One of TIMESERIES_GRANULARITIES, matching the usual interval
+            between events with the same metadata. Defaults to "seconds".
+        retention (dict[str, float | timedelta], optional): Retention period per group, in seconds or as a
+            timedelta. Events are deleted by MongoDB once they are older, using a TTL on the `timestamp` index
+            (or the collection's expiry, for time-series collections).
+        capped_sizes (dict[str, int], optional): Create these groups as capped collections of this many bytes,
+            which drop their oldest events when full. Cannot be combined with `timeseries` or `retention`.
 
     """
 
+    backend_name = "mongodb"
+
     def __init__(
         self,
         mongo_url: str,
         groups: list[str],
         exclude_none: bool = True,
         database_name: str = None,
+        lazy_connect: bool = False,
+        drop_database: bool = None,
+        client_options: dict[str, Any] = None,
+        share_client: bool = True,
+        indexes: list[MongoIndexSpec] = None,
+        timeseries: bool = False,
+        timeseries_meta_fields: list[str] = None,
+        timeseries_granularity: str = "seconds",
+        retention: dict[str, Union[float, timedelta]] = None,
+        capped_sizes: dict[str, int] = None,
     ) -> None:
         super().__init__(groups, exclude_none)
         logger.debug("Initializing MongoDBLoggingClient")
+        self._retention = _retention_seconds(retention, groups)
+        self._capped_sizes: dict[str, int] = dict(capped_sizes or {})
+        for group, size in self._capped_sizes.items():
+            if group not in self._groups:
+                raise ValueError(
+                    f"Invalid group {group} provided for capped collection"
+                )
+            if size <= 0:
+                raise ValueError(
+                    f"Capped size for group {group} must be greater than 0"
+                )
+            if timeseries:
+                raise ValueError("Time-series collections cannot be capped")
+            if group in self._retention:
+                raise ValueError(
+                    f"Group {group} cannot have both a retention period and a capped size"
+                )
+        self._index_specs: List[MongoIndexSpec] = [
+            MongoIndexSpec.model_validate(spec) for spec in (indexes or [])
+        ]
+        for spec in self._index_specs:
+            for group in spec.groups or []:
+                if group not in self._groups:
+                    raise ValueError(f"Invalid group {group} provided for index")
+            if timeseries and spec.unique:
+                raise ValueError(
+                    f"Unique index {spec.name} is not supported by time-series collections"
+                )
+        if timeseries_granularity not in TIMESERIES_GRANULARITIES:
+            raise ValueError(
+                f"Invalid granularity {timeseries_granularity}, expected one of {TIMESERIES_GRANULARITIES}"
+            )
+        self._timeseries = timeseries
+        self._timeseries_granularity = timeseries_granularity
+        self._meta_fields: List[str] = list(timeseries_meta_fields or [])
+        if self._meta_fields and not timeseries:
+            raise ValueError("timeseries_meta_fields requires timeseries")
+        if "timestamp" in self._meta_fields:
+            raise ValueError("timestamp is the time field, and cannot be a meta field")
         try:  # pragma: no cover
             from bson.binary import UuidRepresentation
             from bson.codec_options import CodecOptions
@@ -447,34 +2682,202 @@ class MongoDBLoggingClient(BaseLoggingClient):
         self._database_name = database_name
         if self._database_name is None:
             self._database_name = DEFAULT_DATABASE_NAME
-
-        self._mongo_client = MongoClient(
-            self._mongo_url,
-            serverSelectionTimeoutMS=5000,
-            uuidRepresentation="standard",
-        )
-        try:
-            self._mongo_client.list_database_names()
-        except ServerSelectionTimeoutError:
-            print("Failed to connect to MongoDB")
-            raise
-        logger.debug("Initial MongoDB connection successful")
-        self.reset_db()
+        self._lazy_connect = lazy_connect
+        # only the legacy eager startup drops existing data by default
+        if drop_database is None:
+            drop_database = not lazy_connect
+        self._index_thread: threading.Thread = None
+
+        # MongoClient does not contact the server until the first operation
+        client_options = client_options or {}
+        if share_client:
+            self._mongo_client = get_shared_mongo_client(
+                self._mongo_url, **client_options
+            )
+        else:
+            self._mongo_client = MongoClient(
+                self._mongo_url, **{**DEFAULT_MONGO_CLIENT_OPTIONS, **client_options}
+            )
+        if not self._lazy_connect:
+            try:
+                self._mongo_client.list_database_names()
+            except ServerSelectionTimeoutError:
+                print("Failed to connect to MongoDB")
+                raise
+            logger.debug("Initial MongoDB connection successful")
+        if drop_database:
+            self.reset_db()
         self._db = self._mongo_client[self._database_name].with_options(
             CodecOptions(tz_aware=True, uuid_representation=UuidRepresentation.STANDARD)
         )
-        self._configure_indices()
+        if self._timeseries or self._capped_sizes:
+            # created even with lazy_connect, since the first insert would otherwise
+            # create an ordinary collection
+            self._create_collections()
+        if self._lazy_connect:
+            # build indices off the calling thread, so startup and the first
+            # log_message do not wait on the server
+            self._index_thread = threading.Thread(
+                target=self._configure_indices_in_background,
+                name="eventit-mongodb-indices",
+                daemon=True,
+            )
+            self._index_thread.start()
+        else:
+            self._configure_indices()
+
+    def _create_collections(self) -> None:
+        """Create the time-series or capped collection of each group that does not have a collection yet"""
+        existing_collections = set(self._db.list_collection_names())
+        for group in self._groups:
+            if not self._timeseries and group not in self._capped_sizes:
+                continue
+            if group in existing_collections:
+                options = self._db[group].options()
+                if self._timeseries and "timeseries" not in options:
+                    logger.warning(
+                        "Collection %s already exists, and is not a time-series collection",
+                        group,
+                    )
+                if group in self._capped_sizes and not options.get("capped"):
+                    logger.warning(
+                        "Collection %s already exists, and is not capped", group
+                    )
+                continue
+            if group in self._capped_sizes:
+                self._db.create_collection(
+                    group, capped=True, size=self._capped_sizes[group]
+                )
+                continue
+            collection_options = {}
+            if group in self._retention:
+                collection_options["expireAfterSeconds"] = int(self._retention[group])
+            self._db.create_collection(
+                group,
+                timeseries={
+                    "timeField": "timestamp",
+                    "metaField": TIMESERIES_META_FIELD,
+                    "granularity": self._timeseries_granularity,
+                },
+                **collection_options,
+            )
+
+    def _configure_retention(self, group: str, existing_indices: dict) -> None:
+        """Expire a group's events after its retention period, updating an existing expiry if it changed"""
+        expire_after = int(self._retention[group])
+        if self._timeseries:
+            # time-series collections expire whole buckets, set on the collection itself
+            if self._db[group].options().get("expireAfterSeconds") != expire_after:
+                self._db.command("collMod", group, expireAfterSeconds=expire_after)
+            return
+        timestamp_index = existing_indices.get("timestamp_index")
+        if timestamp_index is None:
+            self._db[group].create_index(
+                [("timestamp", 1)],
+                name="timestamp_index",
+                expireAfterSeconds=expire_after,
+            )
+        elif timestamp_index.get("expireAfterSeconds") != expire_after:
+            self._db.command(
+                "collMod",
+                group,
+                index={"name": "timestamp_index", "expireAfterSeconds": expire_after},
+            )
+
+    def _to_storage(self, document: dict) -> dict:
+        """Move the meta fields of a document into its meta subdocument"""
+        meta = {
+            field: document.pop(field)
+            for field in self._meta_fields
+            if field in document
+        }
+        if meta:
+            document[TIMESERIES_META_FIELD] = meta
+        return document
+
+    def _from_storage(self, document: dict) -> dict:
+        """Move the fields of a stored document's meta subdocument back to the top level"""
+        if self._meta_fields:
+            document.update(document.pop(TIMESERIES_META_FIELD, {}))
+        return document
+
+    def _storage_field(self, field: str) -> str:
+        """Name under which a field is stored"""
+        if field.split(".")[0] in self._meta_fields:
+            return f"{TIMESERIES_META_FIELD}.{field}"
+        return field
+
+    def _storage_query(self, query_dict: dict) -> dict:
+        """Rewrite the fields of an equality query to where they are stored"""
+        if not self._meta_fields:
+            return query_dict
+        return {self._storage_field(key): value for key, value in query_dict.items()}
 
     def _configure_indices(self) -> None:
         """Configure indices for each group in the database.
 
-        This method adds an index on the `uuid` field and the `timestamp` field for each group in the database.
-        The `uuid` field has a uniqueness constraint, while the `timestamp` field does not.
+        This method adds an index on the `uuid` field and the `timestamp` field for each group in the database,
+        and a compound `timestamp`, `uuid` index for paginated searches.
+        The `uuid` field has a uniqueness constraint (except in time-series collections, which do not support one),
+        while the `timestamp` field does not. The `timestamp` index is a TTL index for groups with a retention period.
+        Declared indexes are then created on the groups they apply to, on the stored location of meta fields.
+        Indices that already exist on a collection are left untouched.
         """
         # add index on uuid field and timestamp field with uniqueness constraint, for each group
         for group in self._groups:
-            self._db[group].create_index([("uuid", 1)], unique=True, name="uuid_index")
-            self._db[group].create_index([("timestamp", 1)], name="timestamp_index")
+            existing_indices = self._db[group].index_information()
+            if "uuid_index" not in existing_indices:
+                self._db[group].create_index(
+                    [("uuid", 1)], unique=not self._timeseries, name="uuid_index"
+                )
+            if group in self._retention:
+                self._configure_retention(group, existing_indices)
+            elif "timestamp_index" not in existing_indices:
+                self._db[group].create_index([("timestamp", 1)], name="timestamp_index")
+            if "timestamp_uuid_index" not in existing_indices:
+                # keyset pagination sorts and resumes on (timestamp, uuid)
+                self._db[group].create_index(
+                    [("timestamp", 1), ("uuid", 1)], name="timestamp_uuid_index"
+                )
+            for spec in self._index_specs:
+                if not spec.applies_to(group) or spec.name in existing_indices:
+                    continue
+                index_options = {"name": spec.name, "unique": spec.unique}
+                if spec.partial_filter is not None:
+                    index_options["partialFilterExpression"] = self._storage_query(
+                        spec.partial_filter
+                    )
+                keys = [
+                    (self._storage_field(field), direction)
+                    for field, direction in spec.keys
+                ]
+                self._db[group].create_index(keys, **index_options)
+
+    def _configure_indices_in_background(self) -> None:
+        """Run `_configure_indices`, logging instead of raising on failure.
+
+        Used as the target of the background index thread when `lazy_connect` is set.
+        """
+        try:
+            self._configure_indices()
+        except Exception:
+            logger.exception("Failed to configure MongoDB indices in background")
+        else:
+            logger.debug("Background MongoDB index configuration complete")
+
+    def wait_for_indices(self, timeout: float = None) -> bool:
+        """Block until background index configuration has finished.
+
+        Args:
+            timeout (float, optional): Maximum number of seconds to wait. Defaults to waiting forever.
+
+        Returns:
+            bool: True if no index configuration is still running.
+        """
+        if self._index_thread is None:
+            return True
+        self._index_thread.join(timeout)
+        return not self._index_thread.is_alive()
 
     def reset_db(self):
         """
@@ -510,15 +2913,67 @@ class MongoDBLoggingClient(BaseLoggingClient):
         """
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
-        self._db[group].insert_one(message.model_dump(exclude_none=self.exclude_none))
+        stopwatch = self._stopwatch("backend.log_message")
+        document = self._to_storage(message.model_dump(exclude_none=self.exclude_none))
+        stopwatch.lap("serialize")
+        self._db[group].insert_one(document)
+        stopwatch.lap("write")
+        if self._self_metrics is not None:
+            from bson import encode
+
+            self._self_metrics.increment(
+                "bytes_written_total",
+                len(encode(document, codec_options=self._db.codec_options)),
+                group=group,
+                backend=self.backend_name,
+            )
+
+    def log_messages(self, messages: List[BaseEvent], group: str) -> None:
+        """
+        Log several messages into MongoDB with a single ordered insert_many.
+
+        Args:
+            messages (List[BaseEvent]): The messages to be logged.
+            group (str): The log group to which the messages belong.
+
+        Raises:
+            ValueError: If an invalid log group is provided.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        if not messages:
+            return
+        stopwatch = self._stopwatch("backend.log_messages")
+        documents = [
+            self._to_storage(message.model_dump(exclude_none=self.exclude_none))
+            for message in messages
+        ]
+        stopwatch.lap("serialize")
+        self._db[group].insert_many(documents, ordered=True)
+        stopwatch.lap("write")
+        if self._self_metrics is not None:
+            from bson import encode
+
+            self._self_metrics.increment(
+                "bytes_written_total",
+                sum(
+                    len(encode(document, codec_options=self._db.codec_options))
+                    for document in documents
+                ),
+                group=group,
+                backend=self.backend_name,
+            )
 
     def search_events_by_timestamp(
         self,
         start_time: datetime,
         end_time: datetime,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
         limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events within a specified time range for a specific group and event type.
@@ -526,35 +2981,81 @@ class MongoDBLoggingClient(BaseLoggingClient):
         Args:
             start_time (datetime): The start time of the search range.
             end_time (datetime): The end time of the search range.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+                MongoDB only sends the requested fields.
+            raw (bool, optional): Return documents as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): "asc" for the oldest `limit` events first, or "desc" for the newest first.
+                The timestamp index serves the sort, so only `limit` documents are read.
+                Defaults to the first `limit` documents found, sorted by timestamp.
 
         Returns:
             List[BaseEvent]: A sorted list of events that fall within the specified time range for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return self._search_groups(
+                self.search_events_by_timestamp,
+                groups,
+                limit,
+                fields,
+                order,
+                start_time=start_time,
+                end_time=end_time,
+                event_type=event_type,
+                raw=raw,
+            )
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
+        _check_fields(fields, event_type)
+        _check_order(order)
         query = {"timestamp": {"$gte": start_time, "$lte": end_time}}
-        events = self._db[group].find(query).limit(limit if limit else 0)
-        events = [event_type.model_validate(event) for event in events]
-        return sorted(events, key=lambda x: x.timestamp)
+        return self._find(query, group, event_type, limit, fields, raw, order)
 
     def search_events_by_query(
-        self, query_dict: dict, group: str, event_type: BaseEventType, limit: int = None
+        self,
+        query_dict: dict,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
     ) -> List[BaseEventType]:
         """
         Search events based on a query dictionary for a specific group and event type.
 
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
             limit (int, optional): The maximum number of events to return. Defaults to None.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+                MongoDB only sends the requested fields.
+            raw (bool, optional): Return documents as dicts, without validating them as event_type. Defaults to False.
+            order (str, optional): "asc" for the oldest `limit` events first, or "desc" for the newest first.
+                The timestamp index serves the sort, so only `limit` documents are read.
+                Defaults to the first `limit` documents found, sorted by timestamp.
 
         Returns:
             List[BaseEventType]: A list of events that match the query for the specified group and event type.
+                Dicts are returned instead if `fields` or `raw` is set.
         """
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return self._search_groups(
+                self.search_events_by_query,
+                groups,
+                limit,
+                fields,
+                order,
+                query_dict=query_dict,
+                event_type=event_type,
+                raw=raw,
+            )
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
 
@@ -562,15 +3063,161 @@ class MongoDBLoggingClient(BaseLoggingClient):
         for key in query_dict.keys():
             if key not in event_type.model_fields:
                 raise ValueError(f"Invalid key {key} in query_dict")
+        _check_fields(fields, event_type)
+        _check_order(order)
+
+        return self._find(
+            self._storage_query(query_dict),
+            group,
+            event_type,
+            limit,
+            fields,
+            raw,
+            order,
+        )
+
+    def search_events_page(
+        self,
+        group: str,
+        event_type: BaseEventType = BaseEvent,
+        query_dict: dict = None,
+        start_time: datetime = None,
+        end_time: datetime = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: List[str] = None,
+        raw: bool = False,
+    ) -> EventPage:
+        """
+        Retrieve one page of matching events, resuming after the page that returned `cursor`.
+
+        Events are sorted by (timestamp, uuid), and the cursor holds those of the last event in the page.
+        The next page is a range query starting after that key, served by the `timestamp_uuid` index.
+
+        Args:
+            group (str): The group to search events in.
+            event_type (BaseEventType, optional): The type of event to retrieve. Defaults to BaseEvent.
+            query_dict (dict, optional): A dictionary where the key is the field to match and the value is the value to match.
+            start_time (datetime, optional): Only return events at or after this time.
+            end_time (datetime, optional): Only return events at or before this time.
+            page_size (int, optional): Maximum number of events in the page. Defaults to 100.
+            cursor (str, optional): `next_cursor` of the previous page. Defaults to the first page.
+            fields (List[str], optional): Only return these fields of each event, as dicts.
+            raw (bool, optional): Return documents as dicts, without validating them as event_type. Defaults to False.
+
+        Raises:
+            ValueError: If an invalid group, query key, field, page size or cursor is provided.
+
+        Returns:
+            EventPage: The events in the page, and the cursor for the next page.
+        """
+        if group not in self._groups:
+            raise ValueError(f"Invalid group {group} provided")
+        query_dict = query_dict or {}
+        for key in query_dict.keys():
+            if key not in event_type.model_fields:
+                raise ValueError(f"Invalid key {key} in query_dict")
+        _check_fields(fields, event_type)
+        if page_size <= 0:
+            raise ValueError("page_size must be greater than 0")
+
+        conditions = [self._storage_query(query_dict)]
+        time_range = {}
+        if start_time is not None:
+            time_range["$gte"] = start_time
+        if end_time is not None:
+            time_range["$lte"] = end_time
+        if time_range:
+            conditions.append({"timestamp": time_range})
+        if cursor is not None:
+            position = _decode_cursor(cursor)
+            conditions.append(
+                {
+                    "$or": [
+                        {"timestamp": {"$gt": position["timestamp"]}},
+                        {
+                            "timestamp": position["timestamp"],
+                            "uuid": {"$gt": position["uuid"]},
+                        },
+                    ]
+                }
+            )
+
+        projection = None
+        if fields is not None:
+            # timestamp and uuid are always fetched, for the next cursor
+            projection = {self._storage_field(field): 1 for field in fields}
+            projection.update(_id=0, timestamp=1, uuid=1)
+        elif raw:
+            projection = {"_id": 0}
+        # read one document past the page, to know whether there is a next page
+        documents = [
+            self._from_storage(document)
+            for document in self._db[group]
+            .find({"$and": conditions}, projection)
+            .sort([("timestamp", 1), ("uuid", 1)])
+            .limit(page_size + 1)
+        ]
+
+        next_cursor = None
+        if len(documents) > page_size:
+            documents = documents[:page_size]
+            next_cursor = _encode_cursor(
+                documents[-1]["timestamp"], documents[-1]["uuid"]
+            )
+        if fields is not None:
+            for document in documents:
+                for key in ("timestamp", "uuid"):
+                    if key not in fields:
+                        del document[key]
+        if fields is not None or raw:
+            return EventPage(documents, next_cursor)
+        return EventPage(
+            [event_type.model_validate(document) for document in documents],
+            next_cursor,
+        )
 
-        cursor = self._db[group].find(query_dict).limit(limit if limit else 0)
-        events: List[BaseEvent] = [event_type.model_validate(doc) for doc in cursor]
-        return sorted(events, key=lambda x: x.timestamp)
+    def _find(
+        self,
+        query: dict,
+        group: str,
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
+    ) -> List[BaseEventType]:
+        """Run a find query, returning events sorted by timestamp, or dicts for `fields` and `raw`"""
+        projection = None
+        if fields is not None or raw:
+            projection = {"_id": 0}
+        if fields is not None:
+            # timestamp is always fetched, to sort the results
+            projection.update(
+                {self._storage_field(field): 1 for field in fields}, timestamp=1
+            )
+        cursor = self._db[group].find(query, projection)
+        if order is not None:
+            # sorting on the server, before the limit, returns the first events by timestamp
+            cursor = cursor.sort("timestamp", 1 if order == "asc" else -1)
+        cursor = cursor.limit(limit if limit else 0)
+        if order is None:
+            cursor = sorted(cursor, key=lambda document: document["timestamp"])
+        if self._meta_fields:
+            cursor = map(self._from_storage, cursor)
+
+        if fields is None and not raw:
+            return [event_type.model_validate(document) for document in cursor]
+        documents = list(cursor)
+        if fields is not None and "timestamp" not in fields:
+            for document in documents:
+                del document["timestamp"]
+        return documents
 
     def count_events_by_query(
         self,
         query_dict: dict,
-        group: str,
+        group: Union[str, List[str]],
         event_type: BaseEventType,
     ) -> int:
         """
@@ -578,12 +3225,22 @@ class MongoDBLoggingClient(BaseLoggingClient):
 
         Args:
             query_dict (dict): A dictionary where the key is the field to match and the value is the value to match.
-            group (str): The group to search events in.
+            group (str | list[str]): The group to search events in, a list of groups, or ALL_GROUPS.
             event_type (str): The type of event to retrieve.
 
         Returns:
             int: The number of events that match the query for the specified group and event type.
         """
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return sum(
+                self._map_groups(
+                    lambda group: self.count_events_by_query(
+                        query_dict, group, event_type
+                    ),
+                    groups,
+                )
+            )
         if group not in self._groups:
             raise ValueError(f"Invalid group {group} provided")
 
@@ -592,7 +3249,26 @@ class MongoDBLoggingClient(BaseLoggingClient):
             if key not in event_type.model_fields:
                 raise ValueError(f"Invalid key {key} in query_dict")
 
-        return self._db[group].count_documents(query_dict)
+        index = self._covering_index(group, query_dict)
+        if index is not None:
+            # the hinted index holds every queried field, so matches are counted
+            # from the index keys without fetching documents
+            return self._db[group].count_documents(
+                self._storage_query(query_dict), hint=index.name
+            )
+        return self._db[group].count_documents(self._storage_query(query_dict))
+
+    def _covering_index(self, group: str, query_dict: dict) -> MongoIndexSpec:
+        """Smallest declared index that can answer an equality query on its own, or None"""
+        if self._index_thread is not None and self._index_thread.is_alive():
+            # declared indexes may not exist yet
+            return None
+        covering = [
+            spec
+            for spec in self._index_specs
+            if spec.applies_to(group) and spec.covers(query_dict)
+        ]
+        return min(covering, key=lambda spec: len(spec.keys), default=None)
 
     def get_event_by_uuid(
         self, uuid_obj: uuid.UUID, group: str, event_type: BaseEventType
@@ -634,7 +3310,11 @@ class MongoDBLoggingClient(BaseLoggingClient):
         """
         update_response = self._db[group].update_one(
             {"uuid": event.uuid},
-            {"$set": event.model_dump(exclude_none=self.exclude_none)},
+            {
+                "$set": self._to_storage(
+                    event.model_dump(exclude_none=self.exclude_none)
+                )
+            },
         )
 
         response_obj = {
@@ -0,0 +1,286 @@
+import inspect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from eventit_py.instrumentation import HISTOGRAM_BUCKET_COUNT, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "eventit"
+DEFAULT_EXPORTER_HOST = "127.0.0.1"
+DEFAULT_EXPORTER_PORT = 9464
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# help text for the metrics eventit records about itself
+METRIC_DESCRIPTIONS = {
+    "events_total": ("counter", "Events written to the backend"),
+    "bytes_written_total": ("counter", "Serialized bytes written to the backend"),
+    "dropped_events_total": ("counter", "Events dropped before reaching the backend"),
+    "spilled_events_total": ("counter", "Events spilled to the local disk buffer"),
+    "backend_errors_total": ("counter", "Backend operations that raised an error"),
+    "queue_depth": ("gauge", "Events waiting to be written to the backend"),
+    "search_duration_seconds": ("histogram", "Latency of backend search and count"),
+}
+
+# backend methods whose latency is observed as search_duration_seconds
+SEARCH_METHODS = {
+    "search_events_by_timestamp",
+    "search_events_by_query",
+    "search_events_page",
+    "count_events_by_query",
+    "get_event_by_uuid",
+}
+
+
+def _escape_label_value(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape_label_value(value)}"' for key, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _metric_key(name: str, labels: dict[str, Any]) -> tuple[str, tuple]:
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class SelfMetrics:
+    """
+    Counters, gauges and latency histograms describing eventit itself, labelled by group and backend.
+
+    Gauges can be registered as callbacks, which are evaluated when the metrics are rendered.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._gauges: dict[tuple[str, tuple], Any] = {}
+        self._histograms: dict[tuple[str, tuple], LatencyHistogram] = {}
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        """Increase a counter with the given labels"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: Any, **labels) -> None:
+        """Set a gauge with the given labels, to a number or a zero-argument callable returning one"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a latency (in seconds) in a histogram with the given labels"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def get(self, name: str, **labels) -> Any:
+        """Current value of a counter or gauge (or the histogram for a histogram metric)"""
+        key = _metric_key(name, labels)
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            if key in self._histograms:
+                return self._histograms[key]
+            value = self._gauges.get(key)
+        return value() if callable(value) else value
+
+    def reset(self) -> None:
+        """Clear all counters and histograms. Registered gauges are kept."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def wrap(self, method: str, func: Callable, backend: str) -> Callable:
+        """Wrap a backend method, counting events and errors, and timing searches by group
+
+        Args:
+            method (str): Name of the wrapped method.
+            func (Callable): Bound method to wrap.
+            backend (str): Name of the backend, used as a label.
+
+        Returns:
+            Callable: The wrapped method.
+        """
+        parameters = list(inspect.signature(func).parameters)
+        group_index = parameters.index("group") if "group" in parameters else None
+        is_search = method in SEARCH_METHODS
+        is_write = method in ("log_message", "log_messages")
+        messages_index = (
+            parameters.index("messages") if "messages" in parameters else None
+        )
+
+        def metrics_wrapper(*args, **kwargs):
+            group = kwargs.get("group")
+            if group is None and group_index is not None and len(args) > group_index:
+                group = args[group_index]
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self.increment(
+                    "backend_errors_total", group=group, backend=backend, method=method
+                )
+                raise
+            if is_write:
+                events = 1
+                if messages_index is not None:
+                    messages = kwargs.get("messages")
+                    if messages is None and len(args) > messages_index:
+                        messages = args[messages_index]
+                    events = len(messages)
+                self.increment("events_total", events, group=group, backend=backend)
+            elif is_search:
+                self.observe(
+                    "search_duration_seconds",
+                    time.perf_counter() - start,
+                    group=group,
+                    backend=backend,
+                    method=method,
+                )
+            return result
+
+        metrics_wrapper.__wrapped__ = func
+        return metrics_wrapper
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {
+                key: (list(histogram.buckets), histogram.total, histogram.count)
+                for key, histogram in self._histograms.items()
+            }
+
+        samples: dict[str, list[str]] = {}
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(
+                f"{METRIC_PREFIX}_{name}{_format_labels(labels)} {_format_value(value)}"
+            )
+        for (name, labels), value in sorted(gauges.items()):
+            try:
+                value = value() if callable(value) else value
+            except Exception:
+                logger.exception("Failed to evaluate gauge %s", name)
+                continue
+            samples.setdefault(name, []).append(
+                f"{METRIC_PREFIX}_{name}{_format_labels(labels)} {_format_value(value)}"
+            )
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            cumulative = 0
+            for bucket in range(HISTOGRAM_BUCKET_COUNT - 1):
+                cumulative += buckets[bucket]
+                bucket_labels = labels + (("le", repr((1 << bucket) / 1e6)),)
+                lines.append(
+                    f"{METRIC_PREFIX}_{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                )
+            bucket_labels = labels + (("le", "+Inf"),)
+            lines.append(
+                f"{METRIC_PREFIX}_{name}_bucket{_format_labels(bucket_labels)} {count}"
+            )
+            lines.append(
+                f"{METRIC_PREFIX}_{name}_sum{_format_labels(labels)} {total!r}"
+            )
+            lines.append(
+                f"{METRIC_PREFIX}_{name}_count{_format_labels(labels)} {count}"
+            )
+
+        output = []
+        for name, lines in samples.items():
+            metric_type, description = METRIC_DESCRIPTIONS.get(
+                name, ("untyped", name.replace("_", " "))
+            )
+            output.append(f"# HELP {METRIC_PREFIX}_{name} {description}")
+            output.append(f"# TYPE {METRIC_PREFIX}_{name} {metric_type}")
+            output.extend(lines)
+        return "\n".join(output) + "\n"
+
+
+class PrometheusExporter:
+    """
+    Serve SelfMetrics in the Prometheus text format over HTTP, from a background thread.
+
+    Args:
+        metrics (SelfMetrics): The metrics to serve.
+        host (str, optional): Address to bind to. Defaults to localhost only.
+        port (int, optional): Port to listen on. Use 0 to pick a free port. Defaults to 9464.
+    """
+
+    def __init__(
+        self,
+        metrics: SelfMetrics,
+        host: str = DEFAULT_EXPORTER_HOST,
+        port: int = DEFAULT_EXPORTER_PORT,
+    ) -> None:
+        self.metrics = metrics
+        self._host = host
+        self._port = port
+        self._server: ThreadingHTTPServer = None
+        self._thread: threading.Thread = None
+
+    @property
+    def port(self) -> int:
+        """Port the exporter is listening on"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        return self._port
+
+    def start(self) -> "PrometheusExporter":
+        """Start serving ``/metrics`` in a daemon thread"""
+        if self._server is not None:
+            return self
+        metrics = self.metrics
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics exporter: " + format, *args)
+
+        self._server = ThreadingHTTPServer((self._host, self._port), MetricsHandler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="eventit-metrics-exporter",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.debug("Serving eventit metrics on %s:%s", self._host, self.port)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving, and release the port"""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
@@ -0,0 +1,221 @@
+import contextvars
+import datetime
+import threading
+import time
+from typing import Callable, Optional
+
+DEFAULT_PROFILE_WINDOW = 60
+DEFAULT_PROFILE_MAX_WINDOWS = 60
+DEFAULT_PROFILE_MAX_PATHS = 10000
+# deeper calls (e.g. recursion) are attributed to their deepest recorded ancestor
+MAX_PROFILE_DEPTH = 64
+# call paths beyond max_paths in a window are recorded under this frame
+TRUNCATED_FRAME = "[truncated]"
+PROFILE_VALUES = ["exclusive", "inclusive", "calls"]
+
+
+class CallStats:
+    """
+    Aggregated calls of one call path in one window.
+
+    Attributes:
+        calls (int): Number of calls.
+        inclusive (float): Wall time of the calls in seconds, including nested decorated calls.
+        exclusive (float): Wall time of the calls in seconds, excluding nested decorated calls.
+    """
+
+    __slots__ = ("calls", "inclusive", "exclusive")
+
+    def __init__(self, calls: int = 0, inclusive: float = 0.0, exclusive: float = 0.0):
+        self.calls = calls
+        self.inclusive = inclusive
+        self.exclusive = exclusive
+
+    def add(self, other: "CallStats") -> None:
+        self.calls += other.calls
+        self.inclusive += other.inclusive
+        self.exclusive += other.exclusive
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CallStats):
+            return NotImplemented
+        return (self.calls, self.inclusive, self.exclusive) == (
+            other.calls,
+            other.inclusive,
+            other.exclusive,
+        )
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"CallStats(calls={self.calls}, inclusive={self.inclusive}, exclusive={self.exclusive})"
+
+
+class ProfiledCall:
+    """A decorated call in progress, returned by `CallTreeProfiler.enter`"""
+
+    __slots__ = ("path", "parent", "start", "child_time", "token")
+
+    def __init__(self, path: tuple[str, ...], parent: Optional["ProfiledCall"]):
+        self.path = path
+        self.parent = parent
+        self.child_time = 0.0
+        self.token: contextvars.Token = None
+        self.start = 0.0
+
+
+# innermost decorated call of the current thread or asyncio task
+_current_call: contextvars.ContextVar[Optional[ProfiledCall]] = contextvars.ContextVar(
+    "eventit_current_call", default=None
+)
+
+
+def frame_name(func: Callable) -> str:
+    """Name of a function in call paths"""
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+class CallTreeProfiler:
+    """
+    Aggregate the wall time of nested decorated calls into a call tree per time window.
+
+    The active call of each thread and asyncio task is tracked in a context variable, so nested calls are
+    attributed to the path of decorated calls leading to them. Each call path records its number of calls,
+    inclusive time, and exclusive time (not spent in nested decorated calls). Memory is bounded by
+    `max_windows` windows of at most `max_paths` paths each.
+
+    Args:
+        window (int, optional): Window size in seconds. Defaults to 60.
+        max_windows (int, optional): Number of most recent windows kept. Defaults to 60.
+        max_paths (int, optional): Maximum number of call paths per window. Defaults to 10000.
+    """
+
+    def __init__(
+        self,
+        window: int = DEFAULT_PROFILE_WINDOW,
+        max_windows: int = DEFAULT_PROFILE_MAX_WINDOWS,
+        max_paths: int = DEFAULT_PROFILE_MAX_PATHS,
+    ) -> None:
+        if window <= 0 or max_windows <= 0 or max_paths <= 0:
+            raise ValueError("window, max_windows and max_paths must be greater than 0")
+        self._window = window
+        self._max_windows = max_windows
+        self._max_paths = max_paths
+        self._lock = threading.Lock()
+        # window start (epoch seconds) -> call path -> stats, oldest window first
+        self._windows: dict[int, dict[tuple[str, ...], CallStats]] = {}
+
+    def enter(self, name: str) -> ProfiledCall:
+        """Start a call, nested in the current decorated call if there is one"""
+        parent = _current_call.get()
+        if parent is None:
+            path = (name,)
+        elif len(parent.path) < MAX_PROFILE_DEPTH:
+            path = parent.path + (name,)
+        else:
+            path = parent.path
+        call = ProfiledCall(path, parent)
+        call.token = _current_call.set(call)
+        call.start = time.perf_counter()
+        return call
+
+    def exit(self, call: ProfiledCall) -> None:
+        """Finish a call started with `enter`, and record it"""
+        elapsed = time.perf_counter() - call.start
+        try:
+            _current_call.reset(call.token)
+        except ValueError:
+            # finished in a different context than it started in
+            _current_call.set(call.parent)
+        if call.parent is not None:
+            call.parent.child_time += elapsed
+        # concurrent children (e.g. asyncio.gather) can add up to more than the parent's own time
+        self._record(call.path, elapsed, max(elapsed - call.child_time, 0.0))
+
+    def _record(
+        self, path: tuple[str, ...], inclusive: float, exclusive: float
+    ) -> None:
+        window_start = int(time.time() // self._window * self._window)
+        with self._lock:
+            tree = self._windows.get(window_start)
+            if tree is None:
+                tree = self._windows[window_start] = {}
+                while len(self._windows) > self._max_windows:
+                    del self._windows[min(self._windows)]
+            stats = tree.get(path)
+            if stats is None:
+                if len(tree) >= self._max_paths:
+                    path = (TRUNCATED_FRAME,)
+                    stats = tree.get(path)
+                if stats is None:
+                    stats = tree[path] = CallStats()
+            stats.calls += 1
+            stats.inclusive += inclusive
+            stats.exclusive += exclusive
+
+    def windows(self) -> list[datetime.datetime]:
+        """Start of each window with recorded calls, oldest first"""
+        with self._lock:
+            return [
+                datetime.datetime.fromtimestamp(start, tz=datetime.timezone.utc)
+                for start in sorted(self._windows)
+            ]
+
+    def call_tree(
+        self, start_time: datetime.datetime = None, end_time: datetime.datetime = None
+    ) -> dict[tuple[str, ...], CallStats]:
+        """
+        Calls of each call path, merged over the windows starting in a time range.
+
+        Args:
+            start_time (datetime.datetime, optional): Only include windows starting at or after this time.
+            end_time (datetime.datetime, optional): Only include windows starting before this time.
+
+        Returns:
+            dict[tuple[str, ...], CallStats]: Stats per call path, outermost call first.
+        """
+        start = start_time.timestamp() if start_time is not None else float("-inf")
+        end = end_time.timestamp() if end_time is not None else float("inf")
+        merged: dict[tuple[str, ...], CallStats] = {}
+        with self._lock:
+            for window_start, tree in self._windows.items():
+                if not start <= window_start < end:
+                    continue
+                for path, stats in tree.items():
+                    if path not in merged:
+                        merged[path] = CallStats()
+                    merged[path].add(stats)
+        return merged
+
+    def folded_stacks(
+        self,
+        start_time: datetime.datetime = None,
+        end_time: datetime.datetime = None,
+        value: str = "exclusive",
+    ) -> str:
+        """
+        Export the call tree in the folded stack format read by flame graph tools
+        (flamegraph.pl, speedscope, inferno): one ``outer;inner;innermost value`` line per call path.
+
+        Args:
+            start_time (datetime.datetime, optional): Only include windows starting at or after this time.
+            end_time (datetime.datetime, optional): Only include windows starting before this time.
+            value (str, optional): One of PROFILE_VALUES. Times are in microseconds. Defaults to "exclusive",
+                which flame graphs add up into inclusive times themselves.
+
+        Returns:
+            str: The folded stacks, one line per call path.
+        """
+        if value not in PROFILE_VALUES:
+            raise ValueError(f"Invalid value {value}, expected one of {PROFILE_VALUES}")
+        lines = []
+        for path, stats in sorted(self.call_tree(start_time, end_time).items()):
+            if value == "calls":
+                amount = stats.calls
+            else:
+                amount = round(getattr(stats, value) * 1e6)
+            lines.append(f"{';'.join(path)} {amount}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def reset(self) -> None:
+        """Clear all recorded windows"""
+        with self._lock:
+            self._windows.clear()
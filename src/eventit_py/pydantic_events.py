@@ -1,16 +1,26 @@
+import base64
 import datetime
 import logging
 import uuid
-from typing import Optional
+from typing import Any, ClassVar, Optional
 
 from pydantic import (
     UUID4,
     AwareDatetime,
     BaseModel,
     Field,
+    field_serializer,
     field_validator,
 )
 
+from eventit_py.sketches import (
+    DEFAULT_HLL_PRECISION,
+    DEFAULT_TOP_CAPACITY,
+    HyperLogLog,
+    LogLinearHistogram,
+    SpaceSaving,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,8 +103,11 @@ class BaseCountableEvent(BaseEvent):
     Attributes:
         time_window (int): Time window in seconds.
         count (int): Number of events in the time window.
+        write_on_close (bool): Keep windows in memory, and only write them once they close.
     """
 
+    write_on_close: ClassVar[bool] = False
+
     time_window: int = Field(default=15, description="Time window in seconds")
     count: int = Field(default=1, description="Number of events in the time window")
 
@@ -104,3 +117,299 @@ class BaseCountableEvent(BaseEvent):
         if value <= 0:
             raise ValueError("Time window must be greater than 0")
         return value
+
+    @classmethod
+    def summary_field(cls) -> Optional[str]:
+        """Field whose values are summarised per time window, rather than keying it. None for plain counts."""
+        return None
+
+    @classmethod
+    def new_summary(cls) -> Any:
+        """Empty summary of the summarised field's values, with an `add(value)` method"""
+        return None
+
+    def merge_summary(self, summary: Any) -> None:
+        """Add the values of a summary from `new_summary` to the event's own"""
+
+
+class BaseDistinctCountEvent(BaseCountableEvent):
+    """
+    Countable event that also estimates the number of distinct values of one field in its time window,
+    e.g. unique users calling a function, using a HyperLogLog sketch.
+
+    The distinct field does not key the time window, and its values are only kept in the sketch.
+    Sketches are stored compressed, as binary in MongoDB and base64 in files.
+
+    Attributes:
+        distinct_field (str): Field whose distinct values are counted.
+        sketch (bytes): Compressed HyperLogLog sketch of the field's values in the time window.
+        sketch_precision (int): Precision of new sketches, see HyperLogLog.
+    """
+
+    sketch_precision: ClassVar[int] = DEFAULT_HLL_PRECISION
+
+    distinct_field: str = Field(
+        default="user", description="Field whose distinct values are counted"
+    )
+    sketch: Optional[bytes] = Field(
+        default=None, description="Compressed HyperLogLog sketch of distinct values"
+    )
+
+    @field_validator("sketch", mode="before")
+    @classmethod
+    def decode_sketch(cls, value: Any):
+        if isinstance(value, str):
+            return base64.b64decode(value)
+        return value
+
+    @field_serializer("sketch", when_used="json-unless-none")
+    def encode_sketch(self, value: bytes, _info):
+        return base64.b64encode(value).decode("ascii")
+
+    @classmethod
+    def summary_field(cls) -> Optional[str]:
+        return cls.model_fields["distinct_field"].default
+
+    @classmethod
+    def new_summary(cls) -> HyperLogLog:
+        return HyperLogLog(cls.sketch_precision)
+
+    def merge_summary(self, summary: HyperLogLog) -> None:
+        self.merge_sketch(summary)
+
+    def get_sketch(self) -> HyperLogLog:
+        """The event's sketch, or an empty one"""
+        if self.sketch is None:
+            return HyperLogLog(self.sketch_precision)
+        return HyperLogLog.from_bytes(self.sketch)
+
+    def merge_sketch(self, other: HyperLogLog) -> None:
+        """Add the values of another sketch to the event's sketch"""
+        self.sketch = self.get_sketch().merge(other).to_bytes()
+
+    def add_distinct(self, value: Any) -> None:
+        """Add a value of the distinct field to the event's sketch. None is ignored."""
+        if value is None:
+            return
+        sketch = self.get_sketch()
+        sketch.add(value)
+        self.sketch = sketch.to_bytes()
+
+    def distinct_count(self) -> int:
+        """Estimated number of distinct values in the time window"""
+        return self.get_sketch().count()
+
+
+class BaseTopEvent(BaseCountableEvent):
+    """
+    Countable event that tracks the most frequent values of one field in its time window, e.g. the busiest users,
+    using a Space-Saving summary of bounded size.
+
+    Tables are kept in memory while their time window is open, and written once it closes, so logging
+    these events does not read or write the backend. The top field does not key the time window.
+
+    Attributes:
+        top_field (str): Field whose most frequent values are tracked.
+        top (list[tuple[str, int, int]]): Tracked values with their count and maximum overestimate,
+            most frequent first.
+        top_capacity (int): Number of values tracked per table, see SpaceSaving.
+    """
+
+    top_capacity: ClassVar[int] = DEFAULT_TOP_CAPACITY
+    write_on_close: ClassVar[bool] = True
+
+    top_field: str = Field(
+        default="user", description="Field whose most frequent values are tracked"
+    )
+    top: Optional[list[tuple[str, int, int]]] = Field(
+        default=None, description="Most frequent values, with count and overestimate"
+    )
+
+    @classmethod
+    def summary_field(cls) -> Optional[str]:
+        return cls.model_fields["top_field"].default
+
+    @classmethod
+    def new_summary(cls) -> SpaceSaving:
+        return SpaceSaving(cls.top_capacity)
+
+    def merge_summary(self, summary: SpaceSaving) -> None:
+        self.top = [
+            tuple(counter) for counter in self.get_top().merge(summary).to_list()
+        ]
+
+    def get_top(self) -> SpaceSaving:
+        """The event's table, or an empty one"""
+        return SpaceSaving.from_list(self.top or [], self.top_capacity)
+
+
+class CallDurations:
+    """Wall and CPU time histograms, and the number of failed calls, of the calls in a time window"""
+
+    def __init__(self) -> None:
+        self.wall_time = LogLinearHistogram()
+        self.cpu_time = LogLinearHistogram()
+        self.errors = 0
+
+    def add(self, value: tuple[float, float, bool]) -> None:
+        """Record one call, as (wall seconds, CPU seconds, whether it raised)"""
+        wall_seconds, cpu_seconds, raised = value
+        self.wall_time.record(wall_seconds)
+        self.cpu_time.record(cpu_seconds)
+        self.errors += bool(raised)
+
+
+class BaseTimedEvent(BaseCountableEvent):
+    """
+    Countable event summarising how long calls took in its time window, logged by `EventLogger.timed`.
+
+    Wall and CPU times are aggregated into log-linear histograms, kept in memory while the time window is open
+    and written as a single record once it closes.
+
+    Attributes:
+        wall_time (dict): Wall time histogram, see LogLinearHistogram.to_dict.
+        cpu_time (dict): CPU time histogram of the calling thread, see LogLinearHistogram.to_dict.
+        errors (int): Number of calls that raised an exception.
+    """
+
+    write_on_close: ClassVar[bool] = True
+
+    wall_time: Optional[dict] = Field(default=None, description="Wall time histogram")
+    cpu_time: Optional[dict] = Field(default=None, description="CPU time histogram")
+    errors: int = Field(default=0, description="Number of calls that raised")
+
+    @classmethod
+    def summary_field(cls) -> Optional[str]:
+        # durations are passed to log_event directly, rather than collected as a metric
+        return "duration"
+
+    @classmethod
+    def new_summary(cls) -> CallDurations:
+        return CallDurations()
+
+    def merge_summary(self, summary: CallDurations) -> None:
+        self.wall_time = self.get_histogram("wall").merge(summary.wall_time).to_dict()
+        self.cpu_time = self.get_histogram("cpu").merge(summary.cpu_time).to_dict()
+        self.errors += summary.errors
+
+    def get_histogram(self, clock: str = "wall") -> LogLinearHistogram:
+        """The event's wall or CPU time histogram, or an empty one"""
+        if clock not in ("wall", "cpu"):
+            raise ValueError(f"Invalid clock {clock}, expected 'wall' or 'cpu'")
+        data = self.wall_time if clock == "wall" else self.cpu_time
+        if data is None:
+            return LogLinearHistogram()
+        return LogLinearHistogram.from_dict(data)
+
+
+class GaugeSummary:
+    """Minimum, maximum, sum, number and most recent of the numeric values in a time window"""
+
+    def __init__(self) -> None:
+        self.min: float = None
+        self.max: float = None
+        self.sum = 0.0
+        self.samples = 0
+        self.last: float = None
+        self.last_timestamp: datetime.datetime = None
+
+    def add(self, value: float) -> None:
+        """Record one numeric value"""
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f"Gauge values must be numbers, got {value!r}")
+        self.merge_values(value, value, value, 1, value, _handle_timestamp())
+
+    def merge_values(
+        self,
+        minimum: float,
+        maximum: float,
+        total: float,
+        samples: int,
+        last: float,
+        last_timestamp: datetime.datetime,
+    ) -> None:
+        if not samples:
+            return
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+        self.sum += total
+        self.samples += samples
+        if self.last_timestamp is None or last_timestamp >= self.last_timestamp:
+            self.last = last
+            self.last_timestamp = last_timestamp
+
+    def merge(self, other: "GaugeSummary") -> "GaugeSummary":
+        """Add the values of another summary to this one"""
+        self.merge_values(
+            other.min,
+            other.max,
+            other.sum,
+            other.samples,
+            other.last,
+            other.last_timestamp,
+        )
+        return self
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "min": self.min,
+            "max": self.max,
+            "sum": self.sum,
+            "samples": self.samples,
+            "mean": self.sum / self.samples if self.samples else None,
+            "last": self.last,
+        }
+
+
+class BaseGaugeEvent(BaseCountableEvent):
+    """
+    Countable event aggregating the numeric values of one metric in its time window, such as a queue size.
+
+    Values are aggregated in memory while the time window is open, and written as a single record once
+    it closes. The gauge field does not key the time window.
+
+    Attributes:
+        gauge_field (str): Metric whose values are aggregated.
+        min (float): Smallest value in the time window.
+        max (float): Largest value in the time window.
+        sum (float): Sum of the values in the time window.
+        samples (int): Number of values in the time window. Events without a value are only counted in `count`.
+        last (float): Most recent value in the time window.
+        last_timestamp (AwareDatetime): When the most recent value was recorded.
+    """
+
+    write_on_close: ClassVar[bool] = True
+
+    gauge_field: str = Field(
+        default="value", description="Metric whose values are aggregated"
+    )
+    min: Optional[float] = Field(default=None, description="Smallest value")
+    max: Optional[float] = Field(default=None, description="Largest value")
+    sum: float = Field(default=0.0, description="Sum of the values")
+    samples: int = Field(default=0, description="Number of values")
+    last: Optional[float] = Field(default=None, description="Most recent value")
+    last_timestamp: Optional[AwareDatetime] = Field(
+        default=None, description="When the most recent value was recorded"
+    )
+
+    @classmethod
+    def summary_field(cls) -> Optional[str]:
+        return cls.model_fields["gauge_field"].default
+
+    @classmethod
+    def new_summary(cls) -> GaugeSummary:
+        return GaugeSummary()
+
+    def merge_summary(self, summary: GaugeSummary) -> None:
+        merged = self.get_summary().merge(summary)
+        self.min, self.max, self.sum = merged.min, merged.max, merged.sum
+        self.samples, self.last = merged.samples, merged.last
+        self.last_timestamp = merged.last_timestamp
+
+    def get_summary(self) -> GaugeSummary:
+        """The event's values as a GaugeSummary"""
+        summary = GaugeSummary()
+        summary.merge_values(
+            self.min, self.max, self.sum, self.samples, self.last, self.last_timestamp
+        )
+        return summary
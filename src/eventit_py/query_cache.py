@@ -0,0 +1,338 @@
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Union
+
+from eventit_py.logging_backends import (
+    BaseEventType,
+    BaseLoggingClient,
+    WrappingLoggingClient,
+)
+from eventit_py.pydantic_events import BaseEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_CACHE_SIZE = 128
+DEFAULT_QUERY_CACHE_MAX_RESULTS = 10000
+
+
+def _freeze_query(query_dict: dict) -> tuple:
+    return tuple(sorted((key, repr(value)) for key, value in query_dict.items()))
+
+
+def _copy_events(events: List[BaseEvent]) -> List[BaseEvent]:
+    # cached events are never handed out, since callers mutate the events they are given
+    return [event.model_copy() for event in events]
+
+
+def _matches(event: BaseEvent, query_dict: dict) -> bool:
+    try:
+        return all(getattr(event, key) == value for key, value in query_dict.items())
+    except AttributeError:
+        return False
+
+
+class _CacheEntry:
+    """Cached result of a search or count, with what is needed to update it on write"""
+
+    __slots__ = ("kind", "group", "event_type", "params", "result")
+
+    def __init__(
+        self, kind: str, group: str, event_type: type, params: dict, result: Any
+    ) -> None:
+        self.kind = kind
+        self.group = group
+        self.event_type = event_type
+        self.params = params
+        self.result = result
+
+    def size(self) -> int:
+        return 1 if self.kind == "count" else len(self.result)
+
+    def apply_write(self, message: BaseEvent) -> bool:
+        """Update the cached result for a newly appended event
+
+        Returns:
+            bool: False if the result cannot be updated in place, and must be invalidated.
+        """
+        if not isinstance(message, self.event_type):
+            return False
+        if self.kind == "count":
+            if _matches(message, self.params["query_dict"]):
+                self.result += 1
+            return True
+
+        if self.kind == "timestamp":
+            matched = (
+                self.params["start_time"]
+                <= message.timestamp
+                <= self.params["end_time"]
+            )
+        else:
+            matched = _matches(message, self.params["query_dict"])
+        if not matched:
+            return True
+        limit = self.params["limit"]
+        order = self.params["order"]
+        if order == "desc":
+            # newest first, after cached events with the same timestamp
+            position = len(self.result)
+            for index, event in enumerate(self.result):
+                if event.timestamp < message.timestamp:
+                    position = index
+                    break
+        else:
+            # results are sorted by timestamp, so keep them that way
+            position = bisect.bisect_right(
+                self.result, message.timestamp, key=lambda event: event.timestamp
+            )
+        if not limit or len(self.result) < limit:
+            self.result.insert(position, message.model_copy())
+        elif order is not None and position < limit:
+            # the new event displaces the last of the top `limit` events
+            self.result.insert(position, message.model_copy())
+            self.result.pop()
+        return True
+
+
+class CachedLoggingClient(WrappingLoggingClient):
+    """
+    LRU cache for the search and count results of another logging client.
+
+    Writes made through this client update the cached results of the group they touch,
+    instead of discarding them. An appended event is added to the cached searches and counts it matches,
+    and time-range searches over windows that have already closed are left untouched.
+    Updates to existing events invalidate every cached result for the group.
+
+    Memory is bounded by `max_entries` cached results, none of which may hold more than `max_results` events.
+    Searches with `fields` or `raw` are passed through uncached.
+    Searches and counts over several groups are cached per group, and merged.
+
+    Args:
+        client (BaseLoggingClient): The client whose results are cached.
+        max_entries (int, optional): Maximum number of cached results. Defaults to 128.
+        max_results (int, optional): Largest search result (in events) that is kept in the cache. Defaults to 10000.
+    """
+
+    def __init__(
+        self,
+        client: BaseLoggingClient,
+        max_entries: int = DEFAULT_QUERY_CACHE_SIZE,
+        max_results: int = DEFAULT_QUERY_CACHE_MAX_RESULTS,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be greater than 0")
+        super().__init__(client)
+        self._max_entries = max_entries
+        self._max_results = max_results
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _CacheEntry] = OrderedDict()
+        self._keys_by_group: dict[str, set[tuple]] = {}
+        # bumped on every write, so results read concurrently with a write are not cached
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def cache_info(self) -> dict[str, int]:
+        """Hit, miss and invalidation counts, and the number of cached results"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
+
+    def clear_cache(self) -> None:
+        """Discard every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_group.clear()
+
+    def _lookup(self, key: tuple) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, self._generations.get(key[1], 0)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry.result
+            return (result if entry.kind == "count" else _copy_events(result)), None
+
+    def _store(self, key: tuple, entry: _CacheEntry, generation: int) -> None:
+        if entry.size() > self._max_results:
+            return
+        with self._lock:
+            if self._generations.get(entry.group, 0) != generation:
+                # a write happened while the result was being read
+                return
+            if key not in self._entries:
+                self._keys_by_group.setdefault(entry.group, set()).add(key)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._keys_by_group[entry.group].discard(key)
+
+    def _invalidate(self, group: str) -> None:
+        with self._lock:
+            for affected_group in self._groups_sharing_storage(group):
+                self._generations[affected_group] = (
+                    self._generations.get(affected_group, 0) + 1
+                )
+                for key in list(self._keys_by_group.get(affected_group, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def _apply_write(self, message: BaseEvent, group: str) -> None:
+        with self._lock:
+            for affected_group in self._groups_sharing_storage(group):
+                self._generations[affected_group] = (
+                    self._generations.get(affected_group, 0) + 1
+                )
+                for key in list(self._keys_by_group.get(affected_group, ())):
+                    entry = self._entries[key]
+                    if not entry.apply_write(message) or (
+                        entry.size() > self._max_results
+                    ):
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def log_message(self, message: BaseEvent, group: str) -> None:
+        self._client.log_message(message, group)
+        self._apply_write(message, group)
+
+    def log_messages(self, messages: List[BaseEvent], group: str) -> None:
+        self._client.log_messages(messages, group)
+        for message in messages:
+            self._apply_write(message, group)
+
+    def update_event_by_uuid(
+        self, group: str, event: BaseEvent, event_type: BaseEventType = None
+    ) -> dict[str, int]:
+        try:
+            return self._client.update_event_by_uuid(
+                group=group, event=event, event_type=event_type
+            )
+        finally:
+            self._invalidate(group)
+
+    def search_events_by_timestamp(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
+    ) -> List[BaseEventType]:
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            # each group is cached separately, and the results merged
+            return self._search_groups(
+                self.search_events_by_timestamp,
+                groups,
+                limit,
+                fields,
+                order,
+                start_time=start_time,
+                end_time=end_time,
+                event_type=event_type,
+                raw=raw,
+            )
+        if fields is not None or raw:
+            return self._client.search_events_by_timestamp(
+                start_time, end_time, group, event_type, limit, fields, raw, order
+            )
+        key = ("timestamp", group, event_type, start_time, end_time, limit, order)
+        result, generation = self._lookup(key)
+        if result is not None:
+            return result
+        result = self._client.search_events_by_timestamp(
+            start_time, end_time, group, event_type, limit, order=order
+        )
+        params = {
+            "start_time": start_time,
+            "end_time": end_time,
+            "limit": limit,
+            "order": order,
+        }
+        entry = _CacheEntry(
+            "timestamp", group, event_type, params, _copy_events(result)
+        )
+        self._store(key, entry, generation)
+        return result
+
+    def search_events_by_query(
+        self,
+        query_dict: dict,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+        limit: int = None,
+        fields: List[str] = None,
+        raw: bool = False,
+        order: str = None,
+    ) -> List[BaseEventType]:
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return self._search_groups(
+                self.search_events_by_query,
+                groups,
+                limit,
+                fields,
+                order,
+                query_dict=query_dict,
+                event_type=event_type,
+                raw=raw,
+            )
+        if fields is not None or raw:
+            return self._client.search_events_by_query(
+                query_dict, group, event_type, limit, fields, raw, order
+            )
+        key = ("query", group, event_type, _freeze_query(query_dict), limit, order)
+        result, generation = self._lookup(key)
+        if result is not None:
+            return result
+        result = self._client.search_events_by_query(
+            query_dict, group, event_type, limit, order=order
+        )
+        params = {"query_dict": dict(query_dict), "limit": limit, "order": order}
+        entry = _CacheEntry("query", group, event_type, params, _copy_events(result))
+        self._store(key, entry, generation)
+        return result
+
+    def count_events_by_query(
+        self,
+        query_dict: dict,
+        group: Union[str, List[str]],
+        event_type: BaseEventType,
+    ) -> int:
+        groups = self._fan_out_groups(group)
+        if groups is not None:
+            return sum(
+                self._map_groups(
+                    lambda group: self.count_events_by_query(
+                        query_dict, group, event_type
+                    ),
+                    groups,
+                )
+            )
+        key = ("count", group, event_type, _freeze_query(query_dict))
+        result, generation = self._lookup(key)
+        if result is not None:
+            return result
+        result = self._client.count_events_by_query(query_dict, group, event_type)
+        params = {"query_dict": dict(query_dict)}
+        self._store(
+            key, _CacheEntry("count", group, event_type, params, result), generation
+        )
+        return result
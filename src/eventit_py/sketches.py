@@ -0,0 +1,318 @@
+import hashlib
+import heapq
+import math
+import zlib
+from typing import Any
+
+DEFAULT_HLL_PRECISION = 12
+MIN_HLL_PRECISION = 4
+MAX_HLL_PRECISION = 16
+DEFAULT_TOP_CAPACITY = 100
+DEFAULT_SUB_BUCKET_BITS = 4
+# durations are capped at about 12.7 days
+MAX_HISTOGRAM_MICROSECONDS = 1 << 40
+HASH_BITS = 64
+
+
+def _hash_value(value: Any) -> int:
+    """Stable 64 bit hash of a value's string form, identical across processes"""
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HyperLogLog:
+    """
+    Estimate the number of distinct values added, in a fixed 2 ** `precision` bytes of memory.
+
+    The standard error is about ``1.04 / sqrt(2 ** precision)``, 1.6% at the default precision of 12.
+    Sketches of the same precision can be merged, giving the sketch of the union of their values,
+    so sketches built per window, per process or per rollup tier can be combined without double counting.
+
+    Args:
+        precision (int, optional): Number of hash bits used to pick a register, from 4 to 16. Defaults to 12.
+    """
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION) -> None:
+        if not MIN_HLL_PRECISION <= precision <= MAX_HLL_PRECISION:
+            raise ValueError(
+                f"Precision must be between {MIN_HLL_PRECISION} and {MAX_HLL_PRECISION}"
+            )
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: Any) -> None:
+        """Add a value to the sketch. Values are compared by their string form."""
+        hashed = _hash_value(value)
+        remaining_bits = HASH_BITS - self.precision
+        register = hashed >> remaining_bits
+        # position of the leftmost 1 bit in the remaining bits
+        rank = remaining_bits - (hashed & ((1 << remaining_bits) - 1)).bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Add every value of another sketch of the same precision to this one"""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge sketches of precision {self.precision} and {other.precision}"
+            )
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        register_count = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / register_count)
+        estimate = (
+            alpha
+            * register_count**2
+            / sum(2.0**-register for register in self.registers)
+        )
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * register_count and empty_registers:
+            # linear counting is more accurate while many registers are empty
+            estimate = register_count * math.log(register_count / empty_registers)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        """Compressed form of the sketch, a few bytes while it holds few values"""
+        return zlib.compress(bytes([self.precision]) + bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """Load a sketch saved with `to_bytes`"""
+        data = zlib.decompress(data)
+        sketch = cls(data[0])
+        if len(data) - 1 != len(sketch.registers):
+            raise ValueError("Sketch data does not match its precision")
+        sketch.registers = bytearray(data[1:])
+        return sketch
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, HyperLogLog):
+            return NotImplemented
+        return self.precision == other.precision and self.registers == other.registers
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"HyperLogLog(precision={self.precision}, count={self.count()})"
+
+
+class SpaceSaving:
+    """
+    Track the most frequent values added, in a fixed number of counters (the Space-Saving algorithm).
+
+    Every value occurring more than ``total / capacity`` times is guaranteed to be tracked. Counts are upper
+    bounds: each counter also records the most its count may be overestimated by. Summaries of the same
+    capacity can be merged, so tables built per window, per process or per rollup tier can be combined.
+
+    Args:
+        capacity (int, optional): Number of counters kept. Defaults to 100.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_TOP_CAPACITY) -> None:
+        if capacity <= 0:
+            raise ValueError("Capacity must be greater than 0")
+        self.capacity = capacity
+        # value -> [count, maximum overestimate of count]
+        self.counters: dict[str, list[int]] = {}
+        # (count, value) for every counter, built once the summary is full. Counts only grow, so an entry's
+        # count may be lower than its counter's, and is brought up to date when it reaches the top.
+        self._heap: list[tuple[int, str]] = None
+
+    def add(self, value: Any, weight: int = 1) -> None:
+        """Count a value `weight` times. Values are compared by their string form."""
+        value = str(value)
+        counter = self.counters.get(value)
+        if counter is not None:
+            counter[0] += weight
+            return
+        if len(self.counters) < self.capacity:
+            self.counters[value] = [weight, 0]
+            if self._heap is not None:
+                heapq.heappush(self._heap, (weight, value))
+            return
+        # replace the least frequent value, which the new value may have occurred as often as
+        heap = self._min_heap()
+        while heap[0][0] != self.counters[heap[0][1]][0]:
+            smallest = heap[0][1]
+            heapq.heapreplace(heap, (self.counters[smallest][0], smallest))
+        floor, smallest = heap[0]
+        del self.counters[smallest]
+        self.counters[value] = [floor + weight, floor]
+        heapq.heapreplace(heap, (floor + weight, value))
+
+    def _min_heap(self) -> list[tuple[int, str]]:
+        if self._heap is None:
+            self._heap = [(count, value) for value, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+        return self._heap
+
+    def _floor(self) -> int:
+        """Most times a value without a counter may have occurred"""
+        if len(self.counters) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counters.values())
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Add the counts of another summary of the same capacity to this one"""
+        if other.capacity != self.capacity:
+            raise ValueError(
+                f"Cannot merge summaries of capacity {self.capacity} and {other.capacity}"
+            )
+        floor, other_floor = self._floor(), other._floor()
+        merged = {}
+        for value in self.counters.keys() | other.counters.keys():
+            count, error = self.counters.get(value, (floor, floor))
+            other_count, other_error = other.counters.get(
+                value, (other_floor, other_floor)
+            )
+            merged[value] = [count + other_count, error + other_error]
+        kept = heapq.nlargest(
+            self.capacity, merged.items(), key=lambda item: item[1][0]
+        )
+        self.counters = dict(kept)
+        self._heap = None
+        return self
+
+    def top(self, n: int = None) -> list[tuple[str, int, int]]:
+        """The `n` most frequent values, as (value, count, maximum overestimate) from most frequent"""
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(value, count, error) for value, (count, error) in ranked[:n]]
+
+    def to_list(self) -> list[list]:
+        """Counters as [value, count, maximum overestimate] lists, for storage"""
+        return [list(counter) for counter in self.top()]
+
+    @classmethod
+    def from_list(
+        cls, counters: list, capacity: int = DEFAULT_TOP_CAPACITY
+    ) -> "SpaceSaving":
+        """Load a summary saved with `to_list`"""
+        summary = cls(capacity)
+        for value, count, error in counters:
+            summary.counters[value] = [count, error]
+        return summary
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"SpaceSaving(capacity={self.capacity}, top={self.top(3)})"
+
+
+class LogLinearHistogram:
+    """
+    Histogram of durations with buckets that are linear within each power of two of microseconds,
+    so every bucket is at most 1 / 2 ** `sub_bucket_bits` of its values wide (6.25% by default).
+
+    Memory is bounded by the number of buckets up to MAX_HISTOGRAM_MICROSECONDS, and only non-empty
+    buckets are stored. Histograms with the same `sub_bucket_bits` can be merged.
+
+    Args:
+        sub_bucket_bits (int, optional): log2 of the number of linear buckets per power of two. Defaults to 4.
+
+    Attributes:
+        count (int): Number of recorded durations.
+        total (float): Sum of recorded durations in seconds.
+        min (float): Smallest recorded duration in seconds.
+        max (float): Largest recorded duration in seconds.
+        buckets (dict[int, int]): Number of durations recorded in each non-empty bucket.
+    """
+
+    def __init__(self, sub_bucket_bits: int = DEFAULT_SUB_BUCKET_BITS) -> None:
+        if sub_bucket_bits < 1:
+            raise ValueError("sub_bucket_bits must be at least 1")
+        self.sub_bucket_bits = sub_bucket_bits
+        self.count = 0
+        self.total = 0.0
+        self.min: float = None
+        self.max: float = None
+        self.buckets: dict[int, int] = {}
+
+    def _bucket(self, microseconds: int) -> int:
+        sub_buckets = 1 << self.sub_bucket_bits
+        if microseconds < 2 * sub_buckets:
+            return microseconds
+        shift = microseconds.bit_length() - self.sub_bucket_bits - 1
+        return (shift + 1) * sub_buckets + (microseconds >> shift) - sub_buckets
+
+    def _bucket_bounds(self, bucket: int) -> tuple[float, float]:
+        """Lowest and highest duration (in seconds) of a bucket"""
+        sub_buckets = 1 << self.sub_bucket_bits
+        if bucket < 2 * sub_buckets:
+            return bucket / 1e6, (bucket + 1) / 1e6
+        shift = bucket // sub_buckets - 1
+        mantissa = bucket % sub_buckets + sub_buckets
+        return (mantissa << shift) / 1e6, ((mantissa + 1) << shift) / 1e6
+
+    def record(self, seconds: float) -> None:
+        """Add a duration (in seconds) to the histogram"""
+        seconds = max(seconds, 0.0)
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        bucket = self._bucket(min(int(seconds * 1e6), MAX_HISTOGRAM_MICROSECONDS))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other: "LogLinearHistogram") -> "LogLinearHistogram":
+        """Add every duration of another histogram with the same bucket layout to this one"""
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms with different sub_bucket_bits")
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.total += other.total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for bucket, bucket_count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + bucket_count
+        return self
+
+    def percentile(self, quantile: float) -> float:
+        """Estimate a duration percentile from the histogram
+
+        Args:
+            quantile (float): Quantile between 0 and 1 (e.g. 0.99).
+
+        Returns:
+            float: Midpoint (in seconds) of the bucket containing the quantile, within the recorded min and max.
+        """
+        if self.count == 0:
+            return None
+        if quantile >= 1:
+            return self.max
+        threshold = quantile * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                low, high = self._bucket_bounds(bucket)
+                return min(max((low + high) / 2, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Histogram as a dict of JSON and BSON compatible values, for storage"""
+        return {
+            "sub_bucket_bits": self.sub_bucket_bits,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": [
+                [bucket, self.buckets[bucket]] for bucket in sorted(self.buckets)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LogLinearHistogram":
+        """Load a histogram saved with `to_dict`"""
+        histogram = cls(data["sub_bucket_bits"])
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        histogram.buckets = {bucket: count for bucket, count in data["buckets"]}
+        return histogram
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"LogLinearHistogram(count={self.count}, p50={self.percentile(0.5)}, max={self.max})"
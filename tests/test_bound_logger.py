@@ -0,0 +1,111 @@
+import asyncio
+import datetime
+from typing import Optional
+
+import pydantic
+import pytest
+from eventit_py import event_logger
+from eventit_py.bound_logger import request_context
+from eventit_py.event_logger import EventLogger
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class RequestEvent(BaseEvent):
+    request_id: str
+    attempt: int = 0
+    route: Optional[str] = None
+
+
+def test_bound_fields(tmp_path):
+    eventit = EventLogger(directory=tmp_path, groups=["group1"])
+    calls = {"count": 0}
+
+    def route(func, context):
+        calls["count"] += 1
+        return "/checkout"
+
+    eventit.register_custom_metric("route", route)
+    bound = eventit.bind(
+        event_type=RequestEvent,
+        tracking_details={"function_name": True, "route": True, "user": False},
+        user="alice",
+        attempt="2",
+    )
+    # values are validated and coerced once, when binding
+    assert bound.fields == {"user": "alice", "attempt": 2}
+
+    def handler():
+        pass
+
+    with request_context(request_id="r1"):
+        bound.log_event(func=handler, description="first")
+        child = bound.bind(group="group1", attempt=3, route="/cart")
+        child.log_event()
+    [event] = eventit.db_client.search_events_by_query({}, "default", RequestEvent)
+    assert (event.request_id, event.user, event.attempt) == ("r1", "alice", 2)
+    assert (event.function_name, event.route, event.description) == (
+        "handler",
+        "/checkout",
+        "first",
+    )
+    [event] = eventit.db_client.search_events_by_query({}, "group1", RequestEvent)
+    assert (event.attempt, event.route, event.group) == (3, "/cart", None)
+    # bound metrics are not retrieved
+    assert calls["count"] == 1
+
+    # required fields missing from the context are only reported per event
+    with pytest.raises(pydantic.ValidationError):
+        bound.log_event()
+
+
+def test_bind_validation(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    with pytest.raises(ValueError):
+        eventit.bind(request="r1")
+    with pytest.raises(ValueError):
+        eventit.bind(timestamp=START)
+    with pytest.raises(ValueError):
+        eventit.bind(group="missing")
+    with pytest.raises(ValueError):
+        eventit.bind(tracking_details={"route": True})
+    with pytest.raises(pydantic.ValidationError):
+        eventit.bind(event_type=RequestEvent, attempt="first")
+    with pytest.raises(TypeError):
+        eventit.bind(event_type=dict)
+
+
+def test_request_context_isolation(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    bound = eventit.bind(event_type=RequestEvent, tracking_details={})
+
+    async def handle(request_id: str):
+        with request_context(request_id=request_id) as fields:
+            await asyncio.sleep(0.01)
+            assert fields == {"request_id": request_id}
+            with request_context(attempt=1) as fields:
+                assert fields == {"request_id": request_id, "attempt": 1}
+                bound.log_event()
+
+    async def main():
+        await asyncio.gather(*(handle(f"r{index}") for index in range(5)))
+
+    asyncio.run(main())
+    events = eventit.db_client.search_events_by_query({}, "default", RequestEvent)
+    assert sorted(event.request_id for event in events) == [
+        f"r{index}" for index in range(5)
+    ]
+    assert all(event.attempt == 1 for event in events)
+
+
+def test_bound_countable_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: START)
+    eventit = EventLogger(directory=tmp_path)
+    bound = eventit.bind(event_type=BaseCountableEvent, tracking_details={}, user="bob")
+    for _ in range(3):
+        bound.log_event()
+    [event] = eventit.db_client.search_events_by_query(
+        {}, "default", BaseCountableEvent
+    )
+    assert (event.user, event.count, event.timestamp) == ("bob", 3, START)
@@ -0,0 +1,319 @@
+import datetime
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+from eventit_py import buffered_logging, event_logger
+from eventit_py.buffered_logging import SPILL_FILENAME, BufferedLoggingClient
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import BaseLoggingClient, FileLoggingClient
+from eventit_py.metrics_exporter import SelfMetrics
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+class GatedLoggingClient(BaseLoggingClient):
+    """In-memory client whose writes wait until the gate is opened"""
+
+    backend_name = "gated"
+
+    def __init__(self, groups, fail=False):
+        super().__init__(groups)
+        self.gate = threading.Event()
+        self.fail = fail
+        self.messages = []
+
+    def log_message(self, message, group):
+        self.gate.wait()
+        if self.fail:
+            raise ConnectionError("backend unavailable")
+        self.messages.append((message, group))
+
+    def count_events_by_query(self, query_dict, group, event_type):
+        return sum(1 for _, message_group in self.messages if message_group == group)
+
+
+def _fill(client: BufferedLoggingClient, count: int, group: str = "group1"):
+    events = [BaseEvent(description=str(i)) for i in range(count)]
+    for event in events:
+        client.log_message(event, group)
+    return events
+
+
+def _wait_for_writer(client: BufferedLoggingClient):
+    # the first event is picked up by the writer thread, and waits at the gate
+    deadline = time.monotonic() + 5
+    while client._in_flight == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_buffered_bad_arguments(tmp_path):
+    inner = GatedLoggingClient(["group1"])
+    with pytest.raises(ValueError):
+        BufferedLoggingClient(inner, overflow_policy="explode")
+    with pytest.raises(ValueError):
+        BufferedLoggingClient(inner, overflow_policy="spill")
+    with pytest.raises(ValueError):
+        BufferedLoggingClient(inner, max_queue_size=0)
+    client = BufferedLoggingClient(inner)
+    with pytest.raises(ValueError):
+        client.log_message(BaseEvent(), "group2")
+    inner.gate.set()
+    client.close()
+    with pytest.raises(ValueError):
+        client.log_message(BaseEvent(), "group1")
+
+
+def test_buffered_drop_newest():
+    inner = GatedLoggingClient(["group1"])
+    client = BufferedLoggingClient(
+        inner, max_queue_size=3, overflow_policy="drop_newest"
+    )
+    events = _fill(client, 1)
+    _wait_for_writer(client)
+    events += _fill(client, 5)
+    assert client.queue_depth() == 3
+    assert client.overflow_counts()["dropped"] == {"group1": 2}
+
+    inner.gate.set()
+    assert client.flush(timeout=5)
+    assert [message for message, _ in inner.messages] == events[:4]
+    client.close()
+
+
+def test_buffered_drop_oldest():
+    inner = GatedLoggingClient(["group1"])
+    client = BufferedLoggingClient(
+        inner, max_queue_size=3, overflow_policy="drop_oldest"
+    )
+    events = _fill(client, 1)
+    _wait_for_writer(client)
+    events += _fill(client, 5)
+    assert client.queue_depth("group1") == 3
+    assert client.dropped == {"group1": 2}
+
+    inner.gate.set()
+    assert client.flush(timeout=5)
+    assert [message for message, _ in inner.messages] == events[:1] + events[3:]
+    client.close()
+
+
+def test_buffered_block_with_timeout():
+    inner = GatedLoggingClient(["group1"])
+    client = BufferedLoggingClient(
+        inner, max_queue_size=2, overflow_policy="block", block_timeout=0.05
+    )
+    _fill(client, 1)
+    _wait_for_writer(client)
+    _fill(client, 2)
+    start = time.perf_counter()
+    _fill(client, 1)
+    # the caller waited for space, then gave up instead of stalling forever
+    assert time.perf_counter() - start >= 0.05
+    assert client.dropped == {"group1": 1}
+
+    # space freed while blocked is used
+    threading.Timer(0.05, inner.gate.set).start()
+    client._block_timeout = 5
+    _fill(client, 1)
+    assert client.flush(timeout=5)
+    assert len(inner.messages) == 4
+    client.close()
+
+
+def test_buffered_spill_and_replay(tmp_path):
+    inner = GatedLoggingClient(["group1", "group2"])
+    metrics = SelfMetrics()
+    client = BufferedLoggingClient(
+        inner, max_queue_size=2, overflow_policy="spill", spill_directory=tmp_path
+    )
+    client.set_self_metrics(metrics)
+    events = _fill(client, 1)
+    _wait_for_writer(client)
+    events += _fill(client, 2)
+    events += _fill(client, 3, group="group2")
+    # once spilling started, later events are spilled too, to keep their order
+    assert client.queue_depth() == 2
+    assert client.overflow_counts()["spilled"] == {"group1": 0, "group2": 3}
+    assert metrics.get("spilled_events_total", group="group2", backend="gated") == 3
+    assert metrics.get("queue_depth", group="group1", backend="gated") == 2
+    assert (tmp_path / SPILL_FILENAME).exists()
+
+    inner.gate.set()
+    assert client.flush(timeout=5)
+    assert [message for message, _ in inner.messages] == events
+    assert [group for _, group in inner.messages][-3:] == ["group2"] * 3
+    assert not (tmp_path / SPILL_FILENAME).exists()
+    client.close()
+
+
+def test_buffered_spill_survives_restart(tmp_path):
+    inner = GatedLoggingClient(["group1"])
+    client = BufferedLoggingClient(
+        inner, max_queue_size=1, overflow_policy="spill", spill_directory=tmp_path
+    )
+    _fill(client, 1)
+    _wait_for_writer(client)
+    _fill(client, 4)
+    # the first process stops with its backend stalled
+    assert not client.close(timeout=0.05)
+
+    restarted_inner = GatedLoggingClient(["group1"])
+    restarted_inner.gate.set()
+    restarted = BufferedLoggingClient(
+        restarted_inner,
+        max_queue_size=1,
+        overflow_policy="spill",
+        spill_directory=tmp_path,
+    )
+    assert restarted.flush(timeout=5)
+    # the queued event was lost with the first process, the spilled events were not
+    assert len(restarted_inner.messages) == 3
+    restarted.close()
+
+
+def test_buffered_backend_failure_counts_drops():
+    inner = GatedLoggingClient(["group1"], fail=True)
+    inner.gate.set()
+    client = BufferedLoggingClient(inner, retry_interval=0)
+    _fill(client, 3)
+    assert client.flush(timeout=5)
+    assert client.dropped == {"group1": 3}
+    client.close()
+
+
+def test_buffered_event_logger(tmp_path):
+    eventit = EventLogger(
+        directory=tmp_path,
+        buffered=True,
+        buffer_size=100,
+        overflow_policy="drop_oldest",
+    )
+    assert isinstance(eventit.db_client, BufferedLoggingClient)
+    for _ in range(20):
+        eventit.log_event(description="buffered")
+    # reads see every write made before them
+    assert eventit.db_client.count_events_by_query({}, "default", BaseEvent) == 20
+    assert eventit.flush(timeout=5)
+    # attributes of the wrapped client remain reachable
+    assert eventit.db_client._filepaths["default"].exists()
+    eventit.db_client.close()
+
+
+class GatedFileLoggingClient(FileLoggingClient):
+    """File client whose writes wait until the gate is opened"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.gate = threading.Event()
+
+    def log_message(self, message, group):
+        self.gate.wait()
+        super().log_message(message, group)
+
+    def log_messages(self, messages, group):
+        self.gate.wait()
+        super().log_messages(messages, group)
+
+
+def test_buffered_reads_do_not_stall(tmp_path, monkeypatch):
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: start)
+    eventit = EventLogger(directory=tmp_path)
+    inner = GatedFileLoggingClient(directory=tmp_path, groups=eventit.groups)
+    eventit.db_client = BufferedLoggingClient(inner)
+
+    eventit.log_event(event_type=BaseCountableEvent, tracking_details={})
+    # the window's first write is stalled in flight
+    _wait_for_writer(eventit.db_client)
+    eventit.log_event(description="queued")
+    for _ in range(3):
+        began = time.perf_counter()
+        eventit.log_event(event_type=BaseCountableEvent, tracking_details={})
+        # the window is looked up and updated in the buffer, without waiting for the backend
+        assert time.perf_counter() - began < 0.5
+    [window] = eventit.db_client.search_events_by_query(
+        {}, "default", BaseCountableEvent, limit=1
+    )
+    assert window.count == 4
+    assert eventit.db_client.count_events_by_query({}, "default", BaseEvent) >= 1
+
+    inner.gate.set()
+    assert eventit.flush(timeout=5)
+    # a single window was written, with every count
+    windows = inner.search_events_by_query({"count": 4}, "default", BaseCountableEvent)
+    assert len(windows) == 1
+    assert inner.count_events_by_query({}, "default", BaseEvent) == 2
+    eventit.db_client.close()
+
+
+def test_buffered_queued_window_lookup(tmp_path, monkeypatch):
+    start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: start)
+    eventit = EventLogger(directory=tmp_path)
+    inner = GatedFileLoggingClient(directory=tmp_path, groups=eventit.groups)
+    eventit.db_client = BufferedLoggingClient(inner)
+
+    eventit.log_event(description="stalled")
+    _wait_for_writer(eventit.db_client)
+    # the window is queued behind the stalled write, so only its first lookup waits for the backend
+    eventit.log_event(event_type=BaseCountableEvent, tracking_details={})
+    began = time.perf_counter()
+    for _ in range(2):
+        eventit.log_event(event_type=BaseCountableEvent, tracking_details={})
+    assert time.perf_counter() - began < 0.5
+
+    inner.gate.set()
+    assert eventit.flush(timeout=5)
+    windows = inner.search_events_by_query({"count": 3}, "default", BaseCountableEvent)
+    assert len(windows) == 1
+    eventit.db_client.close()
+
+
+class FlakyLoggingClient(GatedLoggingClient):
+    """In-memory client whose first writes fail"""
+
+    def __init__(self, groups, failures):
+        super().__init__(groups)
+        self.gate.set()
+        self.failures = failures
+
+    def log_message(self, message, group):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("backend unavailable")
+        super().log_message(message, group)
+
+
+def test_buffered_retries_failed_batches():
+    inner = FlakyLoggingClient(["group1"], failures=2)
+    client = BufferedLoggingClient(inner, retry_interval=0, max_retries=3)
+    events = _fill(client, 1)
+    assert client.flush(timeout=5)
+    assert [message for message, _ in inner.messages] == events
+    assert client.dropped == {"group1": 0}
+    client.close()
+    with pytest.raises(ValueError):
+        BufferedLoggingClient(inner, max_retries=-1)
+
+
+def test_buffered_client_is_collected(monkeypatch):
+    monkeypatch.setattr(buffered_logging, "WRITER_IDLE_POLL", 0.01)
+    inner = GatedLoggingClient(["group1"])
+    inner.gate.set()
+    client = BufferedLoggingClient(inner)
+    _fill(client, 2)
+    assert client.flush(timeout=5)
+    client_ref = weakref.ref(client)
+    writer = client._writer
+    del client
+    deadline = time.monotonic() + 5
+    while client_ref() is not None and time.monotonic() < deadline:
+        gc.collect()
+        time.sleep(0.01)
+    # neither the exit hook nor the idle writer keep the client alive
+    assert client_ref() is None
+    writer.join(5)
+    assert not writer.is_alive()
+    assert len(inner.messages) == 2
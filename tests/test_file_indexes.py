@@ -0,0 +1,166 @@
+import datetime
+import json
+
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import INDEXES_DIRECTORY_NAME, FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+class IndexCountingFileLoggingClient(FileLoggingClient):
+    """FileLoggingClient that counts events read through an index"""
+
+    indexed_reads = 0
+
+    def _read_lines_at(self, group, offsets):
+        for line in super()._read_lines_at(group, offsets):
+            self.indexed_reads += 1
+            yield line
+
+
+def test_file_index_search(tmp_path):
+    client = IndexCountingFileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["user"]}
+    )
+    for i in range(50):
+        client.log_message(BaseEvent(user=f"user{i % 10}"), "group1")
+
+    results = client.search_events_by_query({"user": "user3"}, "group1", BaseEvent)
+    assert len(results) == 5
+    assert all(event.user == "user3" for event in results)
+    # only the matching lines were read
+    assert client.indexed_reads == 5
+
+    # a count on one indexed field is answered from the index alone
+    assert client.count_events_by_query({"user": "user3"}, "group1", BaseEvent) == 5
+    assert client.indexed_reads == 5
+    assert (
+        client.count_events_by_query(
+            {"user": "user3", "description": None}, "group1", BaseEvent
+        )
+        == 5
+    )
+    assert client.indexed_reads == 10
+    assert (
+        len(
+            client.search_events_by_query(
+                {"user": "user3", "description": "missing"}, "group1", BaseEvent
+            )
+        )
+        == 0
+    )
+    assert client.search_events_by_query({"user": "nobody"}, "group1", BaseEvent) == []
+    assert (
+        len(client.search_events_by_query({"user": "user3"}, "group1", BaseEvent, 2))
+        == 2
+    )
+
+    # events without the field are indexed under None
+    client.log_message(BaseEvent(), "group1")
+    assert len(client.search_events_by_query({"user": None}, "group1", BaseEvent)) == 1
+
+
+def test_file_index_matches_scan(tmp_path):
+    indexed = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    for i in range(20):
+        indexed.log_message(BaseEvent(user=f"user{i % 3}"), "group1")
+    unindexed_results = indexed.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent
+    )
+    indexed.create_index("group1", "user")
+    assert (
+        indexed.search_events_by_query({"user": "user1"}, "group1", BaseEvent)
+        == unindexed_results
+    )
+
+
+def test_file_index_persisted(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    client.create_index("group1", "user")
+    client.log_message(BaseEvent(user="alice"), "group1")
+    client.save_indexes()
+
+    index_path = tmp_path.joinpath(INDEXES_DIRECTORY_NAME, "group1.user.json")
+    assert json.loads(index_path.read_text())["entries"] == {'"alice"': [0]}
+
+    # events written by another client are indexed from the saved offset on load
+    other_client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    other_client.log_message(BaseEvent(user="alice"), "group1")
+    reloaded = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["user"]}
+    )
+    assert reloaded.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 2
+    # the original client catches up before searching
+    assert client.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 2
+
+
+def test_file_index_update_event(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["uuid", "count"]}
+    )
+    first = BaseCountableEvent(user="alice")
+    second = BaseCountableEvent(user="bob")
+    client.log_message(first, "group1")
+    client.log_message(second, "group1")
+
+    # the updated line grows, moving the line after it
+    first.count = 12345
+    first.description = "a much longer description than before"
+    client.update_event_by_uuid("group1", first, BaseCountableEvent)
+
+    assert client.get_event_by_uuid(second.uuid, "group1", BaseCountableEvent) == second
+    assert client.get_event_by_uuid(first.uuid, "group1", BaseCountableEvent) == first
+    assert client.count_events_by_query({"count": 1}, "group1", BaseCountableEvent) == 1
+    assert (
+        client.count_events_by_query({"count": 12345}, "group1", BaseCountableEvent)
+        == 1
+    )
+
+    # rebuilding from the file gives the same index
+    entries = dict(client._indexes[("group1", "uuid")].entries)
+    client.rebuild_index("group1")
+    assert client._indexes[("group1", "uuid")].entries == entries
+
+
+def test_file_index_aware_datetime(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["timestamp"]}
+    )
+    event = BaseEvent()
+    client.log_message(event, "group1")
+    # the same instant in another timezone finds the event stored in UTC
+    local_time = event.timestamp.astimezone(
+        datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+    )
+    results = client.search_events_by_query(
+        {"timestamp": local_time}, "group1", BaseEvent
+    )
+    assert [result.uuid for result in results] == [event.uuid]
+    assert (
+        client.count_events_by_query({"timestamp": local_time}, "group1", BaseEvent)
+        == 1
+    )
+
+
+def test_file_index_stale_offsets(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["user"]}
+    )
+    client.log_message(BaseEvent(user="alice"), "group1")
+    client.log_message(BaseEvent(user="bob"), "group1")
+    # swap the lines out from under the index, keeping the file size
+    filepath = tmp_path.joinpath("group1.log")
+    lines = filepath.read_text().splitlines(keepends=True)
+    filepath.write_text(lines[1] + lines[0])
+
+    results = client.search_events_by_query({"user": "bob"}, "group1", BaseEvent)
+    assert [event.user for event in results] == ["bob"]
+
+
+def test_file_index_event_logger(tmp_path):
+    eventit = EventLogger(directory=tmp_path, file_indexes={"default": ["user"]})
+    eventit.log_event(description="indexed")
+    assert ("default", "user") in eventit.db_client._indexes
+    assert (
+        eventit.db_client.count_events_by_query({"user": None}, "default", BaseEvent)
+        == 1
+    )
@@ -0,0 +1,59 @@
+import datetime
+
+import pytest
+from eventit_py import event_logger
+from eventit_py.event_logger import EventLogger
+from eventit_py.pydantic_events import BaseCountableEvent, BaseGaugeEvent
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class QueueSize(BaseGaugeEvent):
+    gauge_field: str = "queue_size"
+    time_window: int = 60
+
+
+def test_gauge_aggregation(tmp_path, monkeypatch):
+    clock = {"now": START}
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: clock["now"])
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[3600])
+    queue = {"size": 0}
+    eventit.register_custom_metric("queue_size", lambda func, context: queue["size"])
+
+    for second in range(0, 180, 10):
+        clock["now"] = START + datetime.timedelta(seconds=second)
+        queue["size"] = second // 10
+        eventit.log_event(tracking_details={"queue_size": True}, event_type=QueueSize)
+    # values can also be passed directly
+    eventit.log_event(event_type=QueueSize, summary_value=100.5)
+    # nothing is written for the open window, and closed windows are written in the background
+    eventit._wait_for_rollups()
+    windows = eventit.db_client.search_events_by_query(
+        {"time_window": 60}, "default", QueueSize
+    )
+    assert [(window.samples, window.min, window.max) for window in windows] == [
+        (6, 0, 5),
+        (6, 6, 11),
+    ]
+    assert windows[0].last == 5 and windows[0].sum == 15
+
+    eventit.flush()
+    end = START + datetime.timedelta(hours=1)
+    per_minute = eventit.query_gauges(QueueSize, START, end, resolution=60)
+    assert [stats["samples"] for _, stats in per_minute] == [6, 6, 7]
+    assert per_minute[2][1]["last"] == 100.5
+    [(bucket, stats)] = eventit.query_gauges(QueueSize, START, end)
+    assert bucket == START
+    assert stats == {
+        "min": 0,
+        "max": 100.5,
+        "sum": sum(range(18)) + 100.5,
+        "samples": 19,
+        "mean": (sum(range(18)) + 100.5) / 19,
+        "last": 100.5,
+    }
+
+    with pytest.raises(TypeError):
+        eventit.log_event(event_type=QueueSize, summary_value="full")
+    with pytest.raises(TypeError):
+        eventit.query_gauges(BaseCountableEvent, START, end)
@@ -0,0 +1,94 @@
+from eventit_py.event_logger import EventLogger
+from eventit_py.instrumentation import Instrumentation, LatencyHistogram
+from eventit_py.logging_backends import FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent
+
+
+class MinuteCounter(BaseCountableEvent):
+    time_window: int = 60
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.5) is None
+    for _ in range(99):
+        histogram.record(0.000010)
+    histogram.record(0.5)
+    assert histogram.count == 100
+    assert histogram.min == 0.000010
+    assert histogram.max == 0.5
+    # 10us falls in the (8us, 16us] bucket
+    assert histogram.percentile(0.5) == 16 / 1e6
+    assert histogram.percentile(1.0) == 0.5
+    summary = histogram.as_dict()
+    assert summary["count"] == 100
+    assert sum(summary["buckets"]) == 100
+
+
+def test_instrumentation_disabled_by_default(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    eventit.log_event(description="not instrumented")
+    assert eventit.instrumentation is None
+    assert eventit.stats() == {"stages": {}, "counters": {}}
+    # methods are not wrapped when instrumentation is disabled
+    assert "log_message" not in eventit.db_client.__dict__
+
+
+def test_log_event_stage_timings(tmp_path):
+    eventit = EventLogger(directory=tmp_path, instrumentation=True)
+    for _ in range(5):
+        eventit.log_event(description="instrumented")
+
+    stages = eventit.stats()["stages"]
+    for stage in [
+        "log_event.metrics",
+        "log_event.validation",
+        "log_event.backend",
+        "log_event.total",
+        "backend.log_message",
+        "backend.log_message.serialize",
+        "backend.log_message.write",
+    ]:
+        assert stages[stage]["count"] == 5, stage
+    assert stages["log_event.total"]["total_seconds"] > 0
+
+    eventit.reset_stats()
+    assert eventit.stats()["stages"] == {}
+
+
+def test_countable_event_stage_timings(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    eventit.enable_instrumentation()
+    for _ in range(3):
+        eventit.log_event(event_type=MinuteCounter)
+
+    stages = eventit.stats()["stages"]
+    assert stages["log_countable_event.total"]["count"] == 3
+    assert stages["log_countable_event.lookup"]["count"] == 3
+    assert stages["backend.search_events_by_query"]["count"] == 3
+    # one insert, then updates (unless the time window rolled over)
+    assert (
+        stages["backend.log_message"]["count"]
+        + stages.get("backend.update_event_by_uuid", {"count": 0})["count"]
+        == 3
+    )
+
+    eventit.disable_instrumentation()
+    eventit.log_event(event_type=MinuteCounter)
+    assert eventit.stats() == {"stages": {}, "counters": {}}
+    assert "search_events_by_query" not in eventit.db_client.__dict__
+
+
+def test_backend_set_instrumentation(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    instrumentation = Instrumentation()
+    client.set_instrumentation(instrumentation)
+    # enabling twice must not nest wrappers
+    client.set_instrumentation(instrumentation)
+    client.count_events_by_query({}, "group1", MinuteCounter)
+    assert (
+        instrumentation.stats()["stages"]["backend.count_events_by_query"]["count"] == 1
+    )
+
+    instrumentation.increment("errors", 2)
+    assert instrumentation.stats()["counters"] == {"errors": 2}
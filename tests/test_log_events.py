@@ -0,0 +1,93 @@
+import pydantic
+import pytest
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import MongoDBLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+class WriteCountingFile:
+    """File handle proxy counting writes"""
+
+    def __init__(self, file_handle):
+        self.file_handle = file_handle
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return self.file_handle.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file_handle, name)
+
+
+def test_log_events(tmp_path):
+    eventit = EventLogger(directory=tmp_path, file_indexes={"default": ["user"]})
+    metrics = eventit.enable_self_metrics()
+    client = eventit.db_client
+    client.register_count_query("alice", "default", {"user": "alice"})
+    handle = client.file_handles["default"] = WriteCountingFile(
+        client.file_handles["default"]
+    )
+
+    def batch_job():
+        pass
+
+    events = [{"user": f"user{i % 3}", "description": f"row {i}"} for i in range(9)]
+    events.append({"user": "alice"})
+    events.append(BaseEvent(user="alice", description="prebuilt"))
+    eventit.log_events(
+        events,
+        func=batch_job,
+        description="batch",
+        tracking_details={"function_name": True},
+    )
+    assert handle.writes == 1
+    assert metrics.get("events_total", group="default", backend="filepath") == 11
+
+    logged = client.search_events_by_query({}, "default", BaseEvent)
+    descriptions = {event.description: event for event in logged}
+    assert sorted(descriptions) == sorted(
+        [*(f"row {i}" for i in range(9)), "batch", "prebuilt"]
+    )
+    # metrics are retrieved once, and only added to events given as fields
+    assert [event.function_name for event in logged].count("batch_job") == 10
+    assert descriptions["prebuilt"].function_name is None
+    # indexes and materialized counts follow every event of the batch
+    assert client.get_materialized_count("alice") == 2
+    assert (
+        len(client.search_events_by_query({"user": "user1"}, "default", BaseEvent)) == 3
+    )
+
+
+def test_log_events_validation(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    with pytest.raises(pydantic.ValidationError):
+        eventit.log_events([{"user": "alice"}, {"user": ["not", "a", "string"]}])
+    # a batch with an invalid event is not logged at all
+    assert eventit.db_client.search_events_by_query({}, "default", BaseEvent) == []
+    with pytest.raises(TypeError):
+        eventit.log_events([{}], event_type=BaseCountableEvent)
+    with pytest.raises(TypeError):
+        eventit.log_events([{}], event_type=dict)
+    eventit.log_events([])
+    assert eventit.db_client.search_events_by_query({}, "default", BaseEvent) == []
+
+
+def test_log_events_wrapped_clients(tmp_path):
+    eventit = EventLogger(directory=tmp_path, buffered=True, query_cache_size=8)
+    assert eventit.db_client.search_events_by_query({}, "default", BaseEvent) == []
+    eventit.log_events([{"description": str(i)} for i in range(2500)])
+    events = eventit.db_client.search_events_by_query({}, "default", BaseEvent)
+    assert [event.description for event in events] == [str(i) for i in range(2500)]
+    eventit.db_client.close()
+
+
+def test_mongodb_log_messages(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri, groups=["group1"], database_name="eventit"
+    )
+    events = [BaseEvent(user=f"user{i % 2}") for i in range(4)]
+    client.log_messages(events, "group1")
+    client.log_messages([], "group1")
+    results = client.search_events_by_query({"user": "user1"}, "group1", BaseEvent)
+    assert [event.uuid for event in results] == [events[1].uuid, events[3].uuid]
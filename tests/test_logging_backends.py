@@ -1,15 +1,20 @@
 import io
+import os
 import pathlib
 import time
 from datetime import datetime, timezone
 
 import pytest
+from eventit_py.event_logger import EventLogger
 from eventit_py.logging_backends import (
     BaseLoggingClient,
     FileLoggingClient,
     MongoDBLoggingClient,
+    MongoIndexSpec,
+    close_shared_mongo_clients,
+    get_shared_mongo_client,
 )
-from eventit_py.pydantic_events import BaseEvent
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
 from pymongo.errors import ServerSelectionTimeoutError
 
 
@@ -252,3 +257,241 @@ def test_mongodb_logging_client_bad_mongo_uri():
             exclude_none=True,
             database_name="eventit",
         )
+
+
+def test_mongodb_logging_client_lazy_connect_bad_mongo_uri():
+    groups = ["group1", "group2"]
+    start = time.perf_counter()
+    # should not block on server selection, or raise, when connecting lazily
+    client = MongoDBLoggingClient(
+        mongo_url="mongodb://localhost:9999",
+        groups=groups,
+        exclude_none=True,
+        database_name="eventit",
+        lazy_connect=True,
+    )
+    assert time.perf_counter() - start < 1
+    assert client._index_thread is not None
+    # background index configuration fails quietly once server selection times out
+    assert client.wait_for_indices(timeout=10)
+
+
+@pytest.mark.mongodb
+def test_mongodb_logging_client_lazy_connect_keeps_data(get_mongo_uri):
+    groups = ["group1"]
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=groups,
+        exclude_none=True,
+        database_name="eventit",
+    )
+    message = BaseEvent()
+    client.log_message(message, "group1")
+
+    # a lazy restart must not drop the existing data
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=groups,
+        exclude_none=True,
+        database_name="eventit",
+        lazy_connect=True,
+    )
+    client.log_message(BaseEvent(), "group1")
+    assert client.wait_for_indices(timeout=10)
+    assert client.get_event_by_uuid(message.uuid, "group1", BaseEvent) is not None
+    assert client.count_events_by_query({}, "group1", BaseEvent) == 2
+    assert "uuid_index" in client._db["group1"].index_information()
+
+
+def test_shared_mongo_client_registry():
+    client_a = get_shared_mongo_client("mongodb://localhost:9999", maxPoolSize=5)
+    client_b = get_shared_mongo_client("mongodb://localhost:9999", maxPoolSize=5)
+    client_c = get_shared_mongo_client("mongodb://localhost:9999", maxPoolSize=10)
+    assert client_a is client_b
+    assert client_a is not client_c
+    assert client_a.options.pool_options.max_pool_size == 5
+
+    close_shared_mongo_clients()
+    assert get_shared_mongo_client("mongodb://localhost:9999", maxPoolSize=5) is not (
+        client_a
+    )
+    close_shared_mongo_clients()
+
+
+def test_shared_mongo_client_across_loggers():
+    loggers = [
+        EventLogger(
+            MONGO_URL="mongodb://localhost:9999",
+            lazy_connect=True,
+            max_pool_size=7,
+            max_idle_time_ms=1000,
+            compressors=["zlib"],
+            groups=[group],
+        )
+        for group in ["subsystem1", "subsystem2"]
+    ]
+    mongo_clients = [eventit.db_client._mongo_client for eventit in loggers]
+    assert mongo_clients[0] is mongo_clients[1]
+    assert mongo_clients[0].options.pool_options.max_pool_size == 7
+    assert mongo_clients[0].options.pool_options.max_idle_time_seconds == 1
+
+    # opting out of sharing opens a separate pool
+    eventit = EventLogger(
+        MONGO_URL="mongodb://localhost:9999",
+        lazy_connect=True,
+        max_pool_size=7,
+        max_idle_time_ms=1000,
+        compressors=["zlib"],
+        share_mongo_client=False,
+    )
+    assert eventit.db_client._mongo_client is not mongo_clients[0]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_shared_mongo_client_fork_safety():
+    parent_client = get_shared_mongo_client("mongodb://localhost:9999")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover
+        # child process gets a fresh client, rather than the parent's pool
+        child_client = get_shared_mongo_client("mongodb://localhost:9999")
+        os.write(write_fd, b"1" if child_client is not parent_client else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    os.waitpid(pid, 0)
+    assert os.read(read_fd, 1) == b"1"
+    os.close(read_fd)
+    assert get_shared_mongo_client("mongodb://localhost:9999") is parent_client
+
+
+def test_file_update_event_by_uuid_replaces_line(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    events = [BaseEvent(description=str(i)) for i in range(3)]
+    for event in events:
+        client.log_message(event, "group1")
+    events[1].description = "updated"
+    response = client.update_event_by_uuid("group1", events[1], BaseEvent)
+    assert response == {"matched_count": 1, "modified_count": 1}
+    # the original line is replaced, not kept after the updated event
+    lines = client._filepaths["group1"].read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    stored = client.search_events_by_query({}, "group1", BaseEvent)
+    assert [event.description for event in stored] == ["0", "updated", "2"]
+
+
+def test_mongo_index_spec():
+    spec = MongoIndexSpec.model_validate(
+        {"keys": ["user", ("function_name", -1)], "groups": ["group1"]}
+    )
+    assert spec.keys == [("user", 1), ("function_name", -1)]
+    assert spec.name == "user_1_function_name_-1_index"
+    assert spec.applies_to("group1")
+    assert not spec.applies_to("group2")
+
+    # equality queries on a prefix of the keys can be answered from the index
+    assert spec.covers({"user": "alice"})
+    assert spec.covers({"function_name": "f", "user": "alice"})
+    assert not spec.covers({"function_name": "f"})
+    assert not spec.covers({"user": "alice", "description": "d"})
+    assert not spec.covers({})
+
+    partial = MongoIndexSpec(
+        keys=["count"],
+        event_type=BaseCountableEvent,
+        partial_filter={"count": {"$gt": 1}},
+    )
+    assert not partial.covers({"count": 2})
+    with pytest.raises(ValueError):
+        MongoIndexSpec(keys=["not_a_field"], event_type=BaseCountableEvent)
+    with pytest.raises(ValueError):
+        MongoIndexSpec(keys=[])
+
+
+def test_mongodb_logging_client_declared_indexes(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=["group1", "group2"],
+        database_name="eventit",
+        indexes=[
+            {"keys": ["user", "function_name"]},
+            {
+                "keys": ["count"],
+                "groups": ["group2"],
+                "event_type": BaseCountableEvent,
+                "partial_filter": {"count": {"$gt": 1}},
+            },
+        ],
+    )
+    group1_indices = client._db["group1"].index_information()
+    group2_indices = client._db["group2"].index_information()
+    assert "user_1_function_name_1_index" in group1_indices
+    assert "count_1_index" not in group1_indices
+    assert group2_indices["count_1_index"]["partialFilterExpression"] == {
+        "count": {"$gt": 1}
+    }
+
+    for user in ["alice", "bob", "alice"]:
+        client.log_message(BaseEvent(user=user, function_name="f"), "group1")
+    assert client._covering_index("group1", {"user": "alice"}).name == (
+        "user_1_function_name_1_index"
+    )
+    assert client.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 2
+    assert (
+        client.count_events_by_query(
+            {"user": "alice", "function_name": "f"}, "group1", BaseEvent
+        )
+        == 2
+    )
+
+    with pytest.raises(ValueError):
+        MongoDBLoggingClient(
+            mongo_url=get_mongo_uri,
+            groups=["group1"],
+            indexes=[{"keys": ["user"], "groups": ["missing"]}],
+        )
+
+
+def test_mongodb_logging_client_timeseries(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=["group1"],
+        database_name="eventit",
+        timeseries=True,
+        timeseries_meta_fields=["user", "function_name"],
+        indexes=[{"keys": ["user"]}],
+    )
+    assert "timeseries" in client._db["group1"].options()
+    # declared indexes on meta fields are created on the meta subdocument
+    user_index = client._db["group1"].index_information()["user_1_index"]
+    assert user_index["key"] == [("meta.user", 1)]
+
+    for user in ["alice", "bob", "alice"]:
+        client.log_message(BaseEvent(user=user, function_name="f"), "group1")
+    stored = client._db["group1"].find_one({}, {"_id": 0})
+    assert stored["meta"] == {"user": "alice", "function_name": "f"}
+    assert "user" not in stored
+
+    events = client.search_events_by_query({"user": "alice"}, "group1", BaseEvent)
+    assert [event.user for event in events] == ["alice", "alice"]
+    assert client.count_events_by_query({"user": "bob"}, "group1", BaseEvent) == 1
+    records = client.search_events_by_query(
+        {"user": "bob"}, "group1", BaseEvent, fields=["user", "function_name"]
+    )
+    assert records == [{"user": "bob", "function_name": "f"}]
+    page = client.search_events_page("group1", query_dict={"user": "alice"})
+    assert [event.user for event in page.events] == ["alice", "alice"]
+
+    with pytest.raises(ValueError):
+        MongoDBLoggingClient(
+            mongo_url=get_mongo_uri,
+            groups=["group1"],
+            timeseries=True,
+            indexes=[{"keys": ["user"], "unique": True}],
+        )
+    with pytest.raises(ValueError):
+        MongoDBLoggingClient(
+            mongo_url=get_mongo_uri,
+            groups=["group1"],
+            timeseries=True,
+            timeseries_meta_fields=["timestamp"],
+        )
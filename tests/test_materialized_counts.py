@@ -0,0 +1,122 @@
+import datetime
+import json
+
+import pytest
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import COUNTS_DIRECTORY_NAME, FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+def test_materialized_count_backfill_and_updates(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1", "group2"])
+    for user in ["alice", "bob", "alice"]:
+        client.log_message(BaseEvent(user=user), "group1")
+
+    count = client.register_count_query("alice", "group1", {"user": "alice"})
+    assert client.get_materialized_count("alice") == 2
+
+    client.log_message(BaseEvent(user="alice"), "group1")
+    client.log_message(BaseEvent(user="alice"), "group2")
+    client.log_message(BaseEvent(user="bob"), "group1")
+    assert client.get_materialized_count("alice") == 3
+    assert client.get_materialized_count("alice") == client.count_events_by_query(
+        {"user": "alice"}, "group1", BaseEvent
+    )
+    assert count.offset == client._filepaths["group1"].stat().st_size
+
+    # registering the same query again returns the existing count
+    assert client.register_count_query("alice", "group1", {"user": "alice"}) is count
+    with pytest.raises(ValueError):
+        client.register_count_query("alice", "group1", {"user": "bob"})
+    with pytest.raises(ValueError):
+        client.register_count_query("bad", "group1", {"not_a_field": 1})
+    with pytest.raises(ValueError):
+        client.get_materialized_count("missing")
+
+
+def test_materialized_count_time_buckets(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    earlier = now - datetime.timedelta(hours=2)
+    client.log_message(BaseEvent(user="alice", timestamp=earlier), "group1")
+    client.register_count_query("hourly", "group1", {"user": "alice"}, time_bucket=3600)
+    client.log_message(BaseEvent(user="alice", timestamp=now), "group1")
+    client.log_message(BaseEvent(user="alice", timestamp=now), "group1")
+
+    assert client.get_materialized_count("hourly") == 3
+    assert client.get_materialized_count("hourly", bucket_time=now) == 2
+    assert client.get_materialized_count("hourly", bucket_time=earlier) == 1
+    assert (
+        client.get_materialized_count(
+            "hourly", bucket_time=now - datetime.timedelta(hours=5)
+        )
+        == 0
+    )
+
+
+def test_materialized_count_persisted(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    client.register_count_query("alice", "group1", {"user": "alice"})
+    client.log_message(BaseEvent(user="alice"), "group1")
+    client.save_materialized_counts()
+
+    # events written by another client are read from the saved offset on load
+    other_client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    other_client.log_message(BaseEvent(user="alice"), "group1")
+
+    count_path = tmp_path.joinpath(COUNTS_DIRECTORY_NAME, "group1.alice.json")
+    saved = json.loads(count_path.read_text())
+    assert saved["total"] == 1
+
+    reloaded = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    reloaded.register_count_query("alice", "group1", {"user": "alice"})
+    assert reloaded.get_materialized_count("alice") == 2
+
+    # the original client catches up on the next write
+    client.log_message(BaseEvent(user="alice"), "group1")
+    assert client.get_materialized_count("alice") == 3
+
+
+def test_materialized_count_update_event(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    event = BaseCountableEvent(user="alice")
+    client.log_message(event, "group1")
+    client.register_count_query(
+        "first", "group1", {"count": 1}, event_type=BaseCountableEvent
+    )
+    client.register_count_query(
+        "second", "group1", {"count": 2}, event_type=BaseCountableEvent
+    )
+    assert client.get_materialized_count("first") == 1
+
+    event.count = 2
+    client.update_event_by_uuid("group1", event, BaseCountableEvent)
+    assert client.get_materialized_count("first") == 0
+    assert client.get_materialized_count("second") == 1
+
+    client.log_message(BaseCountableEvent(user="bob"), "group1")
+    assert client.get_materialized_count("first") == 1
+
+
+def test_materialized_count_single_file(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path,
+        groups=["group1", "group2"],
+        separate_files=False,
+        filename="all.log",
+    )
+    client.register_count_query("all", "group1", {})
+    client.log_message(BaseEvent(), "group1")
+    client.log_message(BaseEvent(), "group2")
+    # both groups are stored in the same file, as count_events_by_query sees them
+    assert client.get_materialized_count("all") == 2
+    assert client.count_events_by_query({}, "group1", BaseEvent) == 2
+
+
+def test_materialized_count_event_logger(tmp_path):
+    eventit = EventLogger(directory=tmp_path, buffered=True)
+    eventit.db_client.register_count_query("all", "default", {})
+    for _ in range(5):
+        eventit.log_event(description="counted")
+    assert eventit.db_client.get_materialized_count("all") == 5
+    eventit.db_client.close()
@@ -0,0 +1,110 @@
+import urllib.error
+import urllib.request
+
+import pytest
+from eventit_py.event_logger import EventLogger
+from eventit_py.metrics_exporter import PrometheusExporter, SelfMetrics
+from eventit_py.pydantic_events import BaseEvent
+
+
+def test_self_metrics_render_prometheus():
+    metrics = SelfMetrics()
+    metrics.increment("events_total", group="default", backend="filepath")
+    metrics.increment("events_total", 2, group="default", backend="filepath")
+    metrics.set_gauge("queue_depth", lambda: 7, group="default", backend="filepath")
+    metrics.observe(
+        "search_duration_seconds",
+        0.000010,
+        group="default",
+        backend="filepath",
+        method="search_events_by_query",
+    )
+    assert metrics.get("events_total", group="default", backend="filepath") == 3
+    assert metrics.get("queue_depth", group="default", backend="filepath") == 7
+
+    text = metrics.render_prometheus()
+    assert "# TYPE eventit_events_total counter" in text
+    assert 'eventit_events_total{backend="filepath",group="default"} 3' in text
+    assert 'eventit_queue_depth{backend="filepath",group="default"} 7' in text
+    assert "# TYPE eventit_search_duration_seconds histogram" in text
+    assert (
+        'eventit_search_duration_seconds_count{backend="filepath",group="default",'
+        'method="search_events_by_query"} 1'
+    ) in text
+    assert 'le="+Inf"} 1' in text
+
+    metrics.reset()
+    assert metrics.get("events_total", group="default", backend="filepath") is None
+    # registered gauges survive a reset
+    assert metrics.get("queue_depth", group="default", backend="filepath") == 7
+
+
+def test_logger_self_metrics(tmp_path):
+    eventit = EventLogger(directory=tmp_path, groups=["group1"])
+    metrics = eventit.enable_self_metrics()
+    for _ in range(3):
+        eventit.log_event(description="counted")
+    eventit.log_event(description="counted", group="group1")
+    eventit.db_client.search_events_by_query({}, "default", BaseEvent)
+
+    assert metrics.get("events_total", group="default", backend="filepath") == 3
+    assert metrics.get("events_total", group="group1", backend="filepath") == 1
+    file_size = eventit.db_client._filepaths["default"].stat().st_size
+    assert (
+        metrics.get("bytes_written_total", group="default", backend="filepath")
+        == file_size
+    )
+    histogram = metrics.get(
+        "search_duration_seconds",
+        group="default",
+        backend="filepath",
+        method="search_events_by_query",
+    )
+    assert histogram.count == 1
+
+    with pytest.raises(ValueError):
+        eventit.db_client.log_message(BaseEvent(), "missing_group")
+    assert (
+        metrics.get(
+            "backend_errors_total",
+            group="missing_group",
+            backend="filepath",
+            method="log_message",
+        )
+        == 1
+    )
+
+
+def test_self_metrics_with_instrumentation(tmp_path):
+    eventit = EventLogger(directory=tmp_path, instrumentation=True)
+    metrics = eventit.enable_self_metrics()
+    eventit.log_event()
+    assert metrics.get("events_total", group="default", backend="filepath") == 1
+    assert eventit.stats()["stages"]["backend.log_message"]["count"] == 1
+
+
+def test_prometheus_exporter_http(tmp_path):
+    eventit = EventLogger(directory=tmp_path, metrics_port=0)
+    try:
+        eventit.log_event()
+        port = eventit.metrics_exporter.port
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain")
+            body = response.read().decode("utf-8")
+        assert 'eventit_events_total{backend="filepath",group="default"} 1' in body
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/missing")
+    finally:
+        eventit.stop_metrics_exporter()
+    assert eventit.metrics_exporter is None
+
+
+def test_prometheus_exporter_start_stop():
+    exporter = PrometheusExporter(SelfMetrics(), port=0)
+    assert exporter.start() is exporter.start()
+    port = exporter.port
+    assert port != 0
+    exporter.stop()
+    exporter.stop()
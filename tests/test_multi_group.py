@@ -0,0 +1,108 @@
+import datetime
+
+import pytest
+from eventit_py.logging_backends import ALL_GROUPS, FileLoggingClient
+from eventit_py.pydantic_events import BaseEvent
+from eventit_py.query_cache import CachedLoggingClient
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+END = START + datetime.timedelta(hours=1)
+
+
+def _event(minute: int, user: str) -> BaseEvent:
+    return BaseEvent(
+        timestamp=START + datetime.timedelta(minutes=minute),
+        user=user,
+        description=f"minute {minute}",
+    )
+
+
+@pytest.fixture
+def file_client(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["api", "web", "jobs"])
+    for minute in range(12):
+        group = ["api", "web", "jobs"][minute % 3]
+        client.log_message(_event(minute, f"user{minute % 2}"), group)
+    return client
+
+
+def _minutes(events):
+    return [int((event.timestamp - START).total_seconds() // 60) for event in events]
+
+
+def test_search_multiple_groups(file_client):
+    events = file_client.search_events_by_timestamp(
+        START, END, ["api", "web"], BaseEvent
+    )
+    assert _minutes(events) == [0, 1, 3, 4, 6, 7, 9, 10]
+
+    # the limit applies to the merged results
+    events = file_client.search_events_by_query(
+        {"user": "user1"}, ALL_GROUPS, BaseEvent, limit=3, order="desc"
+    )
+    assert _minutes(events) == [11, 9, 7]
+    events = file_client.search_events_by_query(
+        {}, ALL_GROUPS, BaseEvent, limit=4, order="asc"
+    )
+    assert _minutes(events) == [0, 1, 2, 3]
+
+    # timestamp is used to merge, but only requested fields are returned
+    records = file_client.search_events_by_query(
+        {"user": "user0"}, ["web", "jobs"], BaseEvent, fields=["description"]
+    )
+    assert records == [{"description": f"minute {minute}"} for minute in [2, 4, 8, 10]]
+
+    with pytest.raises(ValueError):
+        file_client.search_events_by_query({}, ["api", "nope"], BaseEvent)
+
+
+def test_count_multiple_groups(file_client):
+    assert file_client.count_events_by_query({}, ALL_GROUPS, BaseEvent) == 12
+    assert (
+        file_client.count_events_by_query({"user": "user1"}, ["api", "jobs"], BaseEvent)
+        == 4
+    )
+
+
+def test_multiple_groups_executor(file_client):
+    # queries across groups share one executor, which close() shuts down
+    assert file_client._group_executor is None
+    file_client.count_events_by_query({}, ALL_GROUPS, BaseEvent)
+    executor = file_client._group_executor
+    file_client.search_events_by_query({}, ["api", "web"], BaseEvent)
+    assert file_client._group_executor is executor
+
+    file_client.close()
+    assert file_client._group_executor is None
+    assert executor._shutdown
+    # and a later query starts a new one
+    assert file_client.count_events_by_query({}, ALL_GROUPS, BaseEvent) == 12
+    file_client.close()
+
+
+def test_multiple_groups_shared_file(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path,
+        groups=["api", "web"],
+        filename="events.log",
+        separate_files=False,
+    )
+    client.log_message(_event(0, "user0"), "api")
+    client.log_message(_event(1, "user0"), "web")
+    # both groups read the same file, so events are not returned twice
+    assert _minutes(client.search_events_by_query({}, ALL_GROUPS, BaseEvent)) == [0, 1]
+    assert client.count_events_by_query({}, ["api", "web"], BaseEvent) == 2
+
+
+def test_cached_multiple_groups(file_client):
+    cached_client = CachedLoggingClient(file_client)
+    events = cached_client.search_events_by_query(
+        {}, ["api", "web"], BaseEvent, limit=2, order="desc"
+    )
+    assert _minutes(events) == [10, 9]
+    cached_client.log_message(_event(20, "user0"), "web")
+    events = cached_client.search_events_by_query(
+        {}, ["api", "web"], BaseEvent, limit=2, order="desc"
+    )
+    assert _minutes(events) == [20, 10]
+    assert cached_client.cache_info()["hits"] == 2
@@ -0,0 +1,197 @@
+import datetime
+
+import pytest
+from eventit_py import logging_backends
+from eventit_py.logging_backends import FileLoggingClient, MongoDBLoggingClient
+from eventit_py.pydantic_events import BaseEvent
+from eventit_py.query_cache import CachedLoggingClient
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+# events are written out of timestamp order
+MINUTES = [5, 1, 9, 3, 7, 0, 8, 2, 6, 4]
+
+
+def _event(minute: int, user: str = None) -> BaseEvent:
+    return BaseEvent(
+        timestamp=START + datetime.timedelta(minutes=minute),
+        user=user or f"user{minute % 2}",
+        description=f"minute {minute}",
+    )
+
+
+@pytest.fixture
+def file_client(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    for minute in MINUTES:
+        client.log_message(_event(minute), "group1")
+    return client
+
+
+def _minutes(events):
+    return [int((event.timestamp - START).total_seconds() // 60) for event in events]
+
+
+def test_search_events_by_timestamp_order(file_client):
+    end_time = START + datetime.timedelta(hours=1)
+    newest = file_client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, limit=3, order="desc"
+    )
+    assert _minutes(newest) == [9, 8, 7]
+    oldest = file_client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, limit=3, order="asc"
+    )
+    assert _minutes(oldest) == [0, 1, 2]
+    everything = file_client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, order="desc"
+    )
+    assert _minutes(everything) == list(range(9, -1, -1))
+
+    # without an order, the first matches in the file are returned sorted
+    first = file_client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, limit=3
+    )
+    assert _minutes(first) == [1, 5, 9]
+
+    records = file_client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, limit=2, order="desc", fields=["user"]
+    )
+    assert records == [{"user": "user1"}, {"user": "user0"}]
+
+    with pytest.raises(ValueError):
+        file_client.search_events_by_timestamp(
+            START, end_time, "group1", BaseEvent, order="newest"
+        )
+
+
+def test_search_events_by_query_order(file_client):
+    newest = file_client.search_events_by_query(
+        {"user": "user0"}, "group1", BaseEvent, limit=2, order="desc"
+    )
+    assert _minutes(newest) == [8, 6]
+    oldest = file_client.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent, limit=2, order="asc", raw=True
+    )
+    assert [record["description"] for record in oldest] == ["minute 1", "minute 3"]
+
+    file_client.create_index("group1", "user")
+    indexed = file_client.search_events_by_query(
+        {"user": "user0"}, "group1", BaseEvent, limit=2, order="desc"
+    )
+    assert indexed == newest
+
+
+def test_reverse_scan(tmp_path, monkeypatch):
+    # blocks smaller than a line, so lines span several reads
+    monkeypatch.setattr(logging_backends, "REVERSE_READ_BLOCK_SIZE", 7)
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    events = [_event(minute) for minute in range(5)]
+    for event in events:
+        client.log_message(event, "group1")
+    # a line that is still being written is skipped
+    client.file_handles["group1"].write('{"timestamp": ')
+    client.file_handles["group1"].flush()
+
+    lines = list(client._iter_lines_reversed("group1"))
+    assert [BaseEvent.model_validate_json(line) for line in lines] == events[::-1]
+
+
+def test_append_ordered(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], append_ordered=True
+    )
+    for minute in range(10):
+        client.log_message(_event(minute), "group1")
+    newest = client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=3, order="desc"
+    )
+    assert _minutes(newest) == [9, 8, 7]
+
+
+class LineCountingFileLoggingClient(FileLoggingClient):
+    """FileLoggingClient that counts the lines read by searches"""
+
+    lines_read = 0
+
+    def _iter_lines(self, group, order=None):
+        for line in super()._iter_lines(group, order):
+            self.lines_read += 1
+            yield line
+
+
+def test_detected_append_order(tmp_path):
+    client = LineCountingFileLoggingClient(directory=tmp_path, groups=["group1"])
+    for minute in range(10):
+        client.log_message(_event(minute), "group1")
+    # the first ordered search checks the file, and then stops at the limit
+    newest = client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=3, order="desc"
+    )
+    assert _minutes(newest) == [9, 8, 7]
+    assert client.lines_read == 3
+
+    # appends, from this client or another one, keep the order up to date
+    client.log_messages([_event(10), _event(11)], "group1")
+    other_client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    other_client.log_message(_event(12), "group1")
+    newest = client.search_events_by_timestamp(
+        START, START + datetime.timedelta(hours=1), "group1", BaseEvent, 2, order="desc"
+    )
+    assert _minutes(newest) == [12, 11]
+    assert client.lines_read == 5
+
+    # an update that keeps the timestamp keeps the order
+    newest[0].description = "updated"
+    client.update_event_by_uuid("group1", newest[0], BaseEvent)
+    assert client._appended_in_order("group1")
+
+    # an older event ends early termination, and searches fall back to the heap
+    client.log_message(_event(1), "group1")
+    client.log_message(_event(13), "group1")
+    oldest = client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=3, order="asc"
+    )
+    assert _minutes(oldest) == [0, 1, 1]
+    assert not client._appended_in_order("group1")
+
+
+def test_cached_order(file_client):
+    cached_client = CachedLoggingClient(file_client)
+    newest = cached_client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=3, order="desc"
+    )
+    oldest = cached_client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=3, order="asc"
+    )
+    assert _minutes(newest) == [9, 8, 7]
+    assert _minutes(oldest) == [0, 1, 2]
+
+    # a newer event displaces the oldest of the cached newest events
+    cached_client.log_message(_event(10), "group1")
+    assert _minutes(
+        cached_client.search_events_by_query(
+            {}, "group1", BaseEvent, limit=3, order="desc"
+        )
+    ) == [10, 9, 8]
+    assert _minutes(
+        cached_client.search_events_by_query(
+            {}, "group1", BaseEvent, limit=3, order="asc"
+        )
+    ) == [0, 1, 2]
+    assert cached_client.cache_info()["hits"] == 2
+
+
+def test_mongodb_order(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri, groups=["group1"], database_name="eventit"
+    )
+    for minute in MINUTES:
+        client.log_message(_event(minute), "group1")
+    end_time = START + datetime.timedelta(hours=1)
+    newest = client.search_events_by_timestamp(
+        START, end_time, "group1", BaseEvent, limit=3, order="desc"
+    )
+    assert _minutes(newest) == [9, 8, 7]
+    oldest = client.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent, limit=2, order="asc", fields=["user"]
+    )
+    assert oldest == [{"user": "user1"}, {"user": "user1"}]
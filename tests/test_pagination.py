@@ -0,0 +1,120 @@
+import datetime
+
+import pytest
+from eventit_py.logging_backends import FileLoggingClient, MongoDBLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+def _all_pages(client, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        page = client.search_events_page("group1", cursor=cursor, **kwargs)
+        pages.append(page.events)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def file_client(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    for i in range(25):
+        client.log_message(BaseEvent(user=f"user{i % 3}", description=str(i)), "group1")
+    return client
+
+
+def test_file_pagination(file_client):
+    pages = _all_pages(file_client, page_size=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    descriptions = [event.description for page in pages for event in page]
+    assert descriptions == [str(i) for i in range(25)]
+
+    # an exact multiple of the page size does not produce an empty last page
+    assert [len(page) for page in _all_pages(file_client, page_size=5)] == [5] * 5
+
+    pages = _all_pages(
+        file_client, page_size=4, query_dict={"user": "user1"}, fields=["description"]
+    )
+    assert [event for page in pages for event in page] == [
+        {"description": str(i)} for i in range(1, 25, 3)
+    ]
+
+    with pytest.raises(ValueError):
+        file_client.search_events_page("group1", cursor="not a cursor")
+    with pytest.raises(ValueError):
+        file_client.search_events_page("group1", page_size=0)
+
+
+def test_file_pagination_time_range(file_client):
+    events = file_client.search_events_by_query({}, "group1", BaseEvent)
+    pages = _all_pages(
+        file_client,
+        page_size=3,
+        start_time=events[0].timestamp,
+        end_time=datetime.datetime.now(tz=datetime.timezone.utc),
+    )
+    assert sum(len(page) for page in pages) == 25
+    future = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(1)
+    assert file_client.search_events_page("group1", start_time=future).events == []
+
+
+def test_file_pagination_resumes_from_offset(file_client):
+    first_page = file_client.search_events_page("group1", page_size=10)
+    # pages read after more events are written carry on from the cursor
+    file_client.log_message(BaseEvent(description="25"), "group1")
+    pages = _all_pages(file_client, page_size=10)
+    second_page = file_client.search_events_page(
+        "group1", page_size=10, cursor=first_page.next_cursor
+    )
+    assert second_page.events == pages[1]
+    assert [event.description for event in pages[-1]][-1] == "25"
+
+
+def test_file_pagination_after_update(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    events = [BaseCountableEvent(description=str(i)) for i in range(6)]
+    for event in events:
+        client.log_message(event, "group1")
+    page = client.search_events_page("group1", BaseCountableEvent, page_size=3)
+
+    # rewriting an earlier event moves the lines after it
+    events[0].description = "a much longer description than before"
+    client.update_event_by_uuid("group1", events[0], BaseCountableEvent)
+    next_page = client.search_events_page(
+        "group1", BaseCountableEvent, page_size=3, cursor=page.next_cursor
+    )
+    assert [event.description for event in next_page.events] == ["3", "4", "5"]
+    assert next_page.next_cursor is None
+
+
+def test_file_pagination_indexed(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["user"]}
+    )
+    for i in range(20):
+        client.log_message(BaseEvent(user=f"user{i % 2}", description=str(i)), "group1")
+    pages = _all_pages(client, page_size=4, query_dict={"user": "user0"}, raw=True)
+    assert [event["description"] for page in pages for event in page] == [
+        str(i) for i in range(0, 20, 2)
+    ]
+
+
+def test_mongodb_pagination(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri, groups=["group1"], database_name="eventit"
+    )
+    for i in range(25):
+        client.log_message(BaseEvent(user=f"user{i % 3}", description=str(i)), "group1")
+    assert "timestamp_uuid_index" in client._db["group1"].index_information()
+
+    pages = _all_pages(client, page_size=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len({event.uuid for page in pages for event in page}) == 25
+
+    pages = _all_pages(
+        client, page_size=4, query_dict={"user": "user1"}, fields=["description"]
+    )
+    assert sorted(int(event["description"]) for page in pages for event in page) == (
+        list(range(1, 25, 3))
+    )
@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import pytest
+from eventit_py.event_logger import EventLogger
+from eventit_py.profiling import TRUNCATED_FRAME, CallTreeProfiler, frame_name
+from eventit_py.pydantic_events import BaseEvent
+
+
+def test_nested_calls(tmp_path):
+    eventit = EventLogger(directory=tmp_path, profiling=True)
+
+    @eventit.event
+    def inner():
+        time.sleep(0.01)
+
+    @eventit.timed
+    def outer():
+        time.sleep(0.01)
+        inner()
+        inner()
+
+    outer()
+    outer_name, inner_name = frame_name(outer), frame_name(inner)
+    tree = eventit.profiler.call_tree()
+    assert set(tree) == {(outer_name,), (outer_name, inner_name)}
+    outer_stats, inner_stats = tree[(outer_name,)], tree[(outer_name, inner_name)]
+    assert (outer_stats.calls, inner_stats.calls) == (1, 2)
+    assert outer_stats.inclusive >= 0.03
+    assert inner_stats.inclusive == inner_stats.exclusive
+    # time spent in nested decorated calls is excluded from the caller's exclusive time
+    assert outer_stats.exclusive == pytest.approx(
+        outer_stats.inclusive - inner_stats.inclusive
+    )
+
+    # top level calls are their own root
+    inner()
+    assert eventit.profiler.call_tree()[(inner_name,)].calls == 1
+    lines = eventit.profiler.folded_stacks(value="calls").splitlines()
+    assert lines == [
+        f"{inner_name} 1",
+        f"{outer_name} 1",
+        f"{outer_name};{inner_name} 2",
+    ]
+    stack, microseconds = eventit.profiler.folded_stacks().splitlines()[1].split(" ")
+    assert stack == outer_name and int(microseconds) >= 10000
+    with pytest.raises(ValueError):
+        eventit.profiler.folded_stacks(value="memory")
+
+
+def test_profiling_disabled(tmp_path):
+    eventit = EventLogger(directory=tmp_path)
+    assert eventit.profiler is None
+
+    @eventit.event
+    def func():
+        return 1
+
+    assert func() == 1
+    profiler = eventit.enable_profiling()
+    assert eventit.enable_profiling() is profiler
+    func()
+    eventit.disable_profiling()
+    func()
+    assert eventit.profiler is None
+    assert profiler.call_tree()[(frame_name(func),)].calls == 1
+
+
+def test_exceptions_are_recorded(tmp_path):
+    eventit = EventLogger(directory=tmp_path, profiling=True)
+
+    @eventit.event
+    def fails():
+        raise RuntimeError
+
+    @eventit.event
+    def calls_fails():
+        with pytest.raises(RuntimeError):
+            fails()
+
+    calls_fails()
+    calls_fails()
+    tree = eventit.profiler.call_tree()
+    assert tree[(frame_name(calls_fails), frame_name(fails))].calls == 2
+    assert tree[(frame_name(calls_fails),)].calls == 2
+
+
+def test_async_tasks_are_isolated(tmp_path):
+    eventit = EventLogger(directory=tmp_path, profiling=True)
+
+    @eventit.event
+    async def leaf():
+        await asyncio.sleep(0.01)
+
+    @eventit.event
+    async def first():
+        await leaf()
+
+    @eventit.event
+    async def second():
+        await asyncio.sleep(0.005)
+        await leaf()
+
+    async def main():
+        await asyncio.gather(first(), second(), first())
+
+    asyncio.run(main())
+    tree = eventit.profiler.call_tree()
+    leaf_name = frame_name(leaf)
+    # each task's calls are attributed to its own caller, although they interleave
+    assert tree[(frame_name(first), leaf_name)].calls == 2
+    assert tree[(frame_name(second), leaf_name)].calls == 1
+    assert tree[(frame_name(first),)].inclusive >= 0.02
+
+
+def test_async_timed_and_event(tmp_path):
+    eventit = EventLogger(directory=tmp_path, profiling=True)
+
+    @eventit.timed
+    async def load():
+        await asyncio.sleep(0.02)
+
+    @eventit.event
+    async def handle():
+        await load()
+
+    coroutine = handle()
+    # the event is logged when the function is called, before the coroutine runs
+    assert (
+        eventit.db_client.count_events_by_query(
+            {"function_name": "handle"}, "default", BaseEvent
+        )
+        == 1
+    )
+    asyncio.run(coroutine)
+    tree = eventit.profiler.call_tree()
+    handle_stats = tree[(frame_name(handle),)]
+    load_stats = tree[(frame_name(handle), frame_name(load))]
+    # the awaited time is attributed to the timed coroutine, not to its caller
+    assert load_stats.inclusive >= 0.02
+    assert handle_stats.inclusive >= load_stats.inclusive
+    assert handle_stats.exclusive < 0.01
+
+
+def test_max_paths():
+    profiler = CallTreeProfiler(max_paths=3)
+    for index in range(5):
+        profiler.exit(profiler.enter(f"func{index}"))
+    tree = profiler.call_tree()
+    assert list(tree) == [("func0",), ("func1",), ("func2",), (TRUNCATED_FRAME,)]
+    assert tree[(TRUNCATED_FRAME,)].calls == 2
+    # paths that are already tracked are still counted
+    profiler.exit(profiler.enter("func1"))
+    assert profiler.call_tree()[("func1",)].calls == 2
+    assert len(profiler.windows()) == 1
+    profiler.reset()
+    assert profiler.call_tree() == {}
+    assert profiler.folded_stacks() == ""
+
+    with pytest.raises(ValueError):
+        CallTreeProfiler(window=0)
@@ -0,0 +1,119 @@
+import datetime
+import uuid
+
+import pytest
+from eventit_py.logging_backends import FileLoggingClient, MongoDBLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+@pytest.fixture
+def file_client(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    for i in range(6):
+        client.log_message(
+            BaseEvent(user=f"user{i % 2}", description=f"event {i}"), "group1"
+        )
+    return client
+
+
+def test_search_events_by_query_fields(file_client):
+    results = file_client.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent, fields=["user", "timestamp"]
+    )
+    assert len(results) == 3
+    assert all(set(result) == {"user", "timestamp"} for result in results)
+    assert all(result["user"] == "user1" for result in results)
+    assert isinstance(results[0]["timestamp"], datetime.datetime)
+    assert results[0]["timestamp"].tzinfo is not None
+
+    events = file_client.search_events_by_query({"user": "user1"}, "group1", BaseEvent)
+    assert [result["timestamp"] for result in results] == [
+        event.timestamp for event in events
+    ]
+
+    # fields missing from an event are left out
+    results = file_client.search_events_by_query(
+        {}, "group1", BaseEvent, fields=["function_name"], limit=2
+    )
+    assert results == [{}, {}]
+
+    with pytest.raises(ValueError):
+        file_client.search_events_by_query(
+            {}, "group1", BaseEvent, fields=["not_a_field"]
+        )
+
+
+def test_search_events_raw(file_client):
+    events = file_client.search_events_by_query({"user": "user0"}, "group1", BaseEvent)
+    results = file_client.search_events_by_query(
+        {"user": "user0"}, "group1", BaseEvent, raw=True
+    )
+    assert results == [event.model_dump(exclude_none=True) for event in events]
+    assert isinstance(results[0]["uuid"], uuid.UUID)
+
+    # typed query values are compared with their serialized form
+    results = file_client.search_events_by_query(
+        {"uuid": events[0].uuid}, "group1", BaseEvent, raw=True
+    )
+    assert [result["uuid"] for result in results] == [events[0].uuid]
+    results = file_client.search_events_by_query(
+        {"timestamp": events[0].timestamp}, "group1", BaseEvent, fields=["uuid"]
+    )
+    assert {"uuid": events[0].uuid} in results
+
+    # raw results match validated events for other event types too
+    file_client.log_message(BaseCountableEvent(count=3), "group1")
+    results = file_client.search_events_by_query(
+        {"count": 3}, "group1", BaseCountableEvent, fields=["count"]
+    )
+    assert results == [{"count": 3}]
+
+
+def test_search_events_by_timestamp_fields(file_client):
+    start_time = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(
+        minutes=1
+    )
+    end_time = datetime.datetime.now(tz=datetime.timezone.utc)
+    results = file_client.search_events_by_timestamp(
+        start_time, end_time, "group1", BaseEvent, fields=["description"]
+    )
+    assert [result["description"] for result in results] == [
+        f"event {i}" for i in range(6)
+    ]
+    assert (
+        len(
+            file_client.search_events_by_timestamp(
+                start_time, end_time, "group1", BaseEvent, limit=2, raw=True
+            )
+        )
+        == 2
+    )
+
+
+def test_search_events_fields_indexed(tmp_path):
+    client = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], indexes={"group1": ["user"]}
+    )
+    client.log_message(BaseEvent(user="alice", description="first"), "group1")
+    client.log_message(BaseEvent(user="bob"), "group1")
+    results = client.search_events_by_query(
+        {"user": "alice"}, "group1", BaseEvent, fields=["description"]
+    )
+    assert results == [{"description": "first"}]
+
+
+def test_mongodb_search_events_fields(get_mongo_uri):
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri, groups=["group1"], database_name="eventit"
+    )
+    for i in range(4):
+        client.log_message(BaseEvent(user=f"user{i % 2}"), "group1")
+    results = client.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent, fields=["user"]
+    )
+    assert results == [{"user": "user1"}, {"user": "user1"}]
+    raw_results = client.search_events_by_query(
+        {"user": "user1"}, "group1", BaseEvent, raw=True
+    )
+    assert "_id" not in raw_results[0]
+    assert isinstance(raw_results[0]["uuid"], uuid.UUID)
@@ -0,0 +1,203 @@
+import datetime
+import time
+
+import pytest
+from eventit_py.event_logger import EventLogger
+from eventit_py.logging_backends import FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+from eventit_py.query_cache import CachedLoggingClient
+
+
+class CountingFileLoggingClient(FileLoggingClient):
+    """FileLoggingClient that counts the reads reaching the file"""
+
+    reads = 0
+
+    def search_events_by_timestamp(self, *args, **kwargs):
+        self.reads += 1
+        return super().search_events_by_timestamp(*args, **kwargs)
+
+    def search_events_by_query(self, *args, **kwargs):
+        self.reads += 1
+        return super().search_events_by_query(*args, **kwargs)
+
+    def count_events_by_query(self, *args, **kwargs):
+        self.reads += 1
+        return super().count_events_by_query(*args, **kwargs)
+
+
+def _make_client(tmp_path, **kwargs):
+    inner = CountingFileLoggingClient(
+        directory=tmp_path, groups=["group1", "group2"], **kwargs
+    )
+    return inner, CachedLoggingClient(inner, max_entries=4)
+
+
+def test_query_cache_hits_and_appends(tmp_path):
+    inner, client = _make_client(tmp_path)
+    client.log_message(BaseEvent(user="alice"), "group1")
+    client.log_message(BaseEvent(user="bob"), "group1")
+
+    assert (
+        len(client.search_events_by_query({"user": "alice"}, "group1", BaseEvent)) == 1
+    )
+    assert client.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 1
+    assert inner.reads == 2
+    assert (
+        len(client.search_events_by_query({"user": "alice"}, "group1", BaseEvent)) == 1
+    )
+    assert client.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 1
+    assert inner.reads == 2
+
+    # appended events are added to the matching cached results, without a rescan
+    new_event = BaseEvent(user="alice")
+    client.log_message(new_event, "group1")
+    client.log_message(BaseEvent(user="carol"), "group1")
+    client.log_message(BaseEvent(user="alice"), "group2")
+    result = client.search_events_by_query({"user": "alice"}, "group1", BaseEvent)
+    assert result[-1].uuid == new_event.uuid
+    assert len(result) == 2
+    assert client.count_events_by_query({"user": "alice"}, "group1", BaseEvent) == 2
+    assert inner.reads == 2
+    assert result == inner.search_events_by_query(
+        {"user": "alice"}, "group1", BaseEvent
+    )
+
+    info = client.cache_info()
+    assert info["hits"] == 4
+    assert info["misses"] == 2
+
+
+def test_query_cache_closed_time_window(tmp_path):
+    inner, client = _make_client(tmp_path)
+    # timestamps are truncated to milliseconds, so widen the window
+    start_time = datetime.datetime.now(tz=datetime.timezone.utc) - datetime.timedelta(
+        seconds=1
+    )
+    client.log_message(BaseEvent(), "group1")
+    end_time = datetime.datetime.now(tz=datetime.timezone.utc)
+    open_end_time = end_time + datetime.timedelta(hours=1)
+
+    closed = client.search_events_by_timestamp(
+        start_time, end_time, "group1", BaseEvent
+    )
+    opened = client.search_events_by_timestamp(
+        start_time, open_end_time, "group1", BaseEvent
+    )
+    assert len(closed) == len(opened) == 1
+    time.sleep(0.01)
+    client.log_message(BaseEvent(), "group1")
+
+    # the closed window is unaffected, the open window is extended with the new event
+    assert (
+        len(
+            client.search_events_by_timestamp(start_time, end_time, "group1", BaseEvent)
+        )
+        == 1
+    )
+    assert (
+        len(
+            client.search_events_by_timestamp(
+                start_time, open_end_time, "group1", BaseEvent
+            )
+        )
+        == 2
+    )
+    assert inner.reads == 2
+
+
+def test_query_cache_invalidation(tmp_path):
+    inner, client = _make_client(tmp_path)
+    counter = BaseCountableEvent(user="alice")
+    client.log_message(counter, "group1")
+    assert client.count_events_by_query({"count": 1}, "group1", BaseCountableEvent) == 1
+
+    counter.count = 2
+    client.update_event_by_uuid("group1", counter, BaseCountableEvent)
+    assert client.count_events_by_query({"count": 1}, "group1", BaseCountableEvent) == 0
+    assert inner.reads == 2
+    assert client.cache_info()["invalidations"] == 1
+
+    # events of another type cannot be matched in place
+    client.search_events_by_query({}, "group1", BaseCountableEvent)
+    client.log_message(BaseEvent(), "group1")
+    client.search_events_by_query({}, "group1", BaseCountableEvent)
+    assert inner.reads == 4
+
+
+def test_query_cache_single_file_groups(tmp_path):
+    inner, client = _make_client(tmp_path, separate_files=False, filename="all.log")
+    assert client.count_events_by_query({}, "group1", BaseEvent) == 0
+    # groups share a file, so writes to one group change searches of the other
+    client.log_message(BaseEvent(), "group2")
+    assert client.count_events_by_query({}, "group1", BaseEvent) == 1
+    assert inner.reads == 1
+
+
+def test_query_cache_bounded(tmp_path):
+    inner = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    client = CachedLoggingClient(inner, max_entries=2, max_results=2)
+    for i in range(3):
+        client.log_message(BaseEvent(user=str(i)), "group1")
+    for i in range(3):
+        client.count_events_by_query({"user": str(i)}, "group1", BaseEvent)
+    assert client.cache_info()["entries"] == 2
+
+    # results larger than max_results are not cached
+    client.clear_cache()
+    client.search_events_by_query({}, "group1", BaseEvent)
+    assert client.cache_info()["entries"] == 0
+
+    with pytest.raises(ValueError):
+        CachedLoggingClient(inner, max_entries=0)
+
+
+def test_query_cache_event_logger(tmp_path):
+    eventit = EventLogger(directory=tmp_path, query_cache_size=16)
+    assert isinstance(eventit.db_client, CachedLoggingClient)
+    eventit.log_event(description="cached")
+    assert eventit.db_client.count_events_by_query({}, "default", BaseEvent) == 1
+    eventit.log_event(description="cached")
+    assert eventit.db_client.count_events_by_query({}, "default", BaseEvent) == 2
+    assert eventit.db_client.cache_info()["hits"] == 1
+
+
+def test_query_cache_returns_copies(tmp_path):
+    inner, client = _make_client(tmp_path)
+    logged = BaseCountableEvent(user="alice")
+    client.log_message(logged, "group1")
+    result = client.search_events_by_query(
+        {"user": "alice"}, "group1", BaseCountableEvent
+    )
+
+    # neither the logged event nor a returned one is the cached object
+    logged.count = 5
+    result[0].count = 7
+    cached = client.search_events_by_query(
+        {"user": "alice"}, "group1", BaseCountableEvent
+    )
+    assert cached[0].count == 1
+    assert cached[0] is not result[0]
+
+    # appended events are copied into cached results too
+    appended = BaseCountableEvent(user="alice")
+    client.log_message(appended, "group1")
+    appended.count = 9
+    cached = client.search_events_by_query(
+        {"user": "alice"}, "group1", BaseCountableEvent
+    )
+    assert [event.count for event in cached] == [1, 1]
+    assert inner.reads == 1
+
+
+def test_query_cache_countable_events(tmp_path):
+    eventit = EventLogger(directory=tmp_path, query_cache_size=16)
+    for _ in range(3):
+        eventit.log_event(
+            event_type=BaseCountableEvent, description="counted", group="default"
+        )
+    inner = eventit.db_client._client
+    stored = inner.search_events_by_query(
+        {"description": "counted"}, "default", BaseCountableEvent
+    )
+    assert [event.count for event in stored] == [3]
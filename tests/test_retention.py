@@ -0,0 +1,181 @@
+import datetime
+import os
+import time
+
+import pytest
+from eventit_py.logging_backends import (
+    SEGMENT_OFFSET_BITS,
+    FileLoggingClient,
+    MongoDBLoggingClient,
+)
+from eventit_py.pydantic_events import BaseEvent
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+RETENTION = 3600
+
+
+def _event(minute: int, user: str = None) -> BaseEvent:
+    return BaseEvent(
+        timestamp=START + datetime.timedelta(minutes=minute),
+        user=user or f"user{minute % 2}",
+        description=f"minute {minute}",
+    )
+
+
+def _minutes(events):
+    return [int((event.timestamp - START).total_seconds() // 60) for event in events]
+
+
+def _seal(client: FileLoggingClient, group: str) -> None:
+    # pretend the current segment has covered its share of the retention period
+    client._segment_started[group] -= RETENTION
+
+
+def _age(client: FileLoggingClient, group: str, number: int, seconds: float) -> None:
+    path = client._segment_path(group, number)
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def client(tmp_path):
+    return FileLoggingClient(
+        directory=tmp_path, groups=["group1"], retention={"group1": RETENTION}
+    )
+
+
+def test_retention_validation(tmp_path):
+    with pytest.raises(ValueError):
+        FileLoggingClient(directory=tmp_path, groups=["group1"], retention={"nope": 1})
+    with pytest.raises(ValueError):
+        FileLoggingClient(
+            directory=tmp_path, groups=["group1"], retention={"group1": 0}
+        )
+    with pytest.raises(ValueError):
+        FileLoggingClient(
+            directory=tmp_path,
+            groups=["group1"],
+            filename="events.log",
+            separate_files=False,
+            retention={"group1": 60},
+        )
+
+
+def test_segments_rotate_and_expire(client):
+    for minute in range(3):
+        client.log_message(_event(minute), "group1")
+    _seal(client, "group1")
+    for minute in range(3, 6):
+        client.log_message(_event(minute), "group1")
+    assert client._sealed_segments["group1"] == [0]
+    assert client._active_segments["group1"] == 1
+
+    # reads span the sealed segment and the current file
+    end_time = START + datetime.timedelta(hours=1)
+    events = client.search_events_by_timestamp(START, end_time, "group1", BaseEvent)
+    assert _minutes(events) == list(range(6))
+    newest = client.search_events_by_query(
+        {}, "group1", BaseEvent, limit=4, order="desc"
+    )
+    assert _minutes(newest) == [5, 4, 3, 2]
+    assert client.count_events_by_query({"user": "user0"}, "group1", BaseEvent) == 3
+
+    # segments are only deleted once their newest event has expired
+    assert client.expire_segments() == 0
+    _age(client, "group1", 0, RETENTION + 1)
+    assert client.expire_segments("group1") == 1
+    assert not client._segment_path("group1", 0).exists()
+    events = client.search_events_by_timestamp(START, end_time, "group1", BaseEvent)
+    assert _minutes(events) == [3, 4, 5]
+
+
+def test_segments_survive_restart(tmp_path, client):
+    client.log_message(_event(0), "group1")
+    _seal(client, "group1")
+    client.log_message(_event(1), "group1")
+
+    reopened = FileLoggingClient(
+        directory=tmp_path, groups=["group1"], retention={"group1": RETENTION}
+    )
+    assert reopened._active_segments["group1"] == 1
+    assert _minutes(reopened.search_events_by_query({}, "group1", BaseEvent)) == [0, 1]
+
+
+def test_index_and_count_across_segments(client):
+    client.create_index("group1", "user")
+    client.register_count_query("user0_events", "group1", {"user": "user0"}, BaseEvent)
+    for minute in range(4):
+        client.log_message(_event(minute), "group1")
+    _seal(client, "group1")
+    for minute in range(4, 8):
+        client.log_message(_event(minute), "group1")
+
+    events = client.search_events_by_query({"user": "user0"}, "group1", BaseEvent)
+    assert _minutes(events) == [0, 2, 4, 6]
+    # offsets in later segments do not overlap earlier ones
+    offsets = client._indexes[("group1", "user")].lookup("user0")
+    assert max(offsets) >= 1 << SEGMENT_OFFSET_BITS
+    assert client.get_materialized_count("user0_events") == 4
+
+    _age(client, "group1", 0, RETENTION + 1)
+    client.expire_segments()
+    events = client.search_events_by_query({"user": "user0"}, "group1", BaseEvent)
+    assert _minutes(events) == [4, 6]
+    assert client.get_materialized_count("user0_events") == 2
+
+
+def test_update_sealed_segment(client):
+    events = [_event(minute) for minute in range(3)]
+    for event in events:
+        client.log_message(event, "group1")
+    _seal(client, "group1")
+    client.log_message(_event(3), "group1")
+    client.create_index("group1", "user")
+    _age(client, "group1", 0, 60)
+    sealed_mtime = client._segment_path("group1", 0).stat().st_mtime
+
+    updated = events[1].model_copy(update={"user": "someone else"})
+    result = client.update_event_by_uuid("group1", updated, BaseEvent)
+    assert result["modified_count"] == 1
+    assert client.get_event_by_uuid(events[1].uuid, "group1", BaseEvent) == updated
+    # rewriting an old event does not postpone the segment's expiry
+    assert client._segment_path("group1", 0).stat().st_mtime == sealed_mtime
+    assert _minutes(
+        client.search_events_by_query({"user": "user1"}, "group1", BaseEvent)
+    ) == [3]
+    assert _minutes(
+        client.search_events_by_query({"user": "someone else"}, "group1", BaseEvent)
+    ) == [1]
+
+
+def test_mongodb_retention(get_mongo_uri):
+    with pytest.raises(ValueError):
+        MongoDBLoggingClient(
+            mongo_url=get_mongo_uri,
+            groups=["group1"],
+            database_name="eventit",
+            retention={"group1": 60},
+            capped_sizes={"group1": 4096},
+        )
+
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=["group1", "group2"],
+        database_name="eventit",
+        drop_database=True,
+        retention={"group1": datetime.timedelta(days=1)},
+        capped_sizes={"group2": 4096},
+    )
+    timestamp_index = client._db["group1"].index_information()["timestamp_index"]
+    assert timestamp_index["expireAfterSeconds"] == 86400
+    assert client._db["group2"].options()["capped"]
+
+    # changing the retention period updates the existing index
+    client = MongoDBLoggingClient(
+        mongo_url=get_mongo_uri,
+        groups=["group1"],
+        database_name="eventit",
+        retention={"group1": 3600},
+    )
+    timestamp_index = client._db["group1"].index_information()["timestamp_index"]
+    assert timestamp_index["expireAfterSeconds"] == 3600
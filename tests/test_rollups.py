@@ -0,0 +1,162 @@
+import datetime
+import threading
+
+import pytest
+from eventit_py import event_logger
+from eventit_py.event_logger import EventLogger, _rollup_ranges
+from eventit_py.pydantic_events import BaseCountableEvent
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(event_logger, "_handle_timestamp", clock)
+    return clock
+
+
+def _log(eventit: EventLogger, clock: Clock, seconds: float, user: str = "alice"):
+    clock.now = START + datetime.timedelta(seconds=seconds)
+    eventit.log_event(
+        tracking_details={"function_name": False, "event_location": False},
+        description=user,
+        event_type=BaseCountableEvent,
+    )
+
+
+def _documents(eventit: EventLogger, time_window: int, group: str = "rollups"):
+    return eventit.db_client.search_events_by_query(
+        {"time_window": time_window}, group, BaseCountableEvent
+    )
+
+
+def test_rollup_ranges():
+    end = START + datetime.timedelta(hours=2, minutes=1, seconds=30)
+    ranges = _rollup_ranges([15, 60, 3600], START + datetime.timedelta(seconds=45), end)
+    assert [(size, (start - START).total_seconds()) for size, start, _ in ranges] == [
+        (15, 45),
+        (60, 60),
+        (3600, 3600),
+        (60, 7200),
+        (15, 7260),
+    ]
+    # ranges are contiguous
+    assert all(ranges[i][2] == ranges[i + 1][1] for i in range(len(ranges) - 1))
+    assert ranges[-1][2] == end
+
+
+def test_rollup_tiers_validation(tmp_path):
+    with pytest.raises(ValueError):
+        EventLogger(directory=tmp_path, rollup_tiers=[60, 90])
+    with pytest.raises(ValueError):
+        EventLogger(directory=tmp_path, rollup_tiers=[0])
+    eventit = EventLogger(
+        directory=tmp_path, rollup_tiers=[datetime.timedelta(hours=1), 60]
+    )
+    assert eventit.rollup_tiers == [60, 3600]
+
+
+def test_rollups_on_window_close(tmp_path, clock):
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[60, 3600])
+    for seconds in [0, 5, 20, 65]:
+        _log(eventit, clock, seconds)
+    # the first two windows have closed and are rolled up in the background, the third is still open
+    eventit._wait_for_rollups()
+    assert [event.count for event in _documents(eventit, 60)] == [3]
+    assert [event.count for event in _documents(eventit, 3600)] == [3]
+    assert [event.count for event in _documents(eventit, 15, "default")] == [2, 1, 1]
+    # rollups are kept apart from the windows they count, so plain counts see each event once
+    assert (
+        eventit.db_client.count_events_by_query({}, "default", BaseCountableEvent) == 3
+    )
+
+    eventit.flush()
+    assert [event.count for event in _documents(eventit, 60)] == [3, 1]
+    # more events in a window that was already flushed are added once it closes
+    _log(eventit, clock, 70)
+    _log(eventit, clock, 4000)
+    eventit._wait_for_rollups()
+    assert [event.count for event in _documents(eventit, 60)] == [3, 2]
+    assert [event.count for event in _documents(eventit, 3600)] == [5]
+
+
+def test_rollups_off_logging_thread(tmp_path, clock, monkeypatch):
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[60])
+    roll_up = eventit._roll_up
+    threads = []
+
+    def record_thread(windows):
+        threads.append(threading.current_thread().name)
+        roll_up(windows)
+
+    monkeypatch.setattr(eventit, "_roll_up", record_thread)
+    _log(eventit, clock, 0)
+    _log(eventit, clock, 20)
+    eventit._wait_for_rollups()
+    assert [event.count for event in _documents(eventit, 60)] == [1]
+    assert threads and all(name.startswith("eventit-rollups") for name in threads)
+
+
+def test_query_counts(tmp_path, clock):
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[60, 3600])
+    for minute in range(0, 180, 10):
+        _log(eventit, clock, minute * 60)
+        _log(eventit, clock, minute * 60 + 30, user="bob")
+
+    end = START + datetime.timedelta(hours=3)
+    # without a resolution, the coarsest tier within the range is used
+    counts = eventit.query_counts(BaseCountableEvent, START, end)
+    assert sum(count for _, count in counts) == 36
+    hourly = eventit.query_counts(
+        BaseCountableEvent, START, end, resolution=datetime.timedelta(hours=1)
+    )
+    assert hourly == [(START + datetime.timedelta(hours=hour), 12) for hour in range(3)]
+    # uneven ends are read from finer tiers
+    partial = eventit.query_counts(
+        BaseCountableEvent,
+        START + datetime.timedelta(minutes=25),
+        START + datetime.timedelta(hours=1, minutes=35),
+        resolution=3600,
+        query_dict={"description": "bob"},
+    )
+    assert partial == [(START, 3), (START + datetime.timedelta(hours=1), 4)]
+    minutely = eventit.query_counts(
+        BaseCountableEvent,
+        START,
+        START + datetime.timedelta(minutes=20),
+        resolution=60,
+    )
+    assert minutely == [(START, 2), (START + datetime.timedelta(minutes=10), 2)]
+
+    with pytest.raises(ValueError):
+        eventit.query_counts(BaseCountableEvent, START, end, resolution=1)
+
+
+def test_rollup_group(tmp_path, clock):
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[60], rollup_group="tiers")
+    _log(eventit, clock, 0)
+    _log(eventit, clock, 30)
+    eventit.flush_rollups()
+    assert _documents(eventit, 60, group="default") == []
+    rollups = _documents(eventit, 60, group="tiers")
+    assert [(event.group, event.count) for event in rollups] == [("default", 2)]
+    assert eventit.query_counts(
+        BaseCountableEvent, START, START + datetime.timedelta(minutes=1)
+    ) == [(START, 2)]
+
+    # rollups can also be stored with their events
+    eventit = EventLogger(
+        directory=tmp_path.joinpath("together"), rollup_tiers=[60], rollup_group=None
+    )
+    _log(eventit, clock, 0)
+    eventit.flush_rollups()
+    assert [event.count for event in _documents(eventit, 60, group="default")] == [1]
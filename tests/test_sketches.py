@@ -0,0 +1,228 @@
+import collections
+import datetime
+import random
+
+import pytest
+from eventit_py import event_logger
+from eventit_py.event_logger import EventLogger
+from eventit_py.pydantic_events import BaseDistinctCountEvent, BaseTopEvent
+from eventit_py.sketches import HyperLogLog, LogLinearHistogram, SpaceSaving
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def test_hyperloglog_estimate():
+    sketch = HyperLogLog()
+    for value in range(20000):
+        sketch.add(f"user{value}")
+    # adding values again does not change the estimate
+    for value in range(5000):
+        sketch.add(f"user{value}")
+    assert abs(sketch.count() - 20000) < 20000 * 0.05
+
+    small = HyperLogLog()
+    for value in range(10):
+        small.add(value)
+    assert small.count() == 10
+    assert HyperLogLog().count() == 0
+
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=20)
+
+
+def test_hyperloglog_merge_and_serialize():
+    first, second, both = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    for value in range(3000):
+        first.add(value)
+        both.add(value)
+    for value in range(2000, 6000):
+        second.add(value)
+        both.add(value)
+    # merging gives the sketch of the union, without counting shared values twice
+    assert first.merge(second) == both
+    assert abs(both.count() - 6000) < 6000 * 0.05
+
+    data = both.to_bytes()
+    assert len(data) < len(both.registers)
+    assert HyperLogLog.from_bytes(data) == both
+    assert len(HyperLogLog().to_bytes()) < 100
+
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+
+def test_distinct_count_event_serialization():
+    event = BaseDistinctCountEvent()
+    for value in range(100):
+        event.add_distinct(value)
+    event.add_distinct(None)
+    restored = BaseDistinctCountEvent.model_validate_json(event.model_dump_json())
+    assert restored.sketch == event.sketch
+    assert restored.distinct_count() == event.distinct_count()
+    assert abs(event.distinct_count() - 100) <= 3
+
+
+def test_query_distinct_counts(tmp_path, monkeypatch):
+    clock = {"now": START}
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: clock["now"])
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[60, 3600])
+    current_user = {"user": None}
+    eventit.register_custom_metric("user", lambda func, context: current_user["user"])
+
+    # each minute for two hours, 5 users call the function, 2 of them shared with the previous minute
+    for minute in range(120):
+        for caller in range(5):
+            clock["now"] = START + datetime.timedelta(minutes=minute, seconds=caller)
+            current_user["user"] = f"user{minute * 3 + caller}"
+            eventit.log_event(
+                tracking_details={"function_name": True, "user": True},
+                event_type=BaseDistinctCountEvent,
+            )
+
+    # users do not key the window, so there is a single window per 15 seconds
+    windows = eventit.db_client.search_events_by_query(
+        {"time_window": 15}, "default", BaseDistinctCountEvent
+    )
+    assert len(windows) == 120
+    assert all(window.user is None and window.count == 5 for window in windows)
+
+    end = START + datetime.timedelta(hours=2)
+    hourly = eventit.query_distinct_counts(
+        BaseDistinctCountEvent, START, end, resolution=3600
+    )
+    assert [bucket for bucket, _ in hourly] == [
+        START,
+        START + datetime.timedelta(hours=1),
+    ]
+    for _, count in hourly:
+        assert abs(count - 182) <= 5
+    [(bucket, total)] = eventit.query_distinct_counts(
+        BaseDistinctCountEvent, START, end
+    )
+    assert bucket == START
+    assert abs(total - 362) <= 10
+    assert eventit.query_counts(BaseDistinctCountEvent, START, end) == [(START, 600)]
+
+    with pytest.raises(TypeError):
+        eventit.query_distinct_counts(event_logger.BaseCountableEvent, START, end)
+
+
+def test_space_saving():
+    summary = SpaceSaving(capacity=10)
+    # 5 heavy hitters among many rare values
+    for round_number in range(200):
+        for heavy in range(5):
+            summary.add(f"heavy{heavy}", weight=heavy + 1)
+        summary.add(f"rare{round_number}")
+    assert len(summary.counters) == 10
+    top = summary.top(5)
+    assert [value for value, _, _ in top] == [
+        f"heavy{heavy}" for heavy in range(4, -1, -1)
+    ]
+    for value, count, error in top:
+        true_count = 200 * (int(value[-1]) + 1)
+        assert count - error <= true_count <= count
+
+    with pytest.raises(ValueError):
+        SpaceSaving(capacity=0)
+
+
+def test_space_saving_eviction():
+    summary = SpaceSaving(capacity=20)
+    generator = random.Random(7)
+    true_counts = collections.Counter()
+    for _ in range(5000):
+        value = f"value{int(generator.paretovariate(1.2)) % 200}"
+        weight = generator.randint(1, 3)
+        true_counts[value] += weight
+        summary.add(value, weight=weight)
+    # counts add up to the total weight, and bound the true counts
+    assert sum(count for count, _ in summary.counters.values()) == sum(
+        true_counts.values()
+    )
+    for value, (count, error) in summary.counters.items():
+        assert count - error <= true_counts[value] <= count
+    heaviest = [value for value, _ in true_counts.most_common(3)]
+    assert [value for value, _, _ in summary.top(3)] == heaviest
+
+
+def test_space_saving_merge():
+    first, second = SpaceSaving(capacity=3), SpaceSaving(capacity=3)
+    for value, count in [("a", 10), ("b", 5), ("c", 1)]:
+        first.add(value, weight=count)
+    for value, count in [("b", 8), ("d", 4), ("e", 2)]:
+        second.add(value, weight=count)
+    first.merge(second)
+    # values missing from a full summary may have occurred up to its smallest count
+    assert first.top() == [("b", 13, 0), ("a", 12, 2), ("d", 5, 1)]
+    restored = SpaceSaving.from_list(first.to_list(), capacity=3)
+    assert restored.top() == first.top()
+
+
+def test_query_top(tmp_path, monkeypatch):
+    clock = {"now": START}
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: clock["now"])
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[3600])
+    current_user = {"user": None}
+    eventit.register_custom_metric("user", lambda func, context: current_user["user"])
+
+    def call(seconds: int, user: str):
+        clock["now"] = START + datetime.timedelta(seconds=seconds)
+        current_user["user"] = user
+        eventit.log_event(tracking_details={"user": True}, event_type=BaseTopEvent)
+
+    call(0, "alice")
+    call(1, "bob")
+    # nothing is written while the window is open
+    assert eventit.db_client.search_events_by_query({}, "default", BaseTopEvent) == []
+    for minute in range(1, 90):
+        call(minute * 60, "alice")
+        if minute % 2 == 0:
+            call(minute * 60 + 1, "bob")
+        if minute % 10 == 0:
+            call(minute * 60 + 2, f"rare{minute}")
+    # users do not key the window, and closed windows each hold their own table
+    eventit._wait_for_rollups()
+    windows = eventit.db_client.search_events_by_query(
+        {"time_window": 15}, "default", BaseTopEvent
+    )
+    assert len(windows) == 89
+    assert all(window.count == len(window.top) for window in windows)
+
+    end = START + datetime.timedelta(minutes=90)
+    top = eventit.query_top(BaseTopEvent, START, end, n=2)
+    assert top == [("alice", 90), ("bob", 45)]
+    last_half_hour = eventit.query_top(
+        BaseTopEvent, START + datetime.timedelta(hours=1), end, n=3
+    )
+    assert last_half_hour == [("alice", 30), ("bob", 15), ("rare60", 1)]
+
+    with pytest.raises(TypeError):
+        eventit.query_top(BaseDistinctCountEvent, START, end)
+
+
+def test_log_linear_histogram():
+    histogram = LogLinearHistogram()
+    # 1ms to 1s, uniformly
+    for millisecond in range(1, 1001):
+        histogram.record(millisecond / 1000)
+    assert histogram.count == 1000
+    assert histogram.min == 0.001 and histogram.max == 1.0
+    for quantile in [0.5, 0.9, 0.99]:
+        assert histogram.percentile(quantile) == pytest.approx(quantile, rel=0.07)
+    # buckets grow with durations, so memory does not grow with the count
+    assert len(histogram.buckets) < 150
+
+    other = LogLinearHistogram()
+    for _ in range(1000):
+        other.record(5.0)
+    histogram.merge(other)
+    assert histogram.count == 2000
+    assert histogram.percentile(0.99) == pytest.approx(5.0, rel=0.07)
+    restored = LogLinearHistogram.from_dict(histogram.to_dict())
+    assert restored.buckets == histogram.buckets
+    assert restored.percentile(0.5) == histogram.percentile(0.5)
+    assert LogLinearHistogram().percentile(0.5) is None
+
+    with pytest.raises(ValueError):
+        histogram.merge(LogLinearHistogram(sub_bucket_bits=3))
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+from eventit_py.logging_backends import BaseLoggingClient, FileLoggingClient
+from eventit_py.pydantic_events import BaseCountableEvent, BaseEvent
+
+
+def test_base_logging_client_subscribe():
+    client = BaseLoggingClient(groups=["group1"])
+    with pytest.raises(NotImplementedError):
+        client.subscribe("group1", "consumer")
+
+
+def test_file_subscription_poll_and_commit(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1", "group2"])
+    subscription = client.subscribe("group1", "dashboard")
+    assert subscription.poll() == []
+
+    events = [BaseEvent(description=str(i)) for i in range(5)]
+    for event in events[:3]:
+        client.log_message(event, "group1")
+    client.log_message(BaseEvent(), "group2")
+
+    polled = subscription.poll(max_events=2)
+    assert [event.uuid for event in polled] == [event.uuid for event in events[:2]]
+    subscription.commit()
+    polled = subscription.poll()
+    assert [event.uuid for event in polled] == [events[2].uuid]
+    assert subscription.poll() == []
+
+    # a restarted consumer resumes from its last commit
+    for event in events[3:]:
+        client.log_message(event, "group1")
+    resumed = client.subscribe("group1", "dashboard")
+    assert resumed.position == subscription.committed_position
+    assert [event.uuid for event in resumed.poll()] == [
+        event.uuid for event in events[2:]
+    ]
+
+    # other consumers keep their own offsets
+    other = client.subscribe("group1", "archiver")
+    assert len(other.poll()) == 5
+    resumed.seek(0)
+    assert len(resumed.poll()) == 5
+
+
+def test_file_subscription_partial_line(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    subscription = client.subscribe("group1", "consumer")
+    client.log_message(BaseEvent(), "group1")
+    # simulate a write in progress
+    with open(client._filepaths["group1"], "a", encoding="utf-8") as file_handle:
+        file_handle.write('{"description": "half')
+    assert len(subscription.poll()) == 1
+    assert subscription.poll() == []
+
+
+def test_file_subscription_after_update(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    counter = BaseCountableEvent(count=9)
+    client.log_message(counter, "group1")
+    subscription = client.subscribe("group1", "consumer")
+    assert len(subscription.poll()) == 1
+
+    # the updated event is one byte longer, shifting the following offsets
+    counter.count = 10
+    client.update_event_by_uuid("group1", counter, BaseCountableEvent)
+    new_event = BaseCountableEvent()
+    client.log_message(new_event, "group1")
+    polled = subscription.poll()
+    assert [event.uuid for event in polled] == [new_event.uuid]
+
+
+def test_file_subscription_follow(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    subscription = client.subscribe("group1", "consumer")
+    events = [BaseEvent(description=str(i)) for i in range(3)]
+
+    def writer():
+        for event in events:
+            client.log_message(event, "group1")
+
+    threading.Timer(0.05, writer).start()
+    followed = list(subscription.follow(poll_interval=0.01, timeout=0.5))
+    assert [event.uuid for event in followed] == [event.uuid for event in events]
+
+
+def test_file_subscription_bad_arguments(tmp_path):
+    client = FileLoggingClient(directory=tmp_path, groups=["group1"])
+    with pytest.raises(ValueError):
+        client.subscribe("group2", "consumer")
+    with pytest.raises(ValueError):
+        client.subscribe("group1", "../escape")
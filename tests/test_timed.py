@@ -0,0 +1,130 @@
+import asyncio
+import datetime
+import time
+
+import pytest
+from eventit_py import event_logger
+from eventit_py.event_logger import EventLogger
+from eventit_py.pydantic_events import BaseCountableEvent, BaseTimedEvent
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class MinuteTimings(BaseTimedEvent):
+    time_window: int = 60
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = {"now": START}
+    monkeypatch.setattr(event_logger, "_handle_timestamp", lambda: clock["now"])
+    return clock
+
+
+def test_timed(tmp_path, clock):
+    eventit = EventLogger(directory=tmp_path, rollup_tiers=[3600])
+
+    @eventit.timed(event_type=MinuteTimings)
+    def busy(iterations: int):
+        if iterations < 0:
+            raise ValueError("negative")
+        return sum(range(iterations))
+
+    for minute in range(3):
+        clock["now"] = START + datetime.timedelta(minutes=minute)
+        assert busy(1000) == 499500
+        assert busy(100000) == 4999950000
+        with pytest.raises(ValueError):
+            busy(-1)
+    eventit.flush()
+
+    summaries = eventit.db_client.search_events_by_query(
+        {"time_window": 60}, "default", MinuteTimings
+    )
+    # one summary per function and window
+    assert len(summaries) == 3
+    for summary in summaries:
+        assert summary.count == 3
+        assert summary.errors == 1
+        assert summary.function_name == "busy"
+        assert summary.get_histogram("wall").count == 3
+        assert summary.get_histogram("cpu").max > 0
+
+    end = START + datetime.timedelta(hours=1)
+    [(bucket, stats)] = eventit.query_percentiles(
+        MinuteTimings, START, end, quantiles=[0.5, 1.0]
+    )
+    assert bucket == START
+    assert stats["count"] == 9 and stats["errors"] == 3
+    assert stats["percentiles"][1.0] == stats["max"]
+    assert 0 < stats["percentiles"][0.5] <= stats["max"]
+
+    per_minute = eventit.query_percentiles(
+        MinuteTimings, START, end, resolution=60, query_dict={"function_name": "busy"}
+    )
+    assert [bucket for bucket, _ in per_minute] == [
+        START + datetime.timedelta(minutes=minute) for minute in range(3)
+    ]
+    assert (
+        eventit.query_percentiles(
+            MinuteTimings, START, end, query_dict={"function_name": "idle"}
+        )
+        == []
+    )
+
+    with pytest.raises(TypeError):
+        eventit.query_percentiles(BaseCountableEvent, START, end)
+    with pytest.raises(ValueError):
+        eventit.query_percentiles(MinuteTimings, START, end, clock="gpu")
+
+
+def test_timed_coroutine(tmp_path, clock):
+    eventit = EventLogger(directory=tmp_path)
+
+    # tasks are resumed by the event loop, which would be their location
+    @eventit.timed(event_type=MinuteTimings, tracking_details={"event_location": False})
+    async def wait(fail: bool = False):
+        await asyncio.sleep(0.05)
+        if fail:
+            raise ValueError("failed")
+        return "done"
+
+    async def burn():
+        # runs on the thread while wait() is sleeping
+        await asyncio.sleep(0)
+        deadline = time.thread_time() + 0.1
+        while time.thread_time() < deadline:
+            pass
+
+    async def main():
+        assert await asyncio.gather(wait(), burn()) == ["done", None]
+        with pytest.raises(ValueError):
+            await wait(fail=True)
+
+    asyncio.run(main())
+    eventit.flush()
+    [summary] = eventit.db_client.search_events_by_query(
+        {"time_window": 60}, "default", MinuteTimings
+    )
+    assert summary.count == 2 and summary.errors == 1
+    # the wall time covers the awaited sleep, the CPU time only wait()'s own steps
+    assert summary.get_histogram("wall").min >= 0.045
+    assert summary.get_histogram("cpu").max < 0.05
+
+
+def test_timed_logging_failure(tmp_path, clock, monkeypatch):
+    eventit = EventLogger(directory=tmp_path)
+
+    @eventit.timed
+    def answer():
+        return 42
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("backend down")
+
+    monkeypatch.setattr(eventit, "log_event", fail)
+    # logging failures do not affect the call
+    assert answer() == 42
+
+    with pytest.raises(TypeError):
+        eventit.timed(lambda: None, event_type=BaseCountableEvent)